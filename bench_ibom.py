@@ -0,0 +1,1638 @@
+#!/usr/bin/env python3
+"""
+Benchmarks IBom Selector
+
+Mesure les étapes coûteuses du chargement et du rendu sur les cartes de
+bom/ (et sur des cartes synthétiques quand il faut plus de volume).
+
+Usage:
+    python bench_ibom.py            # tous les benchmarks
+    python bench_ibom.py lzstring   # un benchmark précis
+"""
+
+import base64
+import collections
+import contextlib
+import csv
+import gc
+import io
+import json
+import math
+import os
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import time
+import types
+import tracemalloc
+from pathlib import Path
+
+import ibom_selector
+from ibom_selector import IBomParser, LZString
+
+try:
+    from lzstring import LZString as LZStringLib
+    HAS_LZSTRING = True
+except ImportError:
+    HAS_LZSTRING = False
+
+
+BOM_DIR = Path(__file__).parent / 'bom'
+BOARDS = [BOM_DIR / 'ibom.html', BOM_DIR / 'ibomFOCSTIM.html']
+
+
+# ==================== OUTILS ====================
+
+def timeit(func, repeat=3):
+    """Retourne (meilleur temps en secondes, résultat du dernier appel)"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        result = None
+        gc.collect()
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best, result
+
+
+def read_compressed(board):
+    """Extrait la chaîne base64 LZ-String d'un fichier iBOM"""
+    content = board.read_text(encoding='utf-8')
+    match = re.search(r'LZString\.decompressFromBase64\(["\']([^"\']+)["\']\)', content)
+    return match.group(1) if match else None
+
+
+def measure_peak(func):
+    """Retourne (pic mémoire Python en octets, résultat)
+    
+    tracemalloc ralentit fortement l'exécution: ne pas combiner avec timeit.
+    """
+    tracemalloc.start()
+    result = func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak, result
+
+
+def current_rss():
+    """RSS courant du processus en octets (Linux), sinon pic RSS"""
+    try:
+        with open('/proc/self/statm') as f:
+            import os
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except OSError:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def run_isolated(code):
+    """Exécute du code de mesure dans un processus neuf et retourne son
+    dernier print décodé en JSON (RSS non pollué par les autres mesures)"""
+    prelude = 'import json, sys, time\nsys.path.insert(0, %r)\nfrom bench_ibom import *\n' % str(Path(__file__).parent)
+    output = subprocess.run([sys.executable, '-c', prelude + code], capture_output=True,
+                            text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def write_uncompressed_board(board, path, copies=1):
+    """Écrit une version non compressée (et éventuellement agrandie) d'une carte"""
+    pcbdata = IBomParser(board, use_cache=False).parse().pcbdata
+    if copies > 1:
+        pcbdata = dict(pcbdata)
+        pcbdata['footprints'] = pcbdata['footprints'] * copies
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('<html><script>\nvar pcbdata = ')
+        json.dump(pcbdata, f)
+        f.write(';\nvar config = {};\n</script></html>')
+    return path
+
+
+SYNTH_VALUES = ['100nF', '10k', '4.7k', '1uF', '22pF', '0R', '10uF', '100k', '1k', '47nF']
+SYNTH_FOOTPRINTS = ['C_0603_1608Metric_Pad1.08x0.95mm_HandSolder', 'R_0603_1608Metric',
+                    'C_0402_1005Metric', 'R_0805_2012Metric', 'SOT-23']
+
+
+def synthetic_pcbdata(n_footprints, n_tracks=0, seed=1, width=200.0, height=150.0):
+    """Génère un pcbdata iBOM synthétique (footprints 2 pads, tracks, BOM)"""
+    rng = random.Random(seed)
+    footprints = []
+    fields = {}
+    groups = {}
+    for fp_id in range(n_footprints):
+        x = rng.uniform(0, width)
+        y = rng.uniform(0, height)
+        layer = 'F' if rng.random() < 0.7 else 'B'
+        prefix = 'C' if fp_id % 2 else 'R'
+        ref = f"{prefix}{fp_id + 1}"
+        footprints.append({
+            'ref': ref,
+            'bbox': {'pos': [x, y], 'relpos': [-0.8, -0.4], 'size': [1.6, 0.8], 'angle': 0.0},
+            'pads': [
+                {'pos': [x - 0.5, y], 'size': [0.6, 0.6], 'angle': 0.0, 'shape': 'rect',
+                 'type': 'smd', 'layers': [layer]},
+                {'pos': [x + 0.5, y], 'size': [0.6, 0.6], 'angle': 0.0, 'shape': 'rect',
+                 'type': 'smd', 'layers': [layer]},
+            ],
+            'drawings': [],
+            'layer': layer,
+        })
+        value = rng.choice(SYNTH_VALUES)
+        footprint = rng.choice(SYNTH_FOOTPRINTS)
+        fields[str(fp_id)] = [value, footprint, f"C{1000 + SYNTH_VALUES.index(value)}"]
+        groups.setdefault((value, footprint), []).append([ref, fp_id])
+
+    tracks = {'F': [], 'B': []}
+    for i in range(n_tracks):
+        # Pistes en chaînes de segments colinéaires, comme les exports iBOM
+        layer = 'F' if i % 3 else 'B'
+        if i % 20 == 0 or not tracks[layer]:
+            start = [rng.uniform(0, width), rng.uniform(0, height)]
+        else:
+            start = list(tracks[layer][-1]['end'])
+        end = [min(width, max(0.0, start[0] + rng.choice((-1.0, 0.0, 1.0)))),
+               min(height, max(0.0, start[1] + rng.choice((-1.0, 0.0, 1.0))))]
+        tracks[layer].append({'start': start, 'end': end, 'width': 0.25})
+
+    return {
+        'edges_bbox': {'minx': 0.0, 'miny': 0.0, 'maxx': width, 'maxy': height},
+        'edges': [
+            {'type': 'segment', 'start': [0.0, 0.0], 'end': [width, 0.0], 'width': 0.15},
+            {'type': 'segment', 'start': [width, 0.0], 'end': [width, height], 'width': 0.15},
+            {'type': 'segment', 'start': [width, height], 'end': [0.0, height], 'width': 0.15},
+            {'type': 'segment', 'start': [0.0, height], 'end': [0.0, 0.0], 'width': 0.15},
+        ],
+        'drawings': {'silkscreen': {'F': [], 'B': []}, 'fabrication': {'F': [], 'B': []}},
+        'footprints': footprints,
+        'tracks': tracks,
+        'metadata': {'title': 'synthetic', 'revision': '', 'company': '', 'date': ''},
+        'bom': {'both': list(groups.values()), 'skipped': [], 'fields': fields},
+    }
+
+
+def write_pcbdata_html(pcbdata, path):
+    """Écrit un fichier iBOM non compressé contenant pcbdata"""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('<html><script>\nvar config = {"fields": ["Value", "Footprint", "LCSC"]};\n')
+        f.write('var pcbdata = ')
+        json.dump(pcbdata, f)
+        f.write(';\n</script></html>')
+    return path
+
+
+def write_compressed_html(pcbdata, path):
+    """Écrit un fichier iBOM compressé LZ-String (paquet lzstring requis)"""
+    compressed = LZStringLib().compressToBase64(json.dumps(pcbdata, separators=(',', ':')))
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('<html><script>\nvar pcbdata = JSON.parse(LZString.decompressFromBase64("')
+        f.write(compressed)
+        f.write('"));\nvar config = {};\n</script></html>')
+    return path
+
+
+def synthetic_parser(n_footprints, n_tracks=0, seed=1):
+    """Parse une carte synthétique via le pipeline réel (sans cache)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_pcbdata_html(synthetic_pcbdata(n_footprints, n_tracks, seed),
+                                  Path(tmp) / f'synthetic_{n_footprints}.html')
+        return IBomParser(path, use_cache=False).parse()
+
+
+class CountingCanvas:
+    """Canvas sans affichage qui compte les commandes Tk et les éléments
+
+    Utilisé quand aucun écran n'est disponible (CI, SSH): les temps ne
+    couvrent alors que le travail Python des viewers, les compteurs donnent
+    les appels et éléments qu'aurait reçus le vrai canvas.
+    """
+
+    def __init__(self, width=900, height=700):
+        self.width = width
+        self.height = height
+        self.calls = collections.Counter()
+        self.items = {}
+        self.tags = collections.defaultdict(set)
+        self.pending = {}
+        self.idle = {}
+        self.bindings = collections.defaultdict(list)
+        self._next_id = 1
+
+    def winfo_width(self):
+        return self.width
+
+    def winfo_height(self):
+        return self.height
+
+    def _create(self, kind, tags):
+        self.calls['create'] += 1
+        item = self._next_id
+        self._next_id += 1
+        tags = (tags,) if isinstance(tags, str) else tuple(tags or ())
+        self.items[item] = (kind, tags)
+        for tag in tags:
+            self.tags[tag].add(item)
+        return item
+
+    def create_line(self, *args, tags=(), **kw):
+        return self._create('line', tags)
+
+    def create_rectangle(self, *args, tags=(), **kw):
+        return self._create('rectangle', tags)
+
+    def create_oval(self, *args, tags=(), **kw):
+        return self._create('oval', tags)
+
+    def create_polygon(self, *args, tags=(), **kw):
+        return self._create('polygon', tags)
+
+    def create_text(self, *args, tags=(), **kw):
+        return self._create('text', tags)
+
+    def find_withtag(self, spec):
+        if spec == 'all':
+            return tuple(self.items)
+        if isinstance(spec, int):
+            return (spec,) if spec in self.items else ()
+        sets = [self.tags.get(tag, set()) for tag in spec.split('&&')]
+        return tuple(sorted(set.intersection(*sets)))
+
+    def delete(self, spec):
+        self.calls['delete'] += 1
+        for item in self.find_withtag(spec):
+            for tag in self.items.pop(item)[1]:
+                self.tags[tag].discard(item)
+
+    def itemconfigure(self, spec, **kw):
+        self.calls['itemconfigure'] += 1
+        self.calls['items touched'] += len(self.find_withtag(spec))
+
+    itemconfig = itemconfigure
+
+    def tag_raise(self, spec, above=None):
+        self.calls['tag_raise'] += 1
+
+    def move(self, spec, dx, dy):
+        self.calls['move'] += 1
+        self.calls['items moved'] += len(self.find_withtag(spec))
+
+    def scale(self, spec, x, y, fx, fy):
+        self.calls['scale'] += 1
+        self.calls['items moved'] += len(self.find_withtag(spec))
+
+    def bind(self, sequence, func, add=None):
+        if not add:
+            self.bindings[sequence].clear()
+        self.bindings[sequence].append(func)
+
+    def resize(self, width, height):
+        """Redimensionne et émet <Configure> comme Tk"""
+        self.width, self.height = width, height
+        event = types.SimpleNamespace(width=width, height=height)
+        for func in self.bindings['<Configure>']:
+            func(event)
+
+    def after(self, ms, func, *args):
+        self._next_id += 1
+        self.pending[f'after#{self._next_id}'] = (func, args)
+        return f'after#{self._next_id}'
+
+    def after_idle(self, func, *args):
+        self._next_id += 1
+        self.idle[f'after#{self._next_id}'] = (func, args)
+        return f'after#{self._next_id}'
+
+    def after_cancel(self, after_id):
+        self.pending.pop(after_id, None)
+        self.idle.pop(after_id, None)
+
+    def update_idletasks(self):
+        """Exécute les after_idle() en attente, y compris ceux qu'ils planifient"""
+        while self.idle:
+            func, args = self.idle.pop(next(iter(self.idle)))
+            func(*args)
+
+    def update(self):
+        """Exécute les after() en attente (comme si leur délai était écoulé)"""
+        self.update_idletasks()
+        while self.pending:
+            func, args = self.pending.pop(next(iter(self.pending)))
+            func(*args)
+            self.update_idletasks()
+
+
+@contextlib.contextmanager
+def bench_canvas(width=900, height=700):
+    """Vrai tk.Canvas si un écran est disponible, CountingCanvas sinon"""
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+    except Exception:  # Pas de tkinter ou pas de $DISPLAY
+        print(f"(pas d'affichage: CountingCanvas {width}x{height}, temps hors rendu Tk)")
+        yield CountingCanvas(width, height)
+        return
+    root.geometry(f"{width}x{height}")
+    canvas = tk.Canvas(root, width=width, height=height, highlightthickness=0)
+    canvas.pack(fill=tk.BOTH, expand=True)
+    root.update()
+    try:
+        yield canvas
+    finally:
+        root.destroy()
+
+
+def count_items(canvas, spec='all'):
+    return len(canvas.find_withtag(spec))
+
+
+def legacy_model(parser):
+    """Copie du modèle sous l'ancienne forme (listes de dicts) pour les legacy_*"""
+    return types.SimpleNamespace(components=[c.as_dict() for c in parser.components],
+                                 bom_data=[e.as_dict() for e in parser.bom_data])
+
+
+def legacy_get_bom_for_ref(parser, ref, fp_id=None):
+    """Ancienne recherche BOM linéaire"""
+    for bom_entry in parser.bom_data:
+        if bom_entry['ref'] == ref:
+            return bom_entry
+        if fp_id is not None and bom_entry.get('id') == fp_id:
+            return bom_entry
+    return {'ref': ref, 'value': '', 'footprint': '', 'lcsc': '', 'id': fp_id}
+
+
+def legacy_components_in_rect(parser, x1, y1, x2, y2, join=True):
+    """Ancienne sélection rectangle: balayage Python + jointure BOM linéaire"""
+    min_x, max_x = min(x1, x2), max(x1, x2)
+    min_y, max_y = min(y1, y2), max(y1, y2)
+    selected = []
+    for comp in parser.components:
+        if min_x <= comp['x'] <= max_x and min_y <= comp['y'] <= max_y:
+            if not join:
+                selected.append(comp)
+                continue
+            bom_info = legacy_get_bom_for_ref(parser, comp['ref'], comp.get('id'))
+            selected.append({
+                'ref': comp['ref'],
+                'value': bom_info.get('value', ''),
+                'footprint': bom_info.get('footprint', ''),
+                'lcsc': bom_info.get('lcsc', ''),
+                'x': comp['x'],
+                'y': comp['y'],
+                'layer': comp['layer']
+            })
+    return selected
+
+
+def legacy_read_pcbdata(path):
+    """Ancienne localisation: lecture complète en str + regex"""
+    with open(path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    lz_match = re.search(r'LZString\.decompressFromBase64\(["\']([^"\']+)["\']\)', content)
+    if lz_match:
+        return json.loads(LZString.decompress_from_base64(lz_match.group(1)))
+    pcbdata_match = re.search(r'var\s+pcbdata\s*=\s*(\{.*?\});', content, re.DOTALL)
+    return json.loads(pcbdata_match.group(1))
+
+
+def new_read_pcbdata(path):
+    """Nouvelle localisation: mmap + regex unique + raw_decode"""
+    import mmap
+    parser = IBomParser(path, use_cache=False)
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+        return parser._read_pcbdata(buf)
+
+
+def legacy_decompress_from_base64(compressed):
+    """Ancien décodeur bit à bit (référence pour les comparaisons)"""
+    key_str = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/="
+    base_reverse_dict = {char: i for i, char in enumerate(key_str)}
+    length = len(compressed)
+    get_next_value = lambda index: base_reverse_dict.get(compressed[index], 0)
+    reset_value = 32
+
+    dictionary = {0: 0, 1: 1, 2: 2}
+    enlargeIn = 4
+    dictSize = 4
+    numBits = 3
+    result = []
+
+    data_val = get_next_value(0)
+    data_position = reset_value
+    data_index = 1
+
+    def read_bits(count):
+        nonlocal data_val, data_position, data_index
+        bits = 0
+        maxpower = 2 ** count
+        power = 1
+        while power != maxpower:
+            resb = data_val & data_position
+            data_position >>= 1
+            if data_position == 0:
+                data_position = reset_value
+                data_val = get_next_value(data_index)
+                data_index += 1
+            bits |= (1 if resb > 0 else 0) * power
+            power <<= 1
+        return bits
+
+    next_val = read_bits(2)
+    if next_val == 0:
+        c = chr(read_bits(8))
+    elif next_val == 1:
+        c = chr(read_bits(16))
+    else:
+        return ""
+
+    dictionary[3] = c
+    w = c
+    result.append(c)
+
+    while True:
+        if data_index > length:
+            return ""
+        c = read_bits(numBits)
+        if c == 0:
+            dictionary[dictSize] = chr(read_bits(8))
+            dictSize += 1
+            c = dictSize - 1
+            enlargeIn -= 1
+        elif c == 1:
+            dictionary[dictSize] = chr(read_bits(16))
+            dictSize += 1
+            c = dictSize - 1
+            enlargeIn -= 1
+        elif c == 2:
+            return "".join(result)
+
+        if enlargeIn == 0:
+            enlargeIn = 2 ** numBits
+            numBits += 1
+
+        if c in dictionary:
+            entry = dictionary[c]
+        elif c == dictSize:
+            entry = w + w[0]
+        else:
+            return None
+
+        result.append(entry)
+        dictionary[dictSize] = w + entry[0]
+        dictSize += 1
+        enlargeIn -= 1
+
+        if enlargeIn == 0:
+            enlargeIn = 2 ** numBits
+            numBits += 1
+
+        w = entry
+
+
+def legacy_lz_text(compressed):
+    """Décodeur par masques précédent: dictionnaire de str et texte complet
+    assemblé (référence pour le benchmark decode)"""
+    compressed = compressed.rstrip('=')
+    if len(compressed) % 4 == 1:
+        compressed += 'A'
+    padding = '=' * (-len(compressed) % 4)
+    stream = base64.b64decode(compressed + padding).translate(LZString._BIT_REVERSE)
+    from_bytes = int.from_bytes
+    stream_len = len(stream)
+    data_index = 0
+    data_bits = 0  # Bits disponibles dans le tampon
+    buffer = 0
+
+    def read_bits(count):
+        nonlocal data_index, data_bits, buffer
+        while data_bits < count:
+            buffer |= from_bytes(stream[data_index:data_index + 8], 'little') << data_bits
+            data_bits += 64
+            data_index += 8
+        value = buffer & ((1 << count) - 1)
+        buffer >>= count
+        data_bits -= count
+        return value
+
+    # Entrées 0-2 réservées aux codes de contrôle; le dictionnaire est une
+    # liste indexée par code et chaque entrée est construite en une seule
+    # concaténation à partir de l'entrée précédente.
+    dictionary = ['', '', '']
+    enlargeIn = 4
+    numBits = 3
+
+    next_val = read_bits(2)
+    if next_val == 0:
+        c = chr(read_bits(8))
+    elif next_val == 1:
+        c = chr(read_bits(16))
+    else:
+        return ""
+
+    dictionary.append(c)
+    w = c
+    result = [c]
+    append_result = result.append
+    append_entry = dictionary.append
+
+    while True:
+        # Lecture inline du code (chemin chaud)
+        if data_bits < numBits:
+            if data_index >= stream_len + 8:
+                return ""
+            buffer |= from_bytes(stream[data_index:data_index + 8], 'little') << data_bits
+            data_bits += 64
+            data_index += 8
+        c = buffer & ((1 << numBits) - 1)
+        buffer >>= numBits
+        data_bits -= numBits
+
+        if c < 3:
+            if c == 2:
+                return "".join(result)
+            append_entry(chr(read_bits(8 if c == 0 else 16)))
+            c = len(dictionary) - 1
+            enlargeIn -= 1
+            if enlargeIn == 0:
+                enlargeIn = 1 << numBits
+                numBits += 1
+
+        dict_size = len(dictionary)
+        if c < dict_size:
+            entry = dictionary[c]
+        elif c == dict_size:
+            entry = w + w[0]
+        else:
+            return None
+
+        append_result(entry)
+        append_entry(w + entry[0])
+        enlargeIn -= 1
+
+        if enlargeIn == 0:
+            enlargeIn = 1 << numBits
+            numBits += 1
+
+        w = entry
+
+
+# ==================== BENCHMARKS ====================
+
+def bench_lzstring():
+    """Décodeur LZ-String: intégré vs ancien décodeur vs paquet lzstring"""
+    for board in BOARDS:
+        compressed = read_compressed(board)
+        if not compressed:
+            print(f"{board.name}: pas de données compressées")
+            continue
+
+        t_new, decoded = timeit(lambda: LZString.decompress_from_base64(compressed))
+        t_old, reference = timeit(lambda: legacy_decompress_from_base64(compressed))
+        assert decoded == reference, "Sortie différente de l'ancien décodeur"
+
+        print(f"{board.name} ({len(compressed)} car. base64 -> {len(decoded)} car.)")
+        print(f"  intégré          : {t_new * 1000:8.1f} ms")
+        print(f"  ancien (bit/bit) : {t_old * 1000:8.1f} ms  (x{t_old / t_new:.1f})")
+        if HAS_LZSTRING:
+            lz = LZStringLib()
+            t_lib, _ = timeit(lambda: lz.decompressFromBase64(compressed), repeat=1)
+            print(f"  paquet lzstring  : {t_lib * 1000:8.1f} ms  (x{t_lib / t_new:.1f})")
+        else:
+            print("  paquet lzstring  : non installé")
+
+
+def bench_cache():
+    """Démarrage: parse complet vs cache disque (miss puis hit)"""
+    for board in BOARDS:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            t_full, parser = timeit(lambda: IBomParser(board, use_cache=False).parse())
+            t_miss, _ = timeit(lambda: IBomParser(board, cache_dir=cache_dir).parse(), repeat=1)
+            t_hit, cached = timeit(lambda: IBomParser(board, cache_dir=cache_dir).parse())
+            assert cached.from_cache, "Le cache n'a pas été utilisé"
+            assert cached._snapshot_model() == parser._snapshot_model(), "Modèle en cache différent"
+            size = sum(p.stat().st_size for p in Path(cache_dir).iterdir())
+
+        print(f"{board.name} (entrée de cache: {size / 1024:.0f} Ko)")
+        print(f"  sans cache      : {t_full * 1000:8.1f} ms")
+        print(f"  miss + écriture : {t_miss * 1000:8.1f} ms")
+        print(f"  hit             : {t_hit * 1000:8.1f} ms  (x{t_full / t_hit:.1f})")
+
+
+def bench_locator():
+    """Localisation de pcbdata: str + regex vs mmap + raw_decode"""
+    with tempfile.TemporaryDirectory() as tmp:
+        inputs = list(BOARDS)
+        inputs.append(write_uncompressed_board(BOARDS[0], Path(tmp) / 'uncompressed_x20.html', copies=20))
+
+        for path in inputs:
+            size_mb = path.stat().st_size / 1e6
+            t_old, old = timeit(lambda: legacy_read_pcbdata(path))
+            t_new, new = timeit(lambda: new_read_pcbdata(path))
+            assert old == new, "pcbdata différent"
+            del old, new
+            peak_old, _ = measure_peak(lambda: legacy_read_pcbdata(path))
+            peak_new, _ = measure_peak(lambda: new_read_pcbdata(path))
+            print(f"{path.name} ({size_mb:.1f} Mo)")
+            print(f"  str + regex      : {t_old * 1000:8.1f} ms, pic {peak_old / 1e6:6.1f} Mo")
+            print(f"  mmap + raw_decode: {t_new * 1000:8.1f} ms, pic {peak_new / 1e6:6.1f} Mo")
+
+
+LAZY_PROBE = """
+start = time.perf_counter()
+parser = IBomParser(%(board)r, cache_dir=%(cache_dir)r, lazy=%(lazy)r).parse()
+result = {'parse': time.perf_counter() - start, 'rss_load': current_rss()}
+for field in IBomParser.LAZY_FIELDS:
+    start = time.perf_counter()
+    getattr(parser, field)
+    result[field] = time.perf_counter() - start
+result['rss_all'] = current_rss()
+print(json.dumps(result))
+"""
+
+
+def bench_lazy():
+    """Géométrie lazy vs eager: temps avant interaction et RSS (cache chaud)"""
+    for board in BOARDS:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            IBomParser(board, cache_dir=cache_dir).parse()  # Remplir le cache
+            print(f"{board.name}")
+            for lazy in (False, True):
+                r = run_isolated(LAZY_PROBE % {'board': str(board), 'cache_dir': cache_dir, 'lazy': lazy})
+                layers = ', '.join(f"{field} {r[field] * 1000:.1f} ms" for field in IBomParser.LAZY_FIELDS)
+                print(f"  {'lazy ' if lazy else 'eager'}: prêt en {r['parse'] * 1000:6.1f} ms, "
+                      f"RSS {r['rss_load'] / 1e6:5.1f} Mo -> {r['rss_all'] / 1e6:5.1f} Mo "
+                      f"après 1er accès ({layers})")
+
+
+def bench_store():
+    """Sélection rectangle: balayage de dicts vs masques sur le stockage en colonnes"""
+    print(f"NumPy: {'oui' if ibom_selector.HAS_NUMPY else 'non (repli Python: grille + masques sur les candidats)'}")
+    for n in (1000, 10000, 100000):
+        parser = synthetic_parser(n)
+        legacy = legacy_model(parser)
+        store = parser.component_store
+        rect = (50.0, 40.0, 150.0, 110.0)  # ~23 % de la carte
+        status = {entry.key: 'validated' for entry in parser.bom_data[::3]}
+
+        t_scan, hits = timeit(lambda: legacy_components_in_rect(legacy, *rect, join=False))
+        t_mask, indices = timeit(lambda: store.select(rect))
+        t_layer, _ = timeit(lambda: store.select(rect, 'B'))
+        t_status, _ = timeit(lambda: store.select(rect, component_status=status, status=None))
+        t_rows, rows = timeit(lambda: parser.get_components_in_rect(*rect))
+        assert len(indices) == len(hits) == len(rows)
+
+        print(f"{n} footprints ({len(hits)} dans le rectangle)")
+        print(f"  balayage dicts (sans jointure) : {t_scan * 1000:8.2f} ms")
+        if n <= 10000:
+            t_old, _ = timeit(lambda: legacy_components_in_rect(legacy, *rect), repeat=1)
+            print(f"  ancien complet (jointure O(n)) : {t_old * 1000:8.2f} ms")
+        else:
+            print(f"  ancien complet (jointure O(n)) : trop long (quadratique)")
+        print(f"  masque rectangle -> indices    : {t_mask * 1000:8.2f} ms")
+        print(f"  masque rectangle + couche      : {t_layer * 1000:8.2f} ms")
+        print(f"  masque rectangle + statut      : {t_status * 1000:8.2f} ms")
+        print(f"  get_components_in_rect (joint) : {t_rows * 1000:8.2f} ms")
+
+
+def legacy_components_by_refs(parser, refs):
+    """Ancien rechargement d'historique: get_bom_for_ref linéaire par composant"""
+    selected = []
+    for comp in parser.components:
+        if comp.get('ref') in refs:
+            bom_info = legacy_get_bom_for_ref(parser, comp['ref'], comp.get('id'))
+            selected.append({
+                'ref': comp['ref'],
+                'value': bom_info.get('value', ''),
+                'footprint': bom_info.get('footprint', ''),
+                'lcsc': bom_info.get('lcsc', ''),
+                'x': comp['x'],
+                'y': comp['y'],
+                'layer': comp['layer']
+            })
+    return selected
+
+
+def legacy_fields(rows):
+    """Lignes réduites aux champs de l'ancien format (sans mpn ni extra)"""
+    return [{key: row[key] for key in ('ref', 'value', 'footprint', 'lcsc', 'x', 'y', 'layer')}
+            for row in rows]
+
+
+def bench_bom_index():
+    """Sélection de toute la carte: recherche BOM linéaire vs index"""
+    n = 20000
+    parser = synthetic_parser(n)
+    legacy = legacy_model(parser)
+    bbox = parser.board_bbox
+    rect = (bbox['minx'], bbox['miny'], bbox['maxx'], bbox['maxy'])
+    refs = set(parser.component_store.refs)
+
+    t_old, old = timeit(lambda: legacy_components_in_rect(legacy, *rect), repeat=1)
+    t_new, new = timeit(lambda: parser.get_components_in_rect(*rect))
+    assert old == legacy_fields(new), "Sélection différente"
+    t_hist_old, old = timeit(lambda: legacy_components_by_refs(legacy, refs), repeat=1)
+    t_hist_new, new = timeit(lambda: parser.get_components_by_refs(refs))
+    assert old == legacy_fields(new), "Rechargement d'historique différent"
+
+    print(f"{n} footprints, sélection complète")
+    print(f"  rectangle, avant : {t_old * 1000:9.1f} ms")
+    print(f"  rectangle, après : {t_new * 1000:9.1f} ms  (x{t_old / t_new:.0f})")
+    print(f"  historique, avant: {t_hist_old * 1000:9.1f} ms")
+    print(f"  historique, après: {t_hist_new * 1000:9.1f} ms  (x{t_hist_old / t_hist_new:.0f})")
+
+
+def scan_boxes(boxes, x1, y1, x2, y2):
+    """Balayage linéaire de référence sur des boîtes (minx, miny, maxx, maxy)"""
+    return [i for i, (bx1, by1, bx2, by2) in enumerate(boxes)
+            if bx1 <= x2 and bx2 >= x1 and by1 <= y2 and by2 >= y1]
+
+
+def bench_spatial():
+    """Requêtes rectangle/point/kNN: balayage linéaire vs grille spatiale"""
+    n, n_tracks = 20000, 50000
+    parser = synthetic_parser(n, n_tracks)
+    legacy = legacy_model(parser)
+    comps = parser.components
+
+    t_build, _ = timeit(lambda: [parser._build_spatial(kind) for kind in parser.SPATIAL_KINDS], repeat=1)
+    pads = [(fp_id, pad) for fp_id, fp in enumerate(parser.footprints) for pad in fp['pads']]
+    pad_boxes = [ibom_selector.pad_bounds(pad) for _, pad in pads]
+    tracks = [(layer, t) for layer, lt in parser.tracks.items() for t in lt]
+    track_boxes = [ibom_selector.track_bounds(t) for _, t in tracks]
+    print(f"{n} footprints, {len(pads)} pads, {len(tracks)} pistes")
+    print(f"  construction des 4 index : {t_build * 1000:8.1f} ms")
+
+    # Zone de sélection fine, fenêtre à zoom x10, carte entière
+    for label, rect in (("5x5 mm", (100.0, 70.0, 105.0, 75.0)),
+                        ("vue zoom x10", (90.0, 67.5, 110.0, 82.5)),
+                        ("carte entière", (0.0, 0.0, 200.0, 150.0))):
+        t_comp_scan, old = timeit(lambda: legacy_components_in_rect(legacy, *rect, join=False))
+        t_comp_grid, new = timeit(lambda: parser.spatial_index('components').query_ids(*rect))
+        assert [c['ref'] for c in old] == [comps[i]['ref'] for i in new]
+        t_pad_scan, old = timeit(lambda: scan_boxes(pad_boxes, *rect))
+        t_pad_grid, new = timeit(lambda: parser.query_rect('pads', *rect))
+        assert [pads[i][1] for i in old] == [pad for _, pad in new]
+        t_trk_scan, old = timeit(lambda: scan_boxes(track_boxes, *rect))
+        t_trk_grid, new = timeit(lambda: parser.query_rect('tracks', *rect))
+        assert len(old) == len(new)
+        print(f"  rectangle {label} ({len(new)} pistes):")
+        print(f"    composants balayage/grille : {t_comp_scan * 1000:8.2f} / {t_comp_grid * 1000:8.2f} ms")
+        print(f"    pads       balayage/grille : {t_pad_scan * 1000:8.2f} / {t_pad_grid * 1000:8.2f} ms")
+        print(f"    pistes     balayage/grille : {t_trk_scan * 1000:8.2f} / {t_trk_grid * 1000:8.2f} ms")
+
+    points = [(c['x'] + 0.1, c['y'] - 0.1) for c in comps[:200]]
+    t_pt_scan, old = timeit(lambda: [scan_boxes(pad_boxes, x, y, x, y) for x, y in points])
+    t_pt_grid, new = timeit(lambda: [parser.query_point('pads', x, y) for x, y in points])
+    assert sum(map(len, old)) == sum(map(len, new))
+    t_knn_scan, _ = timeit(lambda: [sorted(range(n), key=lambda i: math.hypot(comps[i]['x'] - x, comps[i]['y'] - y))[:5]
+                                    for x, y in points[:20]], repeat=1)
+    t_knn_grid, _ = timeit(lambda: [parser.nearest('components', x, y, 5) for x, y in points[:20]])
+    print(f"  point sur pads (x200)     : {t_pt_scan * 1000:8.1f} / {t_pt_grid * 1000:8.2f} ms")
+    print(f"  5 plus proches (x20)      : {t_knn_scan * 1000:8.1f} / {t_knn_grid * 1000:8.2f} ms")
+
+
+def bench_batch():
+    """Export batch: débit du pool de processus selon le nombre de processus"""
+    n_boards, n = 8, 5000
+    cores = os.cpu_count() or 1
+    with tempfile.TemporaryDirectory() as tmp:
+        files = [write_pcbdata_html(synthetic_pcbdata(n, 2000, seed=i), Path(tmp) / f'board_{i}.html')
+                 for i in range(n_boards)]
+        print(f"{n_boards} cartes de {n} footprints, {cores} cœur(s)")
+        t_base = None
+        for jobs in sorted({1, 2, 4, cores}):
+            t, results = timeit(lambda: ibom_selector.run_batch(files, Path(tmp) / 'out', jobs=jobs,
+                                                                use_cache=False), repeat=1)
+            assert all(r['ok'] for r in results)
+            t_base = t_base or t
+            print(f"  {jobs} processus: {t * 1000:8.0f} ms  "
+                  f"({n_boards / t:5.1f} cartes/s, x{t_base / t:.2f})")
+        if cores < 4:
+            print("  (pas assez de cœurs ici pour mesurer la montée en charge)")
+
+
+def legacy_load_lcsc(csv_path):
+    """Ancien chargement LCSC: lecture complète par encodage essayé + DictReader"""
+    lcsc_data = {}
+    content = None
+    for encoding in ['utf-8-sig', 'utf-16', 'utf-16-le', 'utf-8', 'latin-1', 'cp1252']:
+        try:
+            with open(csv_path, 'r', encoding=encoding) as f:
+                content = f.read()
+                break
+        except (UnicodeDecodeError, UnicodeError):
+            continue
+    if '\t' in content[:2048]:
+        delimiter = '\t'
+    elif ';' in content[:2048]:
+        delimiter = ';'
+    else:
+        delimiter = ','
+    reader = csv.DictReader(io.StringIO(content), delimiter=delimiter)
+    headers = reader.fieldnames or []
+    designator_col = lcsc_col = None
+    for h in headers:
+        h_lower = h.strip().strip('"').strip().lower()
+        if h_lower == 'designator':
+            designator_col = h
+        elif h_lower in ('lcsc', 'lcsc part number'):
+            lcsc_col = h
+    for row in reader:
+        lcsc_code = row.get(lcsc_col, '').strip()
+        if lcsc_code:
+            for ref in row.get(designator_col, '').split(','):
+                ref = ref.strip()
+                if ref:
+                    lcsc_data[ref] = lcsc_code
+    return lcsc_data
+
+
+def write_lcsc_csv(path, n_rows, encoding='utf-8-sig'):
+    """CSV LCSC synthétique (1 à 4 désignateurs par ligne)"""
+    rng = random.Random(n_rows)
+    ref = 0
+    with open(path, 'w', encoding=encoding, newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Comment', 'Designator', 'Footprint', 'LCSC'])
+        for i in range(n_rows):
+            refs = []
+            for _ in range(rng.randint(1, 4)):
+                ref += 1
+                refs.append(f"R{ref}")
+            writer.writerow([rng.choice(SYNTH_VALUES), ', '.join(refs),
+                             rng.choice(SYNTH_FOOTPRINTS), f"C{rng.randint(1000, 999999)}"])
+    return path
+
+
+def bench_lcsc():
+    """Chargement CSV LCSC: essais d'encodages + DictReader vs passage unique + index annexe"""
+    LcscIndex = ibom_selector.LcscIndex
+    n = 50000
+    with tempfile.TemporaryDirectory() as tmp:
+        for encoding in ('utf-8-sig', 'utf-16'):
+            path = write_lcsc_csv(Path(tmp) / f'lcsc_{encoding}.csv', n, encoding)
+            with contextlib.redirect_stdout(io.StringIO()):
+                t_old, old = timeit(lambda: legacy_load_lcsc(path))
+                t_parse, new = timeit(lambda: LcscIndex.load(path, use_sidecar=False))
+                assert old == new, "Index LCSC différent"
+                LcscIndex.load(path)  # écrit l'annexe
+
+                def from_sidecar():
+                    LcscIndex._memory.clear()
+                    return LcscIndex.load(path)
+                t_sidecar, hit = timeit(from_sidecar)
+                t_memory, _ = timeit(lambda: LcscIndex.load(path))
+                assert hit == old
+            size = path.stat().st_size / 1e6
+            print(f"{n} lignes, {len(new)} références, {encoding} ({size:.1f} Mo)")
+            print(f"  ancien (encodages + DictReader): {t_old * 1000:8.1f} ms")
+            print(f"  passage unique                 : {t_parse * 1000:8.1f} ms  (x{t_old / t_parse:.1f})")
+            print(f"  index annexe (CSV inchangé)    : {t_sidecar * 1000:8.1f} ms  (x{t_old / t_sidecar:.1f})")
+            print(f"  index en mémoire (rechargement): {t_memory * 1000:8.1f} ms  (x{t_old / t_memory:.0f})")
+
+
+def bench_watch():
+    """Surveillance: coût d'un tick au repos et application d'un diff de carte"""
+    n = 20000
+    pcbdata = synthetic_pcbdata(n)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_pcbdata_html(pcbdata, Path(tmp) / 'board.html')
+        old = IBomParser(str(path), use_cache=False).parse()
+
+        class IdleRoot:
+            def after(self, ms, func):
+                return None
+        watcher = ibom_selector.FileWatcher(IdleRoot(), lambda paths: None)
+        watcher.watch([path])
+        t_tick, _ = timeit(watcher._poll, repeat=100)
+
+        # Ré-export: 1 % des composants déplacés ou changés de valeur
+        for i in range(0, n, 100):
+            pcbdata['footprints'][i]['bbox']['pos'][0] += 0.5
+            pcbdata['bom']['fields'][str(i + 1)][0] = '4.7k'
+        write_pcbdata_html(pcbdata, path)
+        new = IBomParser(str(path), use_cache=False).parse()
+
+    rect = (50.0, 40.0, 150.0, 110.0)
+    selected = old.get_components_in_rect(*rect)
+    status = {ibom_selector.component_key(c): 'validated' for c in selected[::3]}
+
+    def apply():
+        diff = ibom_selector.diff_components(old.get_all_components(), new.get_all_components())
+        sel = ibom_selector.apply_diff_to_selection(selected, diff, rect)
+        ibom_selector.carry_over_status(dict(status), diff)
+        return diff, sel
+    t_apply, (diff, sel) = timeit(apply)
+    assert sorted(c['ref'] for c in sel) == sorted(c['ref'] for c in new.get_components_in_rect(*rect))
+
+    print(f"{n} footprints, {len(diff['changed'])} modifiés, {len(selected)} sélectionnés")
+    print(f"  tick de surveillance au repos : {t_tick * 1e6:8.1f} µs (1 stat/s)")
+    print(f"  diff + sélection + statuts    : {t_apply * 1000:8.1f} ms")
+
+
+def legacy_extract_model(pcbdata, lcsc_data):
+    """Ancien modèle: un dict par composant et par ligne BOM, chaînes non partagées"""
+    components = []
+    for fp_id, fp in enumerate(pcbdata.get('footprints', [])):
+        bbox = fp.get('bbox', {})
+        pos = bbox.get('pos', [0, 0])
+        components.append({'ref': fp.get('ref', ''), 'id': fp_id, 'x': pos[0], 'y': pos[1],
+                           'layer': fp.get('layer', 'F'), 'bbox': bbox})
+    bom_data = []
+    fields_data = pcbdata['bom'].get('fields', {})
+    for group in pcbdata['bom'].get('both', []):
+        for ref_name, fp_id in group:
+            fields = fields_data.get(str(fp_id), [])
+            value = (fields[0] if fields else '') or ''
+            footprint = (fields[1] if len(fields) > 1 else '') or ''
+            lcsc = next((f for f in fields if isinstance(f, str) and len(f) > 1
+                         and f.startswith('C') and f[1:].isdigit()), '')
+            bom_data.append({'ref': ref_name, 'id': fp_id, 'value': value,
+                             'footprint': footprint, 'lcsc': lcsc or lcsc_data.get(ref_name, '')})
+    by_ref = {}
+    for entry in bom_data:
+        by_ref.setdefault(entry['ref'], entry)
+    rows = [{'ref': c['ref'], 'value': by_ref.get(c['ref'], {}).get('value', ''),
+             'footprint': by_ref.get(c['ref'], {}).get('footprint', ''),
+             'lcsc': by_ref.get(c['ref'], {}).get('lcsc', ''),
+             'x': c['x'], 'y': c['y'], 'layer': c['layer']} for c in components]
+    return components, bom_data, rows
+
+
+RECORDS_PROBE = """
+import gc, tracemalloc
+tracemalloc.start()
+parser = IBomParser(%(board)r, use_cache=False).parse()
+if %(dicts)r:
+    components, bom_data, rows = legacy_extract_model(parser.pcbdata, parser.lcsc_data)
+    parser.components, parser.bom_data = components, bom_data
+else:
+    rows = parser.get_all_components()
+# Zone d'historique: copie des champs de chaque composant sélectionné
+history = [{'ref': r['ref'], 'value': r['value'], 'footprint': r['footprint'], 'lcsc': r['lcsc']}
+           for r in rows]
+# Sans pcbdata ni index; puis sans la géométrie (modèle BOM seul)
+parser.pcbdata = None
+parser.component_store = None
+parser._spatial = {}
+gc.collect()
+model, _ = tracemalloc.get_traced_memory()
+parser.footprints = parser.tracks = parser.drawings = parser.edges = []
+gc.collect()
+print(json.dumps({'model': tracemalloc.get_traced_memory()[0], 'total': model, 'rss': current_rss(),
+                  'components': len(parser.components)}))
+"""
+
+
+def bench_records():
+    """Modèle BOM/composants: dicts vs enregistrements __slots__ à chaînes partagées"""
+    with tempfile.TemporaryDirectory() as tmp:
+        synthetic = write_pcbdata_html(synthetic_pcbdata(20000), Path(tmp) / 'synthetic_20000.html')
+        for board in BOARDS + [synthetic]:
+            old = run_isolated(RECORDS_PROBE % {'board': str(board), 'dicts': True})
+            new = run_isolated(RECORDS_PROBE % {'board': str(board), 'dicts': False})
+            print(f"{board.name} ({new['components']} composants)")
+            print(f"  modèle BOM + sélection + historique: {old['model'] / 1e6:6.2f} Mo -> "
+                  f"{new['model'] / 1e6:6.2f} Mo ({(1 - new['model'] / old['model']) * 100:.0f} % de moins)")
+            print(f"  tas Python après chargement        : {old['total'] / 1e6:6.2f} Mo -> {new['total'] / 1e6:6.2f} Mo")
+            print(f"  RSS après chargement               : {old['rss'] / 1e6:6.1f} Mo -> {new['rss'] / 1e6:6.1f} Mo")
+
+
+SLIM_PROBE = """
+import gc, tracemalloc
+tracemalloc.start()
+parser = IBomParser(%(board)r, cache_dir=%(cache_dir)r, use_cache=%(cache_dir)r is not None,
+                    lazy=%(lazy)r, slim=%(slim)r).parse()
+gc.collect()
+steady, peak = tracemalloc.get_traced_memory()
+print(json.dumps({'peak': peak, 'steady': steady, 'rss': current_rss(),
+                  'from_cache': parser.from_cache}))
+"""
+
+
+def bench_slim():
+    """Modèle complet vs compact (pcbdata libéré): pic et régime établi tracemalloc"""
+    with tempfile.TemporaryDirectory() as tmp:
+        synthetic = write_pcbdata_html(synthetic_pcbdata(20000, 20000), Path(tmp) / 'synthetic_20000.html')
+        for board in BOARDS + [synthetic]:
+            print(board.name)
+            cache_dir = str(Path(tmp) / f'cache_{board.stem}')
+            # Parse complet, puis hit du cache (géométrie décodée)
+            for label, cache, lazy in (("parse sans cache", None, False), ("hit du cache", cache_dir, False)):
+                if cache:
+                    IBomParser(str(board), cache_dir=cache).parse()
+                full = run_isolated(SLIM_PROBE % {'board': str(board), 'cache_dir': cache,
+                                                  'lazy': lazy, 'slim': False})
+                slim = run_isolated(SLIM_PROBE % {'board': str(board), 'cache_dir': cache,
+                                                  'lazy': lazy, 'slim': True})
+                print(f"  {label}:")
+                print(f"    pic tas Python   : {full['peak'] / 1e6:7.2f} Mo -> {slim['peak'] / 1e6:7.2f} Mo")
+                print(f"    régime établi    : {full['steady'] / 1e6:7.2f} Mo -> {slim['steady'] / 1e6:7.2f} Mo "
+                      f"({(1 - slim['steady'] / full['steady']) * 100:.0f} % de moins)")
+                print(f"    RSS              : {full['rss'] / 1e6:7.1f} Mo -> {slim['rss'] / 1e6:7.1f} Mo")
+
+
+DECODE_PROBE = """
+import gc, tracemalloc
+compressed = read_compressed(Path(%(board)r))
+mode = %(mode)r
+
+def run():
+    if mode == 'before':
+        return json.loads(legacy_lz_text(compressed))
+    return json.loads(LZString.decompress_from_base64(compressed))
+
+elapsed, _ = timeit(run, repeat=2)
+gc.collect()
+tracemalloc.start()
+pcbdata = run()
+gc.collect()
+model, peak = tracemalloc.get_traced_memory()
+print(json.dumps({'time': elapsed, 'peak': peak, 'model': model,
+                  'footprints': len(pcbdata['footprints'])}))
+"""
+
+
+def bench_decode():
+    """pcbdata compressé: dictionnaire de str vs tampon (offset, longueur), puis json.loads"""
+    modes = (('before', "dictionnaire de str"), ('text', "tampon (offset, longueur)"))
+    with tempfile.TemporaryDirectory() as tmp:
+        boards = list(BOARDS)
+        if HAS_LZSTRING:
+            boards.append(write_compressed_html(synthetic_pcbdata(5000, 10000),
+                                                Path(tmp) / 'synthetic_5000.html'))
+        else:
+            print("(paquet lzstring absent: pas de carte synthétique compressée)")
+        for board in boards:
+            if not read_compressed(board):
+                print(f"{board.name}: pas de données compressées")
+                continue
+            results = {mode: run_isolated(DECODE_PROBE % {'board': str(board), 'mode': mode})
+                       for mode, _ in modes}
+            print(f"{board.name} ({results['text']['footprints']} footprints, "
+                  f"modèle pcbdata {results['text']['model'] / 1e6:.1f} Mo)")
+            for mode, label in modes:
+                r = results[mode]
+                print(f"  {label:26s}: {r['time'] * 1000:7.0f} ms, pic {r['peak'] / 1e6:6.1f} Mo "
+                      f"(x{r['peak'] / r['model']:.1f} le modèle)")
+
+
+
+def legacy_normalize_value(value):
+    """Ancien normalize_value: cinq re.sub non précompilés à chaque appel"""
+    if not value:
+        return ''
+    normalized = value.strip()
+    normalized = re.sub(r'[ΩΩ]', '', normalized)
+    normalized = re.sub(r'\s*[Oo][Hh][Mm]\s*', '', normalized)
+    if re.match(r'^\d+R$', normalized, re.IGNORECASE):
+        normalized = re.sub(r'R$', '', normalized, flags=re.IGNORECASE)
+    if re.match(r'^\d+R\d+$', normalized, re.IGNORECASE):
+        normalized = re.sub(r'R', '.', normalized, flags=re.IGNORECASE)
+    normalized = re.sub(r'\s+', '', normalized).strip()
+    return normalized.replace('K', 'k')
+
+
+def legacy_key(comp):
+    return (legacy_normalize_value(comp.get('value', '')), comp.get('footprint', ''), comp.get('lcsc', ''))
+
+
+def ref_to_status(components, component_status, key_func):
+    """Mapping ref -> statut construit à chaque redessin du PCB principal"""
+    result = {}
+    for comp in components:
+        status = component_status.get(key_func(comp))
+        if status:
+            result[comp['ref']] = status
+    return result
+
+
+def group_for_tree(components, component_status, key_func):
+    """Regroupement de _update_tree (clé -> refs, statut)"""
+    grouped = {}
+    for comp in components:
+        key = key_func(comp)
+        if key not in grouped:
+            grouped[key] = {'refs': [], 'original_value': comp['value']}
+        grouped[key]['refs'].append(comp['ref'])
+    return [(key, component_status.get(key), data) for key, data in grouped.items()]
+
+
+def bench_keys():
+    """Clés de groupe: redessin (ref -> statut) et rafraîchissement de l'arbre"""
+    n = 20000
+    parser = synthetic_parser(n)
+    bbox = parser.board_bbox
+    rows = parser.get_components_in_rect(bbox['minx'], bbox['miny'], bbox['maxx'], bbox['maxy'])
+    dict_rows = [r.as_dict() for r in rows]
+    status = {ibom_selector.component_key(r): 'validated' for r in rows[::3]}
+    assert all(legacy_key(d) == r.key for d, r in zip(dict_rows, rows))
+
+    # Ancien redessin: le mapping était construit deux fois (pads puis refs)
+    t_draw_old, old = timeit(lambda: [ref_to_status(dict_rows, status, legacy_key) for _ in range(2)][0])
+    t_draw_new, new = timeit(lambda: ref_to_status(rows, status, ibom_selector.component_key))
+    assert old == new
+    t_tree_old, old = timeit(lambda: group_for_tree(dict_rows, status, legacy_key))
+    t_tree_new, new = timeit(lambda: group_for_tree(rows, status, ibom_selector.component_key))
+    assert old == new
+    values = [r['value'] for r in rows]
+    t_norm_old, _ = timeit(lambda: [legacy_normalize_value(v) for v in values])
+    t_norm_new, _ = timeit(lambda: [ibom_selector.normalize_value(v) for v in values])
+
+    print(f"{n} composants sélectionnés, {len(status)} clés avec statut")
+    print(f"  ref -> statut (redessin)     : {t_draw_old * 1000:7.1f} ms -> {t_draw_new * 1000:6.1f} ms "
+          f"(x{t_draw_old / t_draw_new:.0f})")
+    print(f"  regroupement de l'arbre      : {t_tree_old * 1000:7.1f} ms -> {t_tree_new * 1000:6.1f} ms "
+          f"(x{t_tree_old / t_tree_new:.0f})")
+    print(f"  normalize_value (ponctuel)   : {t_norm_old * 1000:7.1f} ms -> {t_norm_new * 1000:6.1f} ms "
+          f"(x{t_norm_old / t_norm_new:.0f})")
+
+
+def legacy_extract_bom(pcbdata, lcsc_data):
+    """Ancienne extraction BOM: colonnes 0/1 fixes, LCSC cherché dans tous les champs"""
+    bom_data = []
+    fields_data = pcbdata['bom'].get('fields', {})
+    for group in pcbdata['bom'].get('both', []):
+        for ref_name, fp_id in group:
+            fields = fields_data.get(str(fp_id), [])
+            value = (fields[0] if fields else '') or ''
+            footprint = (fields[1] if len(fields) > 1 else '') or ''
+            lcsc = ''
+            for field_val in fields:
+                if isinstance(field_val, str) and len(field_val) > 1:
+                    if field_val.startswith('C') and field_val[1:].isdigit():
+                        lcsc = field_val
+                        break
+            bom_data.append(ibom_selector.BomEntry(
+                sys.intern(ref_name), fp_id, sys.intern(value), sys.intern(footprint),
+                sys.intern(lcsc or lcsc_data.get(ref_name, ''))))
+    return bom_data
+
+
+def bench_bom_fields():
+    """Extraction BOM: recherche LCSC par champ vs colonnes résolues depuis l'en-tête"""
+    n = 20000
+    pcbdata = synthetic_pcbdata(n)
+    names = ['Value', 'Footprint', 'Description', 'Manufacturer', 'MPN', 'Comment', 'LCSC']
+    for fp_id, fields in pcbdata['bom']['fields'].items():
+        value, footprint, lcsc = fields
+        fields[:] = [value, footprint, 'Description longue', 'Fabricant', f'MPN-{fp_id}',
+                     'C0G 50V', lcsc]
+    parser = IBomParser('synthetic.html', use_cache=False)
+    parser.pcbdata = pcbdata
+
+    def extract(header):
+        parser.bom_fields = header
+        parser._extract_bom()
+        return parser.bom_data
+    t_old, old = timeit(lambda: legacy_extract_bom(pcbdata, {}))
+    t_none, _ = timeit(lambda: extract(None))
+    t_new, new = timeit(lambda: extract(names))
+    assert [e.lcsc for e in old] == [e.lcsc for e in new]
+
+    print(f"{n} lignes BOM, {len(names)} colonnes (LCSC en dernier)")
+    print(f"  ancien (champs parcourus)     : {t_old * 1000:7.1f} ms")
+    print(f"  colonnes par en-tête          : {t_new * 1000:7.1f} ms (+ {len(parser.extra_fields)} "
+          f"champs supplémentaires, MPN compris)")
+    print(f"  sans en-tête (repli, parcours): {t_none * 1000:7.1f} ms")
+
+
+def bench_pipeline():
+    """Chargement séquentiel vs pipeline (CSV LCSC en parallèle du décodage HTML)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        (Path(tmp) / 'lcsc').mkdir()
+        csv_path = write_lcsc_csv(Path(tmp) / 'lcsc' / 'BOM-lcsc.csv', 100000)
+        pcbdata = synthetic_pcbdata(5000, 10000)
+        if HAS_LZSTRING:
+            board = write_compressed_html(pcbdata, Path(tmp) / 'synthetic_5000.html')
+        else:
+            print("(paquet lzstring absent: carte synthétique non compressée)")
+            board = write_pcbdata_html(pcbdata, Path(tmp) / 'synthetic_5000.html')
+
+        def load(pipeline):
+            with contextlib.redirect_stdout(io.StringIO()):
+                return IBomParser(str(board), use_cache=False, pipeline=pipeline).parse()
+        t_seq, seq = timeit(lambda: load(False))
+        t_pipe, pipe = timeit(lambda: load(True))
+        assert seq.bom_data == pipe.bom_data
+        csv_size = csv_path.stat().st_size
+
+    print(f"{board.name} + {csv_path.name} ({csv_size / 1e6:.1f} Mo, {len(pipe.lcsc_data)} références)")
+    for label, parser, elapsed in (("séquentiel", seq, t_seq), ("pipeline  ", pipe, t_pipe)):
+        stages = ", ".join(f"{IBomParser.STAGE_LABELS.get(stage, stage)} {seconds * 1000:.0f}"
+                           for stage, seconds in parser.load_timings.items() if stage != 'total')
+        print(f"  {label}: {elapsed * 1000:6.0f} ms  ({stages} ms)")
+
+
+class BenchView:
+    """Échelle et décalages d'un viewer, pour piloter une BoardScene hors de l'appli"""
+
+    def __init__(self, parser, canvas, margin=0.9):
+        self.bbox = bbox = parser.board_bbox
+        self.canvas = canvas
+        width, height = canvas.winfo_width(), canvas.winfo_height()
+        board_w, board_h = bbox['maxx'] - bbox['minx'], bbox['maxy'] - bbox['miny']
+        self.scale = min(width / board_w, height / board_h) * margin
+        self.offset_x = (width - board_w * self.scale) / 2
+        self.offset_y = (height - board_h * self.scale) / 2
+
+    def transform(self):
+        return ibom_selector.ViewTransform.from_view(self.bbox, self.scale, self.offset_x,
+                                                     self.offset_y, self.canvas.winfo_height())
+
+    def to_canvas(self, x, y):
+        """Ancien passage point par point (hauteur du canvas relue à chaque point)"""
+        bbox = self.bbox
+        return (self.offset_x + (x - bbox['minx']) * self.scale,
+                self.canvas.winfo_height() - (self.offset_y + (y - bbox['miny']) * self.scale))
+
+    def to_pcb(self, canvas_x, canvas_y):
+        bbox = self.bbox
+        return ((canvas_x - self.offset_x) / self.scale + bbox['minx'],
+                (self.canvas.winfo_height() - canvas_y - self.offset_y) / self.scale + bbox['miny'])
+
+    def visible_rect(self):
+        return self.to_pcb(0, 0) + self.to_pcb(self.canvas.winfo_width(), self.canvas.winfo_height())
+
+    def pan(self, dx, dy):
+        self.offset_x += dx
+        self.offset_y -= dy
+
+    def zoom(self, factor, x, y):
+        height = self.canvas.winfo_height()
+        self.offset_x = x + (self.offset_x - x) * factor
+        self.offset_y = height - y - (height - y - self.offset_y) * factor
+        self.scale *= factor
+
+
+def bench_highlight():
+    """Clic dans l'arbre -> surbrillance: scène redessinée vs itemconfigure par ref"""
+    parser = synthetic_parser(2500, 5000)
+    n_pads = sum(len(fp['pads']) for fp in parser.footprints)
+    rng = random.Random(3)
+    refs = [fp['ref'] for fp in parser.footprints]
+    # Sélections successives d'une ligne groupée (~8 refs) dans l'arbre
+    clicks = [rng.sample(refs, 8) for _ in range(20)]
+    theme = ibom_selector.THEMES['dark']
+
+    with bench_canvas() as canvas:
+        view = BenchView(parser, canvas)
+        groups = set(ibom_selector.BoardScene.GROUPS)
+        scene = ibom_selector.BoardScene(canvas, theme, view.visible_rect,
+                                         pad_colors={'temp': 'pad_highlight'},
+                                         ref_colors={'temp': 'pad_highlight'})
+        scene.render(parser, view.transform(), groups)
+        n_items = count_items(canvas)
+
+        def redraw_all():
+            # Ancien chemin: delete('all') puis toute la carte recréée à chaque clic
+            for refs_clicked in clicks:
+                scene.states = dict.fromkeys(refs_clicked, 'temp')
+                scene.render(parser, view.transform(), groups)
+                canvas.update_idletasks()
+
+        def restyle():
+            for refs_clicked in clicks:
+                scene.restyle(dict.fromkeys(refs_clicked, 'temp'))
+                canvas.update_idletasks()
+        t_old, _ = timeit(redraw_all)
+        calls = getattr(canvas, 'calls', None)
+        if calls is not None:
+            calls.clear()
+        t_new, _ = timeit(restyle)
+
+    print(f"{len(parser.footprints)} footprints, {n_pads} pads, {n_items} éléments canvas")
+    print(f"  scène redessinée  : {t_old / len(clicks) * 1000:7.2f} ms / clic")
+    print(f"  itemconfigure     : {t_new / len(clicks) * 1000:7.2f} ms / clic "
+          f"(x{t_old / t_new:.0f})")
+    if calls is not None:
+        per_click = len(clicks) * 3
+        print(f"  par clic: {calls['itemconfigure'] / per_click:.0f} itemconfigure, "
+              f"{calls['items touched'] / per_click:.0f} éléments recolorés, 0 créé")
+
+
+def bench_pan():
+    """Pan et zoom: scène reconstruite à chaque événement vs canvas.move/scale"""
+    parser = synthetic_parser(5000, 20000)
+    theme = ibom_selector.THEMES['dark']
+    groups = set(ibom_selector.BoardScene.GROUPS)
+    frame_ms = 1000 / 60
+    # Un glisser de 30 événements souris, puis 10 crans de molette
+    drags = [(6, -4)] * 30
+    wheel = [1.2] * 5 + [1 / 1.2] * 5
+
+    with bench_canvas(1200, 800) as canvas:
+        view = BenchView(parser, canvas)
+        scene = ibom_selector.BoardScene(canvas, theme, view.visible_rect)
+        scene.render(parser, view.transform(), groups)
+        n_items = count_items(canvas)
+        cx, cy = canvas.winfo_width() / 2, canvas.winfo_height() / 2
+
+        def pan_rebuild():
+            for dx, dy in drags:
+                view.pan(dx, dy)
+                scene.render(parser, view.transform(), groups)
+                canvas.update_idletasks()
+
+        def pan_move():
+            for dx, dy in drags:
+                view.pan(dx, dy)
+                scene.pan(dx, dy)
+                canvas.update_idletasks()
+
+        def zoom_rebuild():
+            for factor in wheel:
+                view.zoom(factor, cx, cy)
+                scene.render(parser, view.transform(), groups)
+                canvas.update_idletasks()
+
+        def zoom_scale():
+            for factor in wheel:
+                view.zoom(factor, cx, cy)
+                scene.zoom(factor, cx, cy)
+                canvas.update_idletasks()
+        t_pan_old, _ = timeit(pan_rebuild, repeat=1)
+        t_pan_new, _ = timeit(pan_move)
+        t_zoom_old, _ = timeit(zoom_rebuild, repeat=1)
+        t_zoom_new, _ = timeit(zoom_scale)
+        # Fin d'interaction: zoom revenu à l'échelle de construction -> rafraîchissement seul
+        scene.render(parser, view.transform(), groups)
+        view.zoom(1.2, cx, cy)
+        scene.zoom(1.2, cx, cy)
+        t_settle, _ = timeit(lambda: (scene.settle(), canvas.update_idletasks()), repeat=1)
+
+    per = lambda t, events: t / len(events) * 1000
+    print(f"{len(parser.footprints)} footprints, {n_items} éléments canvas (budget {frame_ms:.1f} ms/image)")
+    print(f"  pan  : {per(t_pan_old, drags):7.2f} ms -> {per(t_pan_new, drags):6.3f} ms / événement")
+    print(f"  zoom : {per(t_zoom_old, wheel):7.2f} ms -> {per(t_zoom_new, wheel):6.3f} ms / cran")
+    print(f"  fin d'interaction (épaisseurs + polices): {t_settle * 1000:.2f} ms, "
+          f"{len(scene.width_tags)} tags d'épaisseur, {len(scene.font_tags)} de police")
+
+
+def bench_culling():
+    """Zoom x10 dans un coin: éléments créés et temps d'image avec/sans culling"""
+    parser = synthetic_parser(5000, 20000)
+    theme = ibom_selector.THEMES['dark']
+    groups = set(ibom_selector.BoardScene.GROUPS)
+    bbox = parser.board_bbox
+    board = (bbox['minx'], bbox['miny'], bbox['maxx'], bbox['maxy'])
+
+    with bench_canvas(1200, 800) as canvas:
+        view = BenchView(parser, canvas)
+        # Zoom centré près du coin bas-gauche de la carte
+        view.zoom(10, *view.to_canvas(board[0] + (board[2] - board[0]) * 0.1,
+                                      board[1] + (board[3] - board[1]) * 0.1))
+        visible = view.visible_rect()
+        margin = ibom_selector.BoardScene.CULL_MARGIN
+        scenes = (
+            ("sans culling", lambda: board, 0),
+            ("vue seule", view.visible_rect, 0),
+            (f"vue + marge {margin:.0%}", view.visible_rect, margin),
+        )
+        results = []
+        for label, view_func, margin in scenes:
+            scene = ibom_selector.BoardScene(canvas, theme, view_func)
+            scene.CULL_MARGIN = margin
+
+            def frame():
+                scene.render(parser, view.transform(), groups)
+                canvas.update_idletasks()
+            elapsed, _ = timeit(frame)
+            results.append((label, elapsed, count_items(canvas)))
+
+        # Pan continu vers la droite: zones exposées complétées par fill()
+        filled = []
+        for _ in range(40):
+            view.pan(-25, 0)
+            scene.pan(-25, 0)
+            start = time.perf_counter()
+            added = scene.fill()
+            if added:
+                filled.append((time.perf_counter() - start, added))
+        n_after_pan = count_items(canvas)
+
+    area = lambda r: abs(r[2] - r[0]) * abs(r[3] - r[1])
+    print(f"{len(parser.footprints)} footprints, 20000 pistes, zoom x10: "
+          f"vue = {area(visible) / area(board):.1%} de la carte")
+    for label, elapsed, n_items in results:
+        print(f"  {label:<17}: {n_items:6d} éléments, {elapsed * 1000:7.1f} ms / image")
+    print(f"  pan de 1000 px: {len(filled)} fill, {sum(n for _, n in filled)} éléments ajoutés "
+          f"({max(t for t, _ in filled) * 1000:.1f} ms max), {n_after_pan} éléments au total")
+
+
+def bench_lod():
+    """Niveaux de détail: éléments et temps d'image par niveau de zoom"""
+    parser = synthetic_parser(10000, 20000)
+    # Moitié des footprints en 0201 (pads de 0.3 mm)
+    for fp in parser.footprints[::2]:
+        for pad in fp['pads']:
+            pad['size'] = [0.3, 0.3]
+    theme = ibom_selector.THEMES['dark']
+    groups = set(ibom_selector.BoardScene.GROUPS)
+    no_lod = dict.fromkeys(ibom_selector.BoardScene.LOD, 0)
+
+    rows = []
+    with bench_canvas(1200, 800) as canvas:
+        for zoom in (1, 2, 4, 8, 16):
+            view = BenchView(parser, canvas)
+            view.zoom(zoom, canvas.winfo_width() / 2, canvas.winfo_height() / 2)
+            row = [zoom]
+            for lod in (no_lod, None):
+                scene = ibom_selector.BoardScene(canvas, theme, view.visible_rect, lod=lod)
+
+                def frame():
+                    scene.render(parser, view.transform(), groups)
+                    canvas.update_idletasks()
+                elapsed, _ = timeit(frame)
+                row += [count_items(canvas), elapsed]
+            rows.append(row)
+
+    print(f"{len(parser.footprints)} footprints (moitié en 0201), 20000 pistes, seuils "
+          + ", ".join(f"{k}={v}" for k, v in ibom_selector.BoardScene.LOD.items()))
+    print("  zoom   sans LOD                    avec LOD")
+    for zoom, n_full, t_full, n_lod, t_lod in rows:
+        print(f"  x{zoom:<4} {n_full:6d} éléments {t_full * 1000:7.1f} ms   "
+              f"{n_lod:6d} éléments {t_lod * 1000:7.1f} ms")
+
+
+class SegmentScene(ibom_selector.BoardScene):
+    """Scène d'avant le chaînage: un élément de canvas par segment de piste"""
+
+    GROUP_KINDS = dict(ibom_selector.BoardScene.GROUP_KINDS, tracks='tracks')
+
+    def _draw_tracks(self, tracks):
+        min_base = self.lod['track_px'] / self.scale
+        for layer, track in tracks:
+            color = self.theme['track_front'] if layer.startswith('F') else self.theme['track_back']
+            start, end = track.get('start'), track.get('end')
+            base = track.get('width', 0.2)
+            if base < min_base or not (start and end):
+                continue
+            x1, y1 = self.transform(start[0], start[1])
+            x2, y2 = self.transform(end[0], end[1])
+            width, width_tag = self._width(base, self.min_track_width)
+            self.canvas.create_line(x1, y1, x2, y2, fill=color, width=width,
+                                    capstyle='round', tags=('tracks', width_tag))
+
+
+def bench_polylines():
+    """Pistes chaînées en polylignes: éléments et temps de dessin vs segments"""
+    parsers = [(board.name, IBomParser(board, use_cache=False).parse()) for board in BOARDS]
+    parsers.append(("synthetic 5000/20000", synthetic_parser(5000, 20000)))
+    theme = ibom_selector.THEMES['dark']
+
+    with bench_canvas(1200, 800) as canvas:
+        for name, parser in parsers:
+            n_segments = sum(len(t) for t in parser.tracks.values() if isinstance(t, list))
+            t_chain, _ = timeit(lambda: parser._build_spatial('track_chains'))
+            view = BenchView(parser, canvas)
+            row = []
+            for scene_class in (SegmentScene, ibom_selector.BoardScene):
+                scene = scene_class(canvas, theme, view.visible_rect)
+
+                def frame():
+                    scene.render(parser, view.transform(), {'tracks'})
+                    canvas.update_idletasks()
+                elapsed, _ = timeit(frame)
+                row += [count_items(canvas, 'tracks'), elapsed]
+            n_old, t_old, n_new, t_new = row
+            print(f"{name}: {n_segments} segments, chaînage {t_chain * 1000:.1f} ms")
+            if not n_segments:
+                print("  pas de pistes dans l'export")
+                continue
+            print(f"  segments  : {n_old:6d} éléments {t_old * 1000:7.1f} ms / image")
+            print(f"  polylignes: {n_new:6d} éléments {t_new * 1000:7.1f} ms / image "
+                  f"(-{1 - n_new / n_old:.0%} éléments, x{t_old / t_new:.1f})")
+
+
+def bench_wheel():
+    """Molette rapide: latence d'entrée, transformation par cran vs une par image"""
+    parser = synthetic_parser(5000, 20000)
+    theme = ibom_selector.THEMES['dark']
+    groups = set(ibom_selector.BoardScene.GROUPS)
+    # Molette libre: 6 crans par image, 15 images en zoom avant puis 15 en arrière
+    bursts = [[1.1] * 6] * 15 + [[1 / 1.1] * 6] * 15
+
+    rows = []
+    with bench_canvas(1200, 800) as canvas:
+        x, y = canvas.winfo_width() * 0.3, canvas.winfo_height() * 0.6
+        for label, per_event in (("par cran", True), ("par image", False)):
+            view = BenchView(parser, canvas)
+            scene = ibom_selector.BoardScene(canvas, theme, view.visible_rect)
+            scene.render(parser, view.transform(), groups)
+            calls = getattr(canvas, 'calls', collections.Counter())
+            calls.clear()
+            latencies = []
+            for burst in bursts:
+                # Les crans d'une rafale attendent tous dans la file d'événements
+                start = time.perf_counter()
+                for factor in burst:
+                    view.zoom(factor, x, y)
+                    scene.zoom(factor, x, y)
+                    if per_event:
+                        scene.flush()  # Ancien comportement: appliqué à chaque cran
+                canvas.update_idletasks()  # Prochaine image
+                latencies.append(time.perf_counter() - start)
+            rows.append((label, latencies, calls['scale'] + calls['move'], calls['items moved']))
+
+    n_events = sum(len(burst) for burst in bursts)
+    print(f"{len(parser.footprints)} footprints, {n_events} crans en {len(bursts)} images "
+          f"({len(bursts[0])} crans / image)")
+    for label, latencies, commands, moved in rows:
+        latencies.sort()
+        print(f"  {label:<9}: latence médiane {latencies[len(latencies) // 2] * 1000:6.2f} ms, "
+              f"max {latencies[-1] * 1000:6.2f} ms, {commands} scale/move, "
+              f"{moved} éléments déplacés")
+
+
+def bench_transform():
+    """Coordonnées d'une image: hauteur relue par point vs ViewTransform figé/vectorisé"""
+    parser = synthetic_parser(10000, 40000)
+    chains = parser.spatial_index('track_chains').items
+    coords = [c for fp in parser.footprints for pad in fp['pads'] for c in pad['pos'][:2]]
+    coords += [c for chain in chains for c in chain[2]]
+    coords += [c for edge in parser.edges for point in (edge['start'], edge['end'])
+               for c in point[:2]]
+    n_points = len(coords) // 2
+    pairs = list(zip(coords[0::2], coords[1::2]))
+
+    with bench_canvas(1200, 800) as canvas:
+        view = BenchView(parser, canvas)
+
+        def per_point():
+            return [view.to_canvas(x, y) for x, y in pairs]
+
+        def snapshot():
+            transform = view.transform()
+            return [transform(x, y) for x, y in pairs]
+
+        def batch():
+            return view.transform().points(coords)
+        t_old, old = timeit(per_point)
+        t_snap, _ = timeit(snapshot)
+        t_batch, new = timeit(batch)
+        assert max(abs(a - b) for a, b in zip((c for p in old for c in p), new)) < 1e-6
+        # Coût d'un winfo_height (aller-retour Tcl sur un vrai canvas)
+        t_winfo, _ = timeit(lambda: [canvas.winfo_height() for _ in range(n_points)])
+
+        scene = ibom_selector.BoardScene(canvas, ibom_selector.THEMES['dark'], view.visible_rect)
+        groups = set(ibom_selector.BoardScene.GROUPS)
+        t_frame, _ = timeit(lambda: scene.render(parser, view.transform(), groups))
+
+    numpy = "NumPy" if ibom_selector.HAS_NUMPY else "Python (numpy absent)"
+    print(f"{len(parser.footprints)} footprints, {len(chains)} chaînes de pistes: "
+          f"{n_points} points par image")
+    print(f"  hauteur relue par point : {t_old * 1000:7.1f} ms, {n_points} winfo_height "
+          f"({t_winfo * 1000:.1f} ms à eux seuls)")
+    print(f"  transform figé par point: {t_snap * 1000:7.1f} ms, 1 winfo_height")
+    print(f"  points() en un passage  : {t_batch * 1000:7.1f} ms ({numpy}, x{t_old / t_batch:.0f})")
+    print(f"  image complète (render) : {t_frame * 1000:7.1f} ms")
+
+
+BENCHMARKS = {
+    'lzstring': bench_lzstring,
+    'cache': bench_cache,
+    'locator': bench_locator,
+    'lazy': bench_lazy,
+    'store': bench_store,
+    'bom_index': bench_bom_index,
+    'spatial': bench_spatial,
+    'batch': bench_batch,
+    'lcsc': bench_lcsc,
+    'watch': bench_watch,
+    'records': bench_records,
+    'slim': bench_slim,
+    'decode': bench_decode,
+    'keys': bench_keys,
+    'bom_fields': bench_bom_fields,
+    'pipeline': bench_pipeline,
+    'highlight': bench_highlight,
+    'pan': bench_pan,
+    'culling': bench_culling,
+    'lod': bench_lod,
+    'polylines': bench_polylines,
+    'wheel': bench_wheel,
+    'transform': bench_transform,
+}
+
+
+def main(argv):
+    names = argv or list(BENCHMARKS)
+    for name in names:
+        if name not in BENCHMARKS:
+            print(f"Benchmark inconnu: {name} (disponibles: {', '.join(BENCHMARKS)})")
+            return 1
+        print("=" * 60)
+        print(f"{name}: {BENCHMARKS[name].__doc__}")
+        print("=" * 60)
+        BENCHMARKS[name]()
+        print()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
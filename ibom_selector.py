@@ -12,31 +12,57 @@ Fonctionnalités:
 - Export Excel/CSV
 """
 
+import codecs
+import contextlib
 import csv
+import gzip
+import hashlib
+import io
 import json
+import lzma
+import marshal
+import mmap
+import os
+import queue
 import re
 import math
+import sys
+import threading
+import time
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk, simpledialog
+from array import array
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from operator import itemgetter
 from pathlib import Path
 from datetime import datetime
 
 try:
     import openpyxl
     from openpyxl.styles import Font, Alignment, Border, Side, PatternFill
+    from openpyxl.utils import get_column_letter
 except ImportError:
     print("Installation de openpyxl...")
     import subprocess
     subprocess.check_call(['pip', 'install', 'openpyxl'])
     import openpyxl
     from openpyxl.styles import Font, Alignment, Border, Side, PatternFill
+    from openpyxl.utils import get_column_letter
 
 try:
     from lzstring import LZString as LZStringLib
     HAS_LZSTRING = True
 except ImportError:
     HAS_LZSTRING = False
-    print("lzstring non disponible, utilisation du décompresseur intégré")
+
+# NumPy: stockage en colonnes des composants (balayage Python sinon)
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+    print("numpy non disponible, sélection par balayage Python - pip install numpy")
 
 # QR Code support
 try:
@@ -115,10 +141,22 @@ THEMES = {
 
 # ==================== VALUE NORMALIZATION ====================
 
+_OHM_SYMBOL_RE = re.compile(r'[ΩΩ]')
+_OHM_WORD_RE = re.compile(r'\s*[Oo][Hh][Mm]\s*')
+_R_SUFFIX_RE = re.compile(r'^\d+R$', re.IGNORECASE)
+_R_DECIMAL_RE = re.compile(r'^\d+R\d+$', re.IGNORECASE)
+_R_RE = re.compile(r'R', re.IGNORECASE)
+_SPACES_RE = re.compile(r'\s+')
+
+
+@lru_cache(maxsize=4096)
 def normalize_value(value: str) -> str:
     """
     Normalise une valeur de composant pour uniformiser les notations ohm.
     Gère: Ω, ohm, Ohm, OHM, R (comme suffixe)
+    
+    Les clés des composants sont précalculées au chargement (BomEntry.key);
+    le cache LRU borné sert aux appels ponctuels (valeurs lues dans l'arbre).
     """
     if not value:
         return ''
@@ -127,19 +165,19 @@ def normalize_value(value: str) -> str:
     
     # Remplacer toutes les variantes de ohm par rien
     # Ω (symbole unicode), ohm, Ohm, OHM
-    normalized = re.sub(r'[ΩΩ]', '', normalized)
-    normalized = re.sub(r'\s*[Oo][Hh][Mm]\s*', '', normalized)
+    normalized = _OHM_SYMBOL_RE.sub('', normalized)
+    normalized = _OHM_WORD_RE.sub('', normalized)
     
     # Gérer le cas "100R" -> "100" (R comme suffixe pour les résistances)
     # Mais attention à ne pas toucher "R1" (référence) ou "4R7" (notation européenne)
-    if re.match(r'^\d+R$', normalized, re.IGNORECASE):
-        normalized = re.sub(r'R$', '', normalized, flags=re.IGNORECASE)
+    if _R_SUFFIX_RE.match(normalized):
+        normalized = normalized[:-1]
     # Notation européenne: 4R7 -> 4.7
-    if re.match(r'^\d+R\d+$', normalized, re.IGNORECASE):
-        normalized = re.sub(r'R', '.', normalized, flags=re.IGNORECASE)
+    if _R_DECIMAL_RE.match(normalized):
+        normalized = _R_RE.sub('.', normalized)
     
     # Supprimer les espaces superflus
-    normalized = re.sub(r'\s+', '', normalized).strip()
+    normalized = _SPACES_RE.sub('', normalized).strip()
     
     # Uniformiser la casse des multiplicateurs (K -> k)
     normalized = normalized.replace('K', 'k')
@@ -147,6 +185,18 @@ def normalize_value(value: str) -> str:
     return normalized
 
 
+def component_key(comp):
+    """Clé de groupe/statut d'un composant: (valeur normalisée, footprint, lcsc)
+    
+    Les enregistrements portent leur clé précalculée; elle n'est calculée
+    que pour les dicts (historique, anciens formats).
+    """
+    key = comp.get('key')
+    if key is not None:
+        return key
+    return (normalize_value(comp.get('value', '')), comp.get('footprint', ''), comp.get('lcsc', ''))
+
+
 def values_match(value1: str, value2: str) -> bool:
     """Compare deux valeurs de composants de manière normalisée"""
     return normalize_value(value1) == normalize_value(value2)
@@ -166,6 +216,13 @@ class Preferences:
         'show_pads': True,
         'auto_save': True,
         'auto_save_minutes': 5,
+        'lazy_geometry': True,
+        'slim_model': False,
+        'watch_files': True,
+        # Niveaux de détail du rendu PCB (voir BoardScene.LOD)
+        'lod_pad_px': 3,
+        'lod_track_px': 0.35,
+        'lod_label_pt': 4,
     }
     
     def __init__(self):
@@ -202,172 +259,971 @@ class Preferences:
 # ==================== LZ-STRING DECOMPRESSOR ====================
 
 class LZString:
-    """Décompresseur LZ-String pour les données InteractiveHtmlBom"""
+    """Décompresseur LZ-String pour les données InteractiveHtmlBom
+    
+    Le flux base64 est décodé en une seule passe (base64 + table d'inversion
+    des bits), puis lu par blocs de 64 bits: chaque code LZ de numBits bits
+    est extrait par masque/décalage au lieu d'une boucle bit à bit.
+    
+    Le texte est produit en entier dans un tampon unique (voir _decompress):
+    c'est une optimisation mémoire du dictionnaire, pas un décodage en flux.
+    Un décodage LZ -> JSON incrémental a été essayé puis abandonné: les
+    références arrière empêchent de libérer le début du texte, et le
+    parseur JSON en Python était plus lent et plus gourmand que json.loads.
+    """
+    
+    # Table d'inversion des bits d'un octet: LZString lit les caractères
+    # base64 bit de poids fort d'abord mais assemble les codes bit de poids
+    # faible d'abord. En inversant chaque octet, le flux devient un entier
+    # little-endian dont les bits sont directement dans l'ordre de lecture.
+    _BIT_REVERSE = bytes(int(f'{i:08b}'[::-1], 2) for i in range(256))
     
     @staticmethod
     def decompress_from_base64(compressed):
-        """Décompresse une chaîne encodée en base64"""
+        """Décompresse une chaîne encodée en base64
+        
+        compressed peut être une chaîne ou des octets ASCII (tranche d'un
+        mmap). Retourne None si le flux est corrompu ou tronqué.
+        """
         if not compressed:
             return ""
         
-        key_str = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/="
-        base_reverse_dict = {char: i for i, char in enumerate(key_str)}
-        
         try:
-            length = len(compressed)
-            get_next_value = lambda index: base_reverse_dict.get(compressed[index], 0)
-            result = LZString._decompress(length, 32, get_next_value)
-            return result
+            if isinstance(compressed, str):
+                compressed = compressed.encode('ascii')
+            # LZ-String complète par des '=' jusqu'à un multiple de 4 même
+            # quand il reste un seul caractère de données (6 bits): ce
+            # caractère est complété par des bits nuls pour b64decode
+            compressed = compressed.rstrip(b'=')
+            if len(compressed) % 4 == 1:
+                compressed += b'A'
+            padding = b'=' * (-len(compressed) % 4)
+            stream = base64.b64decode(compressed + padding).translate(LZString._BIT_REVERSE)
+            return LZString._decompress(stream)
         except Exception as e:
             print(f"Erreur de décompression: {e}")
             return None
     
     @staticmethod
-    def _decompress(length, reset_value, get_next_value):
-        """Algorithme de décompression LZ"""
-        dictionary = {}
-        enlargeIn = 4
-        dictSize = 4
-        numBits = 3
-        entry = ""
-        result = []
-        
-        data_val = get_next_value(0)
-        data_position = reset_value
-        data_index = 1
-        
-        for i in range(3):
-            dictionary[i] = i
-        
-        bits = 0
-        maxpower = 2 ** 2
-        power = 1
-        
-        while power != maxpower:
-            resb = data_val & data_position
-            data_position >>= 1
-            if data_position == 0:
-                data_position = reset_value
-                data_val = get_next_value(data_index)
-                data_index += 1
-            bits |= (1 if resb > 0 else 0) * power
-            power <<= 1
-        
-        next_val = bits
+    def _decompress(stream):
+        """Algorithme de décompression LZ sur un flux d'octets aux bits inversés
+        
+        Chaque entrée du dictionnaire est une sous-chaîne du texte déjà
+        produit (w + entry[0] est contigu dans la sortie): elle est stockée
+        comme (offset, longueur) dans deux array d'entiers au lieu d'un objet
+        str, et la sortie est un seul tampon (bytearray, élargi en UTF-16 au
+        premier caractère > 255) converti en str à la fin.
+        
+        Les références arrière LZ-String peuvent viser tout le texte déjà
+        produit: le texte ne peut pas être émis par fragments avant la fin
+        du flux, il est donc décodé en entier puis passé à json.loads.
+        """
+        from_bytes = int.from_bytes
+        stream_len = len(stream)
+        data_index = 0
+        data_bits = 0  # Bits disponibles dans le tampon
+        buffer = 0
+        
+        def read_bits(count):
+            nonlocal data_index, data_bits, buffer
+            while data_bits < count:
+                buffer |= from_bytes(stream[data_index:data_index + 8], 'little') << data_bits
+                data_bits += 64
+                data_index += 8
+            value = buffer & ((1 << count) - 1)
+            buffer >>= count
+            data_bits -= count
+            return value
+        
+        next_val = read_bits(2)
         if next_val == 0:
-            bits = 0
-            maxpower = 2 ** 8
-            power = 1
-            while power != maxpower:
-                resb = data_val & data_position
-                data_position >>= 1
-                if data_position == 0:
-                    data_position = reset_value
-                    data_val = get_next_value(data_index)
-                    data_index += 1
-                bits |= (1 if resb > 0 else 0) * power
-                power <<= 1
-            c = chr(bits)
+            char = read_bits(8)
         elif next_val == 1:
-            bits = 0
-            maxpower = 2 ** 16
-            power = 1
-            while power != maxpower:
-                resb = data_val & data_position
-                data_position >>= 1
-                if data_position == 0:
-                    data_position = reset_value
-                    data_val = get_next_value(data_index)
-                    data_index += 1
-                bits |= (1 if resb > 0 else 0) * power
-                power <<= 1
-            c = chr(bits)
-        elif next_val == 2:
+            char = read_bits(16)
+        else:
             return ""
         
-        dictionary[3] = c
-        w = c
-        result.append(c)
+        wide = char > 255
+        out = array('H', [char]) if wide else bytearray([char])
+        # Entrées 0-2 réservées aux codes de contrôle
+        offsets = array('I', [0, 0, 0, 0])
+        lengths = array('I', [0, 0, 0, 1])
+        add_offset = offsets.append
+        add_length = lengths.append
+        dict_size = 4
+        enlargeIn = 4
+        numBits = 3
+        w_off, w_len = 0, 1
         
         while True:
-            if data_index > length:
-                return ""
-            
-            bits = 0
-            maxpower = 2 ** numBits
-            power = 1
-            while power != maxpower:
-                resb = data_val & data_position
-                data_position >>= 1
-                if data_position == 0:
-                    data_position = reset_value
-                    data_val = get_next_value(data_index)
-                    data_index += 1
-                bits |= (1 if resb > 0 else 0) * power
-                power <<= 1
+            # Lecture inline du code (chemin chaud)
+            if data_bits < numBits:
+                if data_index >= stream_len + 8:
+                    raise ValueError("Flux LZ-String tronqué")
+                buffer |= from_bytes(stream[data_index:data_index + 8], 'little') << data_bits
+                data_bits += 64
+                data_index += 8
+            c = buffer & ((1 << numBits) - 1)
+            buffer >>= numBits
+            data_bits -= numBits
             
-            c = bits
-            if c == 0:
-                bits = 0
-                maxpower = 2 ** 8
-                power = 1
-                while power != maxpower:
-                    resb = data_val & data_position
-                    data_position >>= 1
-                    if data_position == 0:
-                        data_position = reset_value
-                        data_val = get_next_value(data_index)
-                        data_index += 1
-                    bits |= (1 if resb > 0 else 0) * power
-                    power <<= 1
-                dictionary[dictSize] = chr(bits)
-                dictSize += 1
-                c = dictSize - 1
+            # L'entrée lue commence juste après w dans la sortie
+            e_off = w_off + w_len
+            if c < 3:
+                if c == 2:
+                    break
+                char = read_bits(8 if c == 0 else 16)
+                if char > 255 and not wide:
+                    wide = True
+                    narrow, out = out, array('H')
+                    out.extend(narrow)
+                    del narrow
+                add_offset(e_off)
+                add_length(1)
+                dict_size += 1
                 enlargeIn -= 1
-            elif c == 1:
-                bits = 0
-                maxpower = 2 ** 16
-                power = 1
-                while power != maxpower:
-                    resb = data_val & data_position
-                    data_position >>= 1
-                    if data_position == 0:
-                        data_position = reset_value
-                        data_val = get_next_value(data_index)
-                        data_index += 1
-                    bits |= (1 if resb > 0 else 0) * power
-                    power <<= 1
-                dictionary[dictSize] = chr(bits)
-                dictSize += 1
-                c = dictSize - 1
-                enlargeIn -= 1
-            elif c == 2:
-                return "".join(result)
+                if enlargeIn == 0:
+                    enlargeIn = 1 << numBits
+                    numBits += 1
+                out.append(char)
+                e_len = 1
+            elif c < dict_size:
+                off = offsets[c]
+                e_len = lengths[c]
+                out += out[off:off + e_len]
+            elif c == dict_size:
+                out += out[w_off:w_off + w_len]
+                out.append(out[w_off])
+                e_len = w_len + 1
+            else:
+                raise ValueError(f"Code LZ-String invalide: {c}")
+            
+            # Nouvelle entrée w + entry[0]
+            add_offset(w_off)
+            add_length(w_len + 1)
+            dict_size += 1
+            enlargeIn -= 1
             
             if enlargeIn == 0:
-                enlargeIn = 2 ** numBits
+                enlargeIn = 1 << numBits
                 numBits += 1
             
-            if c in dictionary:
-                entry = dictionary[c] if isinstance(dictionary[c], str) else chr(dictionary[c])
+            w_off, w_len = e_off, e_len
+        
+        del offsets, lengths
+        if wide:
+            return out.tobytes().decode('utf-16-le', 'surrogatepass')
+        return out.decode('latin-1')
+
+
+# ==================== PARSED BOARD CACHE ====================
+
+class ParsedBoardCache:
+    """Cache disque des modèles extraits par IBomParser
+    
+    Chaque entrée contient le modèle (footprints, composants, BOM, géométrie,
+    bbox, map LCSC), chaque champ étant sérialisé avec marshal puis
+    compressé zlib séparément pour pouvoir être décodé à la demande. La clé est
+    le hash du HTML + le chemin/mtime du CSV LCSC, si bien qu'une
+    réouverture du même fichier évite toute décompression LZ-String.
+    Le répertoire est borné en taille: les entrées les moins récemment
+    utilisées sont supprimées en premier.
+    """
+    
+    DIR_NAME = '.ibom_cache'
+    SUFFIX = '.bin'
+    FORMAT_VERSION = 4
+    MAX_BYTES = 64 * 1024 * 1024
+    
+    def __init__(self, cache_dir, max_bytes=None):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes if max_bytes is not None else self.MAX_BYTES
+    
+    @classmethod
+    def for_html(cls, html_file_path):
+        """Cache placé à côté du fichier HTML (comme l'historique)"""
+        return cls(Path(html_file_path).parent / cls.DIR_NAME)
+    
+    def make_key(self, html_bytes, lcsc_path=None):
+        """Calcule la clé: hash du contenu HTML + chemin/mtime du CSV LCSC"""
+        digest = hashlib.sha256(html_bytes)
+        # marshal dépend de la version de Python: l'inclure dans la clé
+        salt = f"v{self.FORMAT_VERSION}|py{sys.version_info[0]}.{sys.version_info[1]}"
+        if lcsc_path:
+            try:
+                salt += f"|{Path(lcsc_path).resolve()}|{os.stat(lcsc_path).st_mtime_ns}"
+            except OSError:
+                pass
+        digest.update(salt.encode('utf-8'))
+        return digest.hexdigest()[:40]
+    
+    def _entry_path(self, key):
+        return self.cache_dir / f"{key}{self.SUFFIX}"
+    
+    @staticmethod
+    def encode(value):
+        """Sérialise un champ du modèle (marshal + zlib)"""
+        return zlib.compress(marshal.dumps(value), 6)
+    
+    @staticmethod
+    def decode(blob):
+        """Décode un champ sérialisé par encode()"""
+        return marshal.loads(zlib.decompress(blob))
+    
+    def load(self, key):
+        """Retourne les champs en cache {nom: blob encodé} ou None"""
+        path = self._entry_path(key)
+        try:
+            with open(path, 'rb') as f:
+                blobs = marshal.loads(f.read())
+            # Marquer comme récemment utilisé pour l'éviction
+            os.utime(path)
+            return blobs if isinstance(blobs, dict) else None
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Entrée de cache illisible, ignorée: {e}")
+            return None
+    
+    def store(self, key, model):
+        """Écrit le modèle dans le cache puis applique la limite de taille"""
+        path = self._entry_path(key)
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            data = marshal.dumps({field: self.encode(value) for field, value in model.items()})
+            tmp_path = path.with_suffix('.tmp')
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            self._evict()
+        except Exception as e:
+            print(f"Erreur écriture cache: {e}")
+    
+    def _evict(self):
+        """Supprime les entrées les plus anciennes au-delà de max_bytes"""
+        entries = []
+        for path in self.cache_dir.glob(f"*{self.SUFFIX}"):
+            try:
+                st = path.stat()
+                entries.append((st.st_mtime, st.st_size, path))
+            except OSError:
+                continue
+        
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+                total -= size
+            except OSError:
+                pass
+    
+    def clear(self):
+        """Vide le cache"""
+        for path in self.cache_dir.glob(f"*{self.SUFFIX}"):
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+
+# ==================== COMPACT RECORDS ====================
+
+def intern_str(value):
+    """Version partagée (sys.intern) d'une chaîne; autres types inchangés"""
+    return sys.intern(value) if type(value) is str else value
+
+
+class Record:
+    """Enregistrement compact à __slots__, lisible comme un dict
+    
+    Les champs sont des attributs; rec['champ'] et rec.get('champ')
+    restent valides pour le code écrit pour les anciens dicts. Les slots
+    listés dans DERIVED sont calculés par __init__ à partir des champs:
+    lisibles de la même façon, mais absents de as_tuple/as_dict (cache,
+    historique) et des comparaisons.
+    """
+    
+    __slots__ = ()
+    DERIVED = ()
+    FIELDS = ()
+    
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.FIELDS = tuple(name for name in cls.__slots__ if name not in cls.DERIVED)
+    
+    def __getitem__(self, key):
+        if key in self.__slots__:
+            return getattr(self, key)
+        raise KeyError(key)
+    
+    def get(self, key, default=None):
+        if key in self.__slots__:
+            return getattr(self, key)
+        return default
+    
+    def __contains__(self, key):
+        return key in self.__slots__
+    
+    def keys(self):
+        return list(self.FIELDS)
+    
+    def as_tuple(self):
+        return tuple(getattr(self, name) for name in self.FIELDS)
+    
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.FIELDS}
+    
+    def __eq__(self, other):
+        if type(other) is type(self):
+            return self.as_tuple() == other.as_tuple()
+        if isinstance(other, dict):
+            return self.as_dict() == other
+        return NotImplemented
+    
+    __hash__ = None
+    
+    def __repr__(self):
+        return f"{type(self).__name__}({self.as_dict()!r})"
+
+
+class BomEntry(Record):
+    """Ligne de bom_data: une référence et ses champs BOM"""
+    
+    __slots__ = ('ref', 'id', 'value', 'footprint', 'lcsc', 'mpn', 'extra', 'key')
+    DERIVED = ('key',)
+    
+    def __init__(self, ref, id, value, footprint, lcsc, mpn='', extra=()):
+        self.ref = ref
+        self.id = id
+        self.value = value
+        self.footprint = footprint
+        self.lcsc = lcsc
+        self.mpn = mpn
+        # Valeurs des colonnes supplémentaires (IBomParser.extra_fields)
+        self.extra = extra
+        # Clé de groupe/statut calculée une fois au chargement
+        self.key = (normalize_value(value), footprint, lcsc)
+
+
+class Component(Record):
+    """Composant placé (position et bbox de son footprint)"""
+    
+    __slots__ = ('ref', 'id', 'x', 'y', 'layer', 'bbox')
+    
+    def __init__(self, ref, id, x, y, layer, bbox):
+        self.ref = ref
+        self.id = id
+        self.x = x
+        self.y = y
+        self.layer = layer
+        self.bbox = bbox
+
+
+class ComponentRow(Record):
+    """Composant joint à ses champs BOM (format des sélections)"""
+    
+    __slots__ = ('ref', 'value', 'footprint', 'lcsc', 'x', 'y', 'layer', 'mpn', 'extra', 'key')
+    DERIVED = ('key',)
+    
+    def __init__(self, ref, value, footprint, lcsc, x, y, layer, mpn='', extra=(), key=None):
+        self.ref = ref
+        self.value = value
+        self.footprint = footprint
+        self.lcsc = lcsc
+        self.x = x
+        self.y = y
+        self.layer = layer
+        self.mpn = mpn
+        self.extra = extra
+        # Clé reprise de la ligne BOM jointe quand elle est fournie
+        self.key = key if key is not None else (normalize_value(value), footprint, lcsc)
+
+
+# ==================== SPATIAL INDEX ====================
+
+def footprint_bounds(fp):
+    """Boîte englobante alignée (minx, miny, maxx, maxy) d'un footprint"""
+    bbox = fp.get('bbox') or {}
+    if 'minx' in bbox:
+        return bbox['minx'], bbox['miny'], bbox['maxx'], bbox['maxy']
+    if 'pos' in bbox:
+        px, py = bbox['pos'][0], bbox['pos'][1]
+        rx, ry = bbox.get('relpos', [0, 0])[:2]
+        w, h = bbox.get('size', [0, 0])[:2]
+        angle = math.radians(bbox.get('angle', 0) or 0)
+        cos_a, sin_a = math.cos(angle), math.sin(angle)
+        xs, ys = [], []
+        # Rectangle en repère footprint (relpos, relpos + size) tourné autour de pos
+        for cx, cy in ((rx, ry), (rx + w, ry), (rx, ry + h), (rx + w, ry + h)):
+            xs.append(px + cx * cos_a - cy * sin_a)
+            ys.append(py + cx * sin_a + cy * cos_a)
+        return min(xs), min(ys), max(xs), max(ys)
+    pads = fp.get('pads', [])
+    if pads:
+        boxes = [pad_bounds(p) for p in pads]
+        return (min(b[0] for b in boxes), min(b[1] for b in boxes),
+                max(b[2] for b in boxes), max(b[3] for b in boxes))
+    return None
+
+
+def pad_bounds(pad):
+    """Boîte englobante d'un pad (demi-diagonale si le pad est tourné)"""
+    pos = pad.get('pos', [0, 0])
+    offset = pad.get('offset', [0, 0])
+    size = pad.get('size', [0.5, 0.5])
+    x, y = pos[0] + offset[0], pos[1] + offset[1]
+    if pad.get('angle', 0):
+        hw = hh = math.hypot(size[0], size[1]) / 2
+    else:
+        hw, hh = size[0] / 2, size[1] / 2
+    return x - hw, y - hh, x + hw, y + hh
+
+
+def track_bounds(track):
+    """Boîte englobante d'un segment de piste (ou d'un arc), épaisseur incluse"""
+    half = track.get('width', 0.2) / 2
+    start, end = track.get('start'), track.get('end')
+    if start and end:
+        return (min(start[0], end[0]) - half, min(start[1], end[1]) - half,
+                max(start[0], end[0]) + half, max(start[1], end[1]) + half)
+    center = track.get('center')
+    if center:
+        r = track.get('radius', 0) + half
+        return center[0] - r, center[1] - r, center[0] + r, center[1] + r
+    return None
+
+
+def chain_track_segments(tracks, max_points=64, quantum=1e-4):
+    """Regroupe les segments d'une couche en polylignes
+    
+    Deux segments de même largeur sont chaînés s'ils partagent une extrémité
+    (table de hachage sur les extrémités arrondies à quantum mm); les points
+    intermédiaires alignés sont supprimés. Une chaîne compte au plus
+    max_points points pour que sa boîte englobante reste utile au culling.
+    Les arcs (sans start/end) sont ignorés, comme au dessin.
+    
+    Retourne [(largeur, (x0, y0, x1, y1, ...))] dans l'ordre du fichier.
+    """
+    def key(point, width):
+        return width, round(point[0] / quantum), round(point[1] / quantum)
+    
+    segments = []
+    ends = {}
+    for track in tracks:
+        start, end = track.get('start'), track.get('end')
+        if not (start and end):
+            continue
+        width = track.get('width', 0.2)
+        ends.setdefault(key(start, width), []).append(len(segments))
+        ends.setdefault(key(end, width), []).append(len(segments))
+        segments.append((width, start, end))
+    
+    used = bytearray(len(segments))
+    chains = []
+    for i, (width, start, end) in enumerate(segments):
+        if used[i]:
+            continue
+        used[i] = 1
+        forward, backward = [end], []
+        # Prolonge la chaîne par l'extrémité end, puis par l'extrémité start
+        for points, tip in ((forward, end), (backward, start)):
+            while len(forward) + len(backward) + 1 < max_points:
+                tip_key = key(tip, width)
+                j = next((j for j in ends[tip_key] if not used[j]), None)
+                if j is None:
+                    break
+                used[j] = 1
+                _, s, e = segments[j]
+                tip = e if key(s, width) == tip_key else s
+                points.append(tip)
+        
+        # Points dans l'ordre, sans doublons ni sommets alignés
+        path = []
+        for x, y in ((p[0], p[1]) for p in backward[::-1] + [start] + forward):
+            if path and abs(x - path[-1][0]) < quantum and abs(y - path[-1][1]) < quantum:
+                continue
+            if len(path) >= 2:
+                (ax, ay), (bx, by) = path[-2], path[-1]
+                ux, uy, vx, vy = bx - ax, by - ay, x - bx, y - by
+                if abs(ux * vy - uy * vx) < quantum * quantum and ux * vx + uy * vy > 0:
+                    path[-1] = (x, y)
+                    continue
+            path.append((x, y))
+        if len(path) == 1:
+            path.append(path[0])
+        chains.append((width, tuple(c for point in path for c in point)))
+    return chains
+
+
+class SpatialGrid:
+    """Grille uniforme sur des boîtes englobantes
+    
+    Chaque élément est rangé dans toutes les cellules que sa boîte touche.
+    Les requêtes ne visitent que les cellules concernées et retournent les
+    éléments dans leur ordre d'insertion (l'ordre de dessin d'origine).
+    """
+    
+    def __init__(self, cell_size):
+        self.cell_size = float(cell_size)
+        self.items = []
+        self.boxes = []
+        self.cells = {}
+        self._bounds = None
+    
+    @classmethod
+    def for_extent(cls, extent, count, items_per_cell=4, min_cell=0.5):
+        """Grille dimensionnée pour ~items_per_cell éléments par cellule"""
+        width = extent['maxx'] - extent['minx']
+        height = extent['maxy'] - extent['miny']
+        area = max(width * height, 1.0)
+        return cls(max(min_cell, math.sqrt(area * items_per_cell / max(count, 1))))
+    
+    def __len__(self):
+        return len(self.items)
+    
+    def _cell_range(self, minx, miny, maxx, maxy):
+        size = self.cell_size
+        return (int(minx // size), int(miny // size),
+                int(maxx // size), int(maxy // size))
+    
+    def bounds(self):
+        """Boîte englobant tous les éléments (None si la grille est vide)"""
+        if self._bounds is None and self.boxes:
+            self._bounds = (min(b[0] for b in self.boxes), min(b[1] for b in self.boxes),
+                            max(b[2] for b in self.boxes), max(b[3] for b in self.boxes))
+        return self._bounds
+    
+    def insert(self, item, minx, miny, maxx, maxy):
+        """Ajoute un élément avec sa boîte englobante"""
+        idx = len(self.items)
+        self.items.append(item)
+        self.boxes.append((minx, miny, maxx, maxy))
+        self._bounds = None
+        size = self.cell_size
+        cx1, cy1 = int(minx // size), int(miny // size)
+        cx2, cy2 = int(maxx // size), int(maxy // size)
+        cells = self.cells
+        if cx1 == cx2 and cy1 == cy2:
+            # Cas courant: l'élément tient dans une seule cellule
+            cell = cells.get((cx1, cy1))
+            if cell is None:
+                cells[(cx1, cy1)] = [idx]
             else:
-                if c == dictSize:
-                    entry = w + w[0]
+                cell.append(idx)
+            return
+        for cx in range(cx1, cx2 + 1):
+            for cy in range(cy1, cy2 + 1):
+                cell = cells.get((cx, cy))
+                if cell is None:
+                    cells[(cx, cy)] = [idx]
                 else:
-                    return None
+                    cell.append(idx)
+    
+    def query_ids(self, x1, y1, x2, y2):
+        """Indices d'insertion des éléments qui intersectent le rectangle"""
+        min_x, max_x = min(x1, x2), max(x1, x2)
+        min_y, max_y = min(y1, y2), max(y1, y2)
+        boxes = self.boxes
+        if not boxes:
+            return []
+        
+        bx1, by1, bx2, by2 = self.bounds()
+        if min_x <= bx1 and min_y <= by1 and max_x >= bx2 and max_y >= by2:
+            # Le rectangle couvre tout (vue d'ensemble): pas de filtrage
+            return list(range(len(boxes)))
+        
+        cx1, cy1, cx2, cy2 = self._cell_range(min_x, min_y, max_x, max_y)
+        n_cells = (cx2 - cx1 + 1) * (cy2 - cy1 + 1)
+        if n_cells * 2 > len(self.cells):
+            # Rectangle couvrant une grande partie de la grille: un balayage
+            # des boîtes coûte moins que la déduplication par cellule
+            return [i for i, (bx1, by1, bx2, by2) in enumerate(boxes)
+                    if bx1 <= max_x and bx2 >= min_x and by1 <= max_y and by2 >= min_y]
+        cells = (self.cells.get((cx, cy)) for cx in range(cx1, cx2 + 1)
+                 for cy in range(cy1, cy2 + 1))
+        
+        found = set()
+        for ids in cells:
+            if not ids:
+                continue
+            for i in ids:
+                if i in found:
+                    continue
+                bx1, by1, bx2, by2 = boxes[i]
+                if bx1 <= max_x and bx2 >= min_x and by1 <= max_y and by2 >= min_y:
+                    found.add(i)
+        return sorted(found)
+    
+    def query_rect(self, x1, y1, x2, y2):
+        """Éléments qui intersectent le rectangle, dans l'ordre d'insertion"""
+        items = self.items
+        ids = self.query_ids(x1, y1, x2, y2)
+        if len(ids) == len(items):
+            return list(items)
+        return [items[i] for i in ids]
+    
+    def query_point(self, x, y):
+        """Éléments dont la boîte contient le point"""
+        return self.query_rect(x, y, x, y)
+    
+    def _distance(self, i, x, y):
+        bx1, by1, bx2, by2 = self.boxes[i]
+        dx = max(bx1 - x, 0, x - bx2)
+        dy = max(by1 - y, 0, y - by2)
+        return math.hypot(dx, dy)
+    
+    @staticmethod
+    def _ring_cells(px, py, ring):
+        """Cellules à distance de Chebyshev exactement ring de (px, py)"""
+        if ring == 0:
+            return [(px, py)]
+        cells = []
+        for cx in range(px - ring, px + ring + 1):
+            cells.append((cx, py - ring))
+            cells.append((cx, py + ring))
+        for cy in range(py - ring + 1, py + ring):
+            cells.append((px - ring, cy))
+            cells.append((px + ring, cy))
+        return cells
+    
+    def nearest(self, x, y, k=1):
+        """Les k éléments les plus proches du point (distance à leur boîte)
+        
+        Parcours en anneaux de cellules autour du point: on s'arrête dès
+        que les k meilleurs sont plus proches que tout anneau non visité.
+        """
+        if not self.items or k <= 0:
+            return []
+        size = self.cell_size
+        px, py = math.floor(x / size), math.floor(y / size)
+        cell_xs = [c[0] for c in self.cells]
+        cell_ys = [c[1] for c in self.cells]
+        max_ring = max(abs(px - min(cell_xs)), abs(px - max(cell_xs)),
+                       abs(py - min(cell_ys)), abs(py - max(cell_ys)))
+        
+        seen = set()
+        candidates = []
+        for ring in range(max_ring + 1):
+            for cell in self._ring_cells(px, py, ring):
+                for i in self.cells.get(cell, ()):
+                    if i not in seen:
+                        seen.add(i)
+                        candidates.append((self._distance(i, x, y), i))
+            if len(candidates) >= k:
+                candidates.sort()
+                # Tout élément hors des anneaux visités est à au moins ring * size
+                if candidates[k - 1][0] <= ring * size:
+                    break
+        candidates.sort()
+        return [self.items[i] for _, i in candidates[:k]]
+
+
+# ==================== COMPONENT STORE ====================
+
+class ComponentStore:
+    """Stockage en colonnes des composants pour les requêtes de sélection
+    
+    x, y, code couche, id footprint et ligne BOM sont des tableaux
+    parallèles (NumPy si disponible). Les requêtes rectangle/couche/statut
+    sont des masques booléens qui retournent des tableaux d'indices; les
+    champs BOM ne sont joints que pour les lignes réellement affichées.
+    
+    ids restreint une requête à des indices candidats (ceux de la grille
+    spatial_index('components') sans NumPy); sinon la colonne entière est
+    filtrée en un passage vectorisé.
+    """
+    
+    LAYER_CODES = {'F': 0, 'B': 1}
+    LAYER_NAMES = ('F', 'B')
+    NO_BOM_KEY = ('', '', '')
+    
+    def __init__(self, components, bom_data, bom_rows):
+        """bom_rows[i] = index dans bom_data du composant i (-1 si absent)"""
+        self.bom_data = bom_data
+        self.refs = [c.ref for c in components]
+        xs = [c.x for c in components]
+        ys = [c.y for c in components]
+        layers = [self.LAYER_CODES.get(c.layer, 0) for c in components]
+        fp_ids = [c.id for c in components]
+        
+        if HAS_NUMPY:
+            self.x = np.array(xs, dtype=np.float64)
+            self.y = np.array(ys, dtype=np.float64)
+            self.layer = np.array(layers, dtype=np.int8)
+            self.fp_id = np.array(fp_ids, dtype=np.int32)
+            self.bom_row = np.array(bom_rows, dtype=np.int32)
+        else:
+            self.x, self.y, self.layer = xs, ys, layers
+            self.fp_id, self.bom_row = fp_ids, list(bom_rows)
+    
+    def __len__(self):
+        return len(self.refs)
+    
+    def _column(self, column, ids):
+        if ids is None:
+            return column
+        if HAS_NUMPY:
+            return column[ids]
+        return [column[i] for i in ids]
+    
+    def _to_indices(self, mask, ids=None):
+        if HAS_NUMPY:
+            return np.flatnonzero(mask) if ids is None else ids[mask]
+        if ids is None:
+            return [i for i, keep in enumerate(mask) if keep]
+        return [i for i, keep in zip(ids, mask) if keep]
+    
+    def rect_mask(self, x1, y1, x2, y2, ids=None):
+        """Masque des composants dont le centre est dans le rectangle"""
+        min_x, max_x = min(x1, x2), max(x1, x2)
+        min_y, max_y = min(y1, y2), max(y1, y2)
+        xs, ys = self._column(self.x, ids), self._column(self.y, ids)
+        if HAS_NUMPY:
+            return (xs >= min_x) & (xs <= max_x) & (ys >= min_y) & (ys <= max_y)
+        return [min_x <= x <= max_x and min_y <= y <= max_y for x, y in zip(xs, ys)]
+    
+    def layer_mask(self, layer, ids=None):
+        """Masque des composants sur la couche 'F' ou 'B'"""
+        code = self.LAYER_CODES.get(layer, 0)
+        layers = self._column(self.layer, ids)
+        if HAS_NUMPY:
+            return layers == code
+        return [l == code for l in layers]
+    
+    def status_mask(self, component_status, status, ids=None):
+        """Masque des composants ayant ce statut (None = en attente)"""
+        row_matches = [component_status.get(entry.key) == status for entry in self.bom_data]
+        # Composant sans ligne BOM: clé vide, donc en attente
+        missing = component_status.get(self.NO_BOM_KEY) == status
+        bom_rows = self._column(self.bom_row, ids)
+        if HAS_NUMPY:
+            lookup = np.array(row_matches + [missing], dtype=bool)
+            return lookup[bom_rows]  # -1 -> dernière case (missing)
+        return [row_matches[r] if r >= 0 else missing for r in bom_rows]
+    
+    def select(self, rect=None, layer=None, component_status=None, status=None, ids=None):
+        """Indices des composants dans rect, sur layer et, si component_status
+        est donné, ayant ce statut; parmi ids si donné"""
+        if HAS_NUMPY and ids is not None:
+            ids = np.asarray(ids, dtype=np.intp)
+        masks = []
+        if rect is not None:
+            masks.append(self.rect_mask(*rect, ids=ids))
+        if layer is not None:
+            masks.append(self.layer_mask(layer, ids))
+        if component_status is not None:
+            masks.append(self.status_mask(component_status, status, ids))
+        if not masks:
+            return ids if ids is not None else self._to_indices([True] * len(self))
+        mask = masks[0]
+        for other in masks[1:]:
+            if HAS_NUMPY:
+                mask = mask & other
+            else:
+                mask = [a and b for a, b in zip(mask, other)]
+        return self._to_indices(mask, ids)
+    
+    def row(self, i):
+        """Composant i joint à ses champs BOM (format de sélection)"""
+        return self.rows([i])[0]
+    
+    def rows(self, indices):
+        """Joint les champs BOM pour les indices donnés"""
+        if HAS_NUMPY:
+            # Colonnes extraites en un passage: pas de scalaire NumPy par ligne
+            indices = np.asarray(indices, dtype=np.intp)
+            xs, ys = self.x[indices].tolist(), self.y[indices].tolist()
+            layers, bom_rows = self.layer[indices].tolist(), self.bom_row[indices].tolist()
+            indices = indices.tolist()
+        else:
+            xs, ys = self._column(self.x, indices), self._column(self.y, indices)
+            layers, bom_rows = self._column(self.layer, indices), self._column(self.bom_row, indices)
+        refs, names, bom_data = self.refs, self.LAYER_NAMES, self.bom_data
+        result = []
+        for i, x, y, code, bom_row in zip(indices, xs, ys, layers, bom_rows):
+            if bom_row < 0:
+                result.append(ComponentRow(refs[i], '', '', '', x, y, names[code],
+                                           key=self.NO_BOM_KEY))
+                continue
+            entry = bom_data[bom_row]
+            result.append(ComponentRow(refs[i], entry.value, entry.footprint, entry.lcsc,
+                                       x, y, names[code], entry.mpn, entry.extra, entry.key))
+        return result
+
+
+# ==================== LCSC INDEX ====================
+
+class LcscIndex:
+    """Index ref -> code LCSC lu depuis le CSV de BOM (JLCPCB, EasyEDA, Excel)
+    
+    L'encodage est déduit des premiers octets (BOM, octets nuls UTF-16) et
+    le fichier est lu en un seul passage. L'index obtenu est conservé dans
+    un fichier annexe (.ibom_cache/<nom>.lcsc à côté du CSV) et en mémoire,
+    valides tant que le chemin, le mtime et la taille du CSV ne changent pas.
+    """
+    
+    SUFFIX = '.lcsc'
+    FORMAT_VERSION = 1
+    SNIFF_BYTES = 4096
+    
+    # Index déjà chargés dans ce processus: chemin -> (clé, index)
+    _memory = {}
+    
+    @staticmethod
+    def sniff_encoding(head):
+        """Encodage probable d'un CSV d'après ses premiers octets"""
+        if head.startswith(codecs.BOM_UTF8):
+            return 'utf-8-sig'
+        if head.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+            return 'utf-16'
+        if b'\x00' in head:
+            # UTF-16 sans BOM: l'octet nul des caractères ASCII est en 2e position en LE
+            return 'utf-16-le' if head[1::2].count(0) >= head[0::2].count(0) else 'utf-16-be'
+        for encoding in ('utf-8-sig', 'cp1252'):
+            try:
+                codecs.getincrementaldecoder(encoding)().decode(head)
+                return encoding
+            except UnicodeDecodeError:
+                continue
+        return 'latin-1'
+    
+    @staticmethod
+    def sniff_delimiter(text):
+        """Délimiteur (tabulation, point-virgule ou virgule) d'après le début du texte"""
+        if '\t' in text:
+            return '\t'
+        if ';' in text:
+            return ';'
+        return ','
+    
+    @classmethod
+    def sidecar_path(cls, csv_path):
+        csv_path = Path(csv_path)
+        return csv_path.parent / ParsedBoardCache.DIR_NAME / (csv_path.name + cls.SUFFIX)
+    
+    @classmethod
+    def stat_key(cls, csv_path):
+        """Clé de validité: chemin absolu, mtime, taille et version du format"""
+        st = os.stat(csv_path)
+        return (str(Path(csv_path).resolve()), st.st_mtime_ns, st.st_size, cls.FORMAT_VERSION)
+    
+    @classmethod
+    def load(cls, csv_path, use_sidecar=True, log=print):
+        """Index ref -> LCSC du CSV, depuis la mémoire, l'annexe ou le fichier
+        
+        log reçoit les messages (encodage, colonnes manquantes...).
+        """
+        key = cls.stat_key(csv_path)
+        cached = cls._memory.get(key[0])
+        if use_sidecar and cached and cached[0] == key:
+            return dict(cached[1])
+        
+        sidecar = cls.sidecar_path(csv_path)
+        index = None
+        if use_sidecar:
+            try:
+                with open(sidecar, 'rb') as f:
+                    entry = marshal.loads(f.read())
+                if entry.get('key') == key:
+                    index = entry['index']
+            except (OSError, EOFError, ValueError, TypeError, AttributeError):
+                index = None
+        
+        if index is None:
+            index = cls.parse(csv_path, log)
+            if use_sidecar:
+                cls._write_sidecar(sidecar, key, index, log)
+        
+        cls._memory[key[0]] = (key, index)
+        return dict(index)
+    
+    @staticmethod
+    def _write_sidecar(sidecar, key, index, log=print):
+        try:
+            sidecar.parent.mkdir(parents=True, exist_ok=True)
+            tmp = sidecar.with_name(f"{sidecar.name}.{os.getpid()}.tmp")
+            with open(tmp, 'wb') as f:
+                marshal.dump({'key': key, 'index': index}, f)
+            os.replace(tmp, sidecar)
+        except OSError as e:
+            log(f"Impossible d'écrire l'index LCSC: {e}")
+    
+    @classmethod
+    def parse(cls, csv_path, log=print):
+        """Lit le CSV en un passage et retourne l'index ref -> LCSC"""
+        with open(csv_path, 'rb') as f:
+            head = f.read(cls.SNIFF_BYTES)
+        encoding = cls.sniff_encoding(head)
+        
+        # Octet invalide plus loin que l'échantillon: repli Windows puis
+        # latin-1, qui décode n'importe quel octet
+        fallbacks = [e for e in ('cp1252', 'latin-1') if e != encoding]
+        for candidate in [encoding] + fallbacks:
+            try:
+                return cls._read_rows(csv_path, candidate, log)
+            except UnicodeDecodeError:
+                continue
+    
+    @classmethod
+    def _read_rows(cls, csv_path, encoding, log=print):
+        log(f"Encodage CSV détecté: {encoding}")
+        index = {}
+        with open(csv_path, 'r', encoding=encoding, newline='') as f:
+            delimiter = cls.sniff_delimiter(f.read(2048))
+            f.seek(0)
+            reader = csv.reader(f, delimiter=delimiter)
+            headers = next(reader, [])
+            headers_clean = [h.strip().strip('"').strip() for h in headers]
             
-            result.append(entry)
-            dictionary[dictSize] = w + entry[0]
-            dictSize += 1
-            enlargeIn -= 1
+            # Chercher les colonnes (insensible à la casse)
+            designator_col = None
+            lcsc_col = None
+            for i, h in enumerate(headers_clean):
+                h_lower = h.lower()
+                if h_lower == 'designator':
+                    designator_col = i
+                elif h_lower == 'lcsc' or h_lower == 'lcsc part number':
+                    lcsc_col = i
+                elif h_lower == 'supplier part' and lcsc_col is None:
+                    lcsc_col = i
             
-            if enlargeIn == 0:
-                enlargeIn = 2 ** numBits
-                numBits += 1
+            if designator_col is None or lcsc_col is None:
+                log(f"Colonnes CSV manquantes. Headers: {headers_clean}")
+                return index
             
-            w = entry
-        
-        return "".join(result)
+            needed = max(designator_col, lcsc_col)
+            for row in reader:
+                if len(row) <= needed:
+                    continue
+                lcsc_code = row[lcsc_col].strip()
+                if lcsc_code:
+                    for ref in row[designator_col].split(','):
+                        ref = ref.strip()
+                        if ref:
+                            index[ref] = lcsc_code
+        return index
+
+
+# ==================== IBOM SOURCES ====================
+
+# Exports iBOM archivés compressés: suffixe -> ouverture en flux
+COMPRESSED_OPENERS = {'.gz': gzip.open, '.xz': lzma.open}
+IBOM_SUFFIXES = ('.html', '.html.gz', '.html.xz')
+
+
+def is_ibom_file(path):
+    """Vrai pour un fichier iBOM, brut ou compressé (.html.gz, .html.xz)"""
+    return str(path).lower().endswith(IBOM_SUFFIXES)
+
+
+def ibom_stem(path):
+    """Nom d'un fichier iBOM sans .html ni suffixe de compression"""
+    path = Path(path)
+    if path.suffix.lower() in COMPRESSED_OPENERS:
+        path = path.with_suffix('')
+    return path.stem
 
 
 # ==================== IBOM PARSER ====================
@@ -375,20 +1231,127 @@ class LZString:
 class IBomParser:
     """Parse le fichier HTML d'InteractiveHtmlBom pour extraire les données"""
     
-    def __init__(self, html_file_path):
+    # Attributs du modèle extrait, sauvegardés dans le ParsedBoardCache
+    MODEL_FIELDS = ('footprints', 'components', 'bom_data', 'extra_fields', 'edges',
+                    'tracks', 'drawings', 'board_bbox', 'lcsc_data')
+    # Géométrie lourde décodée seulement au premier accès en mode lazy
+    # (footprints = listes de pads + silkscreen des footprints)
+    LAZY_FIELDS = ('footprints', 'tracks', 'drawings')
+    # Calques de drawings conservés en mode compact: la fabrication n'est
+    # jamais dessinée ni exportée
+    SLIM_DRAWINGS = ('silkscreen',)
+    # Listes d'enregistrements compacts, sérialisées en tuples
+    RECORD_FIELDS = {'components': Component, 'bom_data': BomEntry}
+    
+    # Index spatiaux: type -> champ géométrique dont ils dépendent
+    SPATIAL_KINDS = {
+        'components': None,
+        'footprints': 'footprints',
+        'pads': 'footprints',
+        'tracks': 'tracks',
+        'track_chains': 'tracks',
+    }
+    
+    # Rôle des colonnes de pcbdata.bom.fields d'après leur nom dans
+    # config.fields (en minuscules); les autres colonnes sont des champs
+    # supplémentaires (extra_fields)
+    BOM_FIELD_ROLES = {
+        'value': 'value',
+        'footprint': 'footprint',
+        'lcsc': 'lcsc',
+        'lcsc part': 'lcsc',
+        'lcsc part #': 'lcsc',
+        'lcsc part number': 'lcsc',
+        'lcsc_part': 'lcsc',
+        'jlcpcb part #': 'lcsc',
+        'mpn': 'mpn',
+        'mfr part #': 'mpn',
+        'mfr. part #': 'mpn',
+        'manufacturer part number': 'mpn',
+        'manufacturer_part_number': 'mpn',
+    }
+    # Colonnes par défaut des fichiers sans en-tête de champs
+    DEFAULT_BOM_FIELDS = ('Value', 'Footprint')
+    LCSC_RE = re.compile(r'C\d+')
+    
+    # Étapes du chargement remontées à progress_callback(phase, libellé)
+    LOAD_PHASES = {
+        'read': "Lecture du fichier",
+        'decompress': "Décompression LZ-String",
+        'json': "Décodage JSON",
+        'lcsc': "Chargement LCSC",
+        'extract': "Extraction du modèle",
+    }
+    
+    # Libellés des étapes chronométrées dans load_timings
+    STAGE_LABELS = {
+        'decode': "décodage HTML/JSON",
+        'lcsc': "CSV LCSC",
+        'geometry': "footprints",
+        'bom': "BOM",
+        'extract': "extraction",
+        'total': "total",
+    }
+    
+    def __init__(self, html_file_path, use_cache=True, cache_dir=None,
+                 progress_callback=None, cancel_event=None, lazy=False, slim=False,
+                 pipeline=True):
         self.html_file_path = html_file_path
+        self.use_cache = use_cache
+        self.cache_dir = cache_dir
+        self.lazy = lazy
+        self.slim = slim
+        self.pipeline = pipeline
+        self.load_timings = {}
+        self._source_stat = None
+        self._geometry = {}
+        self._geometry_blobs = {}
+        self.progress_callback = progress_callback
+        self.cancel_event = cancel_event
+        self.from_cache = False
         self.pcbdata = None
         self.components = []
         self.bom_data = []
+        self.bom_fields = None
+        self.extra_fields = ()
         self.board_bbox = None
         self.lcsc_data = {}
         self.footprints = []
         self.edges = []
         self.tracks = {}
         self.drawings = {}
-        
-    def _load_lcsc_csv(self):
-        """Charge le fichier CSV LCSC s'il existe"""
+        self.bom_row_by_ref = {}
+        self.bom_row_by_id = {}
+        self.component_store = None
+        self._spatial = {}
+    
+    def _get_geometry(self, field):
+        """Accès à un champ géométrique, décodé à la demande puis conservé"""
+        if field not in self._geometry:
+            blob = self._geometry_blobs.pop(field)
+            value = ParsedBoardCache.decode(blob)
+            if self.slim and field == 'drawings':
+                value = self._slim_drawings(value)
+            self._geometry[field] = value
+        return self._geometry[field]
+    
+    def _set_geometry(self, field, value):
+        self._geometry_blobs.pop(field, None)
+        self._geometry[field] = value
+    
+    def is_loaded(self, field):
+        """Indique si un champ géométrique est déjà décodé"""
+        return field not in self._geometry_blobs
+    
+    footprints = property(lambda self: self._get_geometry('footprints'),
+                          lambda self, value: self._set_geometry('footprints', value))
+    tracks = property(lambda self: self._get_geometry('tracks'),
+                      lambda self, value: self._set_geometry('tracks', value))
+    drawings = property(lambda self: self._get_geometry('drawings'),
+                        lambda self, value: self._set_geometry('drawings', value))
+        
+    def _find_lcsc_csv(self):
+        """Retourne le chemin du fichier CSV LCSC ou None"""
         html_dir = Path(self.html_file_path).parent
         possible_paths = [
             html_dir.parent / 'lcsc' / 'BOM-lcsc.csv',
@@ -397,137 +1360,337 @@ class IBomParser:
             html_dir.parent / 'BOM-lcsc.csv',
         ]
         
-        csv_path = None
         for path in possible_paths:
             if path.exists():
-                csv_path = path
-                break
+                return path
+        return None
+    
+    def _load_lcsc_csv(self, csv_path=None, log=print):
+        """Charge le fichier CSV LCSC s'il existe (messages passés à log)"""
+        if csv_path is None:
+            csv_path = self._find_lcsc_csv()
         
         if not csv_path:
             return
         
         try:
-            # Essayer différents encodages (UTF-16 pour les exports Excel)
-            content = None
-            encoding_used = None
-            
-            for encoding in ['utf-8-sig', 'utf-16', 'utf-16-le', 'utf-8', 'latin-1', 'cp1252']:
-                try:
-                    with open(csv_path, 'r', encoding=encoding) as f:
-                        content = f.read()
-                        encoding_used = encoding
-                        break
-                except (UnicodeDecodeError, UnicodeError):
-                    continue
-            
-            if content is None:
-                print(f"Impossible de décoder le fichier CSV avec les encodages supportés")
-                return
-            
-            print(f"Encodage CSV détecté: {encoding_used}")
-            
-            # Détecter le délimiteur (tabulation, virgule ou point-virgule)
-            if '\t' in content[:2048]:
-                delimiter = '\t'
-            elif ';' in content[:2048]:
-                delimiter = ';'
+            self.lcsc_data = LcscIndex.load(csv_path, use_sidecar=self.use_cache, log=log)
+            log(f"Fichier LCSC chargé: {len(self.lcsc_data)} références")
+        except Exception as e:
+            log(f"Erreur lors du chargement du fichier LCSC: {e}")
+        
+    def _report(self, phase):
+        """Signale le début d'une étape et interrompt si le chargement est annulé"""
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            raise LoadCancelled(self.html_file_path)
+        if self.progress_callback:
+            self.progress_callback(phase, self.LOAD_PHASES.get(phase, phase))
+    
+    def _get_cache(self):
+        """Retourne le ParsedBoardCache à utiliser, ou None si désactivé"""
+        if not self.use_cache:
+            return None
+        if self.cache_dir:
+            return ParsedBoardCache(self.cache_dir)
+        return ParsedBoardCache.for_html(self.html_file_path)
+    
+    def _snapshot_model(self):
+        """Modèle extrait sous forme de dict sérialisable"""
+        model = {field: getattr(self, field) for field in self.MODEL_FIELDS}
+        for field in self.RECORD_FIELDS:
+            model[field] = [record.as_tuple() for record in model[field]]
+        return model
+    
+    def _restore_model(self, blobs):
+        """Restaure le modèle extrait depuis les champs encodés du cache
+        
+        En mode lazy, la géométrie lourde reste encodée jusqu'au premier
+        accès par un renderer.
+        """
+        for field in self.MODEL_FIELDS:
+            if self.lazy and field in self.LAZY_FIELDS:
+                self._geometry.pop(field, None)
+                self._geometry_blobs[field] = blobs[field]
+            elif field in self.RECORD_FIELDS:
+                record_type = self.RECORD_FIELDS[field]
+                setattr(self, field, [record_type(*map(intern_str, values))
+                                      for values in ParsedBoardCache.decode(blobs[field])])
             else:
-                delimiter = ','
-            
-            # Parser le CSV depuis la chaîne
-            import io
-            reader = csv.DictReader(io.StringIO(content), delimiter=delimiter)
-            headers = reader.fieldnames or []
-            headers_clean = [h.strip().strip('"').strip() for h in headers]
-            
-            # Chercher les colonnes (insensible à la casse)
-            designator_col = None
-            lcsc_col = None
-            
-            for i, h in enumerate(headers_clean):
-                h_lower = h.lower()
-                if h_lower == 'designator':
-                    designator_col = headers[i]
-                elif h_lower == 'lcsc' or h_lower == 'lcsc part number':
-                    lcsc_col = headers[i]
-                elif h_lower == 'supplier part' and not lcsc_col:
-                    lcsc_col = headers[i]
+                setattr(self, field, ParsedBoardCache.decode(blobs[field]))
+        if self.slim and self.is_loaded('drawings'):
+            self.drawings = self._slim_drawings(self.drawings)
+        self._index_bom()
+        self.from_cache = True
+    
+    # Affectation de pcbdata: soit un appel LZString (groupe 1 = guillemet
+    # ouvrant), soit un objet JSON littéral commençant à la fin du match
+    _PCBDATA_RE = re.compile(
+        rb'pcbdata\s*=\s*(?:JSON\.parse\(\s*)?'
+        rb'(?:LZString\.decompressFromBase64\(\s*(["\'])|(?=\{))'
+    )
+    _LZ_CALL_RE = re.compile(rb'LZString\.decompressFromBase64\(\s*(["\'])')
+    
+    READ_CHUNK = 1 << 20
+    
+    @contextlib.contextmanager
+    def _open_source(self, check_stat=False):
+        """Contenu brut du fichier iBOM: mmap du HTML, ou tampon rempli en
+        flux par gzip/lzma pour un .html.gz/.html.xz (sans fichier temporaire)
+        
+        Le stat noté (ou vérifié avec check_stat) est celui du fichier sur
+        disque; le hash de cache porte sur le HTML décompressé.
+        """
+        opener = COMPRESSED_OPENERS.get(Path(self.html_file_path).suffix.lower())
+        with open(self.html_file_path, 'rb') as f:
+            stat = self._stat_key(f)
+            if check_stat:
+                if self._source_stat is not None and stat != self._source_stat:
+                    raise ValueError("Le fichier a changé depuis le chargement, recharger la carte")
+            else:
+                self._source_stat = stat
             
-            if not designator_col or not lcsc_col:
-                print(f"Colonnes CSV manquantes. Headers: {headers_clean}")
+            if opener is None:
+                try:
+                    buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                except ValueError:
+                    # Fichier vide: mmap refuse une longueur nulle
+                    raise ValueError("Impossible de trouver les données pcbdata dans le fichier HTML")
+                with buf:
+                    yield buf
                 return
             
-            for row in reader:
-                designators = row.get(designator_col, '')
-                lcsc_code = row.get(lcsc_col, '').strip()
-                
-                if lcsc_code:
-                    for ref in designators.split(','):
-                        ref = ref.strip()
-                        if ref:
-                            self.lcsc_data[ref] = lcsc_code
-            
-            print(f"Fichier LCSC chargé: {len(self.lcsc_data)} références")
-        except Exception as e:
-            print(f"Erreur lors du chargement du fichier LCSC: {e}")
-        
-    def parse(self):
-        """Parse le fichier HTML et extrait les données PCB"""
-        with open(self.html_file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # Chercher les données compressées
-        lz_match = re.search(r'LZString\.decompressFromBase64\(["\']([^"\']+)["\']\)', content)
+            buf = bytearray()
+            try:
+                with opener(f) as stream:
+                    while True:
+                        chunk = stream.read(self.READ_CHUNK)
+                        if not chunk:
+                            break
+                        buf += chunk
+                        if self.cancel_event is not None and self.cancel_event.is_set():
+                            raise LoadCancelled(self.html_file_path)
+            except (OSError, EOFError, lzma.LZMAError) as e:
+                raise ValueError(f"Fichier compressé illisible: {e}")
+            yield buf
+    
+    def _read_pcbdata(self, buf):
+        """Localise et décode pcbdata dans le contenu brut (bytes ou mmap)
+        
+        Un seul passage regex trouve l'affectation; seule la tranche base64
+        est décodée pour les fichiers compressés (texte JSON complet puis
+        json.loads, sans décodage en flux), et le JSON non compressé
+        est lu par raw_decode à partir de l'offset (pas de regex DOTALL qui
+        couperait l'objet au premier '};').
+        """
+        match = self._PCBDATA_RE.search(buf)
+        if not match:
+            # Format inattendu: chercher un appel LZString n'importe où
+            match = self._LZ_CALL_RE.search(buf)
+            if not match:
+                raise ValueError("Impossible de trouver les données pcbdata dans le fichier HTML")
         
-        if lz_match:
-            compressed_data = lz_match.group(1)
+        if match.group(1) is not None:
+            start = match.end()
+            end = buf.find(match.group(1), start)
+            if end < 0:
+                raise ValueError("Données compressées pcbdata tronquées")
+            compressed_data = buf[start:end]
             print(f"Données compressées trouvées ({len(compressed_data)} caractères)")
+            self._report('decompress')
             
             try:
-                if HAS_LZSTRING:
+                # Le décodeur intégré est plus rapide que le paquet lzstring,
+                # qui ne sert plus que de secours
+                decompressed = LZString.decompress_from_base64(compressed_data)
+                if not decompressed and HAS_LZSTRING:
                     lz = LZStringLib()
-                    decompressed = lz.decompressFromBase64(compressed_data)
-                else:
-                    decompressed = LZString.decompress_from_base64(compressed_data)
+                    decompressed = lz.decompressFromBase64(compressed_data.decode('ascii'))
+                del compressed_data
                 
                 if decompressed:
-                    self.pcbdata = json.loads(decompressed)
+                    self._report('json')
+                    pcbdata = json.loads(decompressed)
+                    del decompressed
                     print(f"Décompression réussie!")
-                else:
-                    raise ValueError("Échec de la décompression LZ-String")
+                    return pcbdata
+                raise ValueError("Échec de la décompression LZ-String")
+            except LoadCancelled:
+                raise
             except Exception as e:
                 print(f"Erreur lors de la décompression: {e}")
                 raise ValueError(f"Impossible de décompresser les données: {e}")
-        else:
-            pcbdata_match = re.search(r'var\s+pcbdata\s*=\s*(\{.*?\});', content, re.DOTALL)
-            if not pcbdata_match:
-                pcbdata_match = re.search(r'pcbdata\s*=\s*(\{.*?\})\s*[;\n]', content, re.DOTALL)
+        
+        self._report('json')
+        # L'objet s'arrête avant la fin de son bloc <script> (une chaîne JSON
+        # ne peut pas contenir '</script>'): seule cette tranche est décodée,
+        # directement depuis le mmap, sans copie intermédiaire en bytes
+        start = match.end()
+        end = buf.find(b'</script>', start)
+        if end < 0:
+            end = len(buf)
+        with memoryview(buf) as view, view[start:end] as payload:
+            text = str(payload, 'utf-8')
+        decoder = json.JSONDecoder()
+        try:
+            pcbdata, _ = decoder.raw_decode(text)
+        except json.JSONDecodeError:
+            # Virgules finales tolérées par JavaScript mais pas par JSON
+            text = re.sub(r',\s*}', '}', text)
+            text = re.sub(r',\s*]', ']', text)
+            pcbdata, _ = decoder.raw_decode(text)
+        return pcbdata
+    
+    _CONFIG_RE = re.compile(rb'\bconfig\s*=\s*(?=\{)')
+    
+    def _read_bom_fields(self, buf):
+        """Noms des colonnes de pcbdata.bom.fields (config.fields), ou None"""
+        match = self._CONFIG_RE.search(buf)
+        if not match:
+            return None
+        end = buf.find(b'</script>', match.end())
+        text = buf[match.end():end if end >= 0 else len(buf)].decode('utf-8', 'replace')
+        try:
+            config, _ = json.JSONDecoder().raw_decode(text)
+        except json.JSONDecodeError:
+            return None
+        fields = config.get('fields') if isinstance(config, dict) else None
+        if isinstance(fields, list) and all(isinstance(name, str) for name in fields):
+            return fields
+        return None
+    
+    def parse(self):
+        """Parse le fichier HTML et extrait les données PCB
+        
+        Le CSV LCSC et le HTML sont indépendants: en mode pipeline, le CSV
+        est chargé dans un thread pendant le décodage du HTML, et les deux
+        étapes se rejoignent avant l'extraction du modèle et _extract_bom.
+        La durée de chaque étape est notée dans load_timings (secondes).
+        """
+        start = time.perf_counter()
+        self.load_timings = {}
+        lcsc_path = self._find_lcsc_csv()
+        cache = self._get_cache()
+        cache_key = None
+        executor = None
+        lcsc_future = None
+        lcsc_messages = []  # Messages du thread LCSC, affichés après la jointure
+        
+        try:
+            self._report('read')
+            with self._open_source() as buf:
+                if cache:
+                    cache_key = cache.make_key(buf, lcsc_path)
+                    model = cache.load(cache_key)
+                    if model and all(field in model for field in self.MODEL_FIELDS):
+                        self._restore_model(model)
+                        self._build_indexes()
+                        print(f"Modèle chargé depuis le cache ({len(self.components)} composants)")
+                        return self
+                
+                if self.pipeline and lcsc_path:
+                    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='ibom-lcsc')
+                    lcsc_future = executor.submit(self._timed, 'lcsc', self._load_lcsc_csv,
+                                                  lcsc_path, lcsc_messages.append)
+                
+                self.pcbdata = self._timed('decode', self._read_pcbdata, buf)
+                self.bom_fields = self._read_bom_fields(buf)
             
-            if pcbdata_match:
-                pcbdata_str = pcbdata_match.group(1)
-                try:
-                    self.pcbdata = json.loads(pcbdata_str)
-                except json.JSONDecodeError:
-                    pcbdata_str = re.sub(r',\s*}', '}', pcbdata_str)
-                    pcbdata_str = re.sub(r',\s*]', ']', pcbdata_str)
-                    self.pcbdata = json.loads(pcbdata_str)
+            self._report('lcsc')
+            if lcsc_future is not None:
+                lcsc_future.result()
+                for message in lcsc_messages:
+                    print(message)
             else:
-                raise ValueError("Impossible de trouver les données pcbdata dans le fichier HTML")
-        
-        self._load_lcsc_csv()
+                self._timed('lcsc', self._load_lcsc_csv, lcsc_path)
+            self._report('extract')
+            self._timed('geometry', self._extract_geometry)
+            self._timed('bom', self._extract_bom)
+            self._timed('extract', self._extract_rest)
+        finally:
+            if executor is not None:
+                # Erreur ou annulation avant la jointure: le CSV n'est pas
+                # lu s'il n'a pas commencé, sinon il est attendu pour
+                # qu'aucun thread n'écrive dans ce parser après parse()
+                lcsc_future.cancel()
+                executor.shutdown(wait=True)
+        
+        if cache:
+            cache.store(cache_key, self._snapshot_model())
+        if self.slim:
+            self._release_raw()
+        
+        self.load_timings['total'] = time.perf_counter() - start
+        print("Étapes: " + ", ".join(f"{self.STAGE_LABELS.get(stage, stage)} "
+                                      f"{seconds * 1000:.0f} ms"
+                                      for stage, seconds in self.load_timings.items()))
+        return self
+    
+    def _timed(self, stage, func, *args, **kwargs):
+        """Exécute une étape du chargement et note sa durée dans load_timings"""
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self.load_timings[stage] = time.perf_counter() - start
+    
+    def _extract_geometry(self):
+        """Footprints et composants"""
         self._extract_footprints()
         self._extract_components()
-        self._extract_bom()
+    
+    def _extract_rest(self):
+        """Contours, pistes, dessins, bbox et index"""
         self._extract_edges()
         self._extract_tracks()
         self._extract_drawings()
         self._calculate_board_bbox()
-        
-        return self
+        self._build_indexes()
     
-    def _extract_footprints(self):
-        """Extrait les footprints avec leurs pads et drawings"""
-        self.footprints = self.pcbdata.get('footprints', [])
+    @staticmethod
+    def _stat_key(f):
+        st = os.fstat(f.fileno())
+        return (st.st_size, st.st_mtime_ns)
+    
+    @classmethod
+    def _slim_drawings(cls, drawings):
+        return {layer: value for layer, value in drawings.items()
+                if layer in cls.SLIM_DRAWINGS}
+    
+    def _release_raw(self):
+        """Libère l'arbre JSON brut une fois le modèle extrait
+        
+        Les footprints, edges et tracks extraits sont des sous-arbres de
+        pcbdata et restent vivants; seul le reste (bom, metadata, drawings
+        de fabrication...) est rendu au ramasse-miettes.
+        """
+        self.pcbdata = None
+        if self.is_loaded('drawings'):
+            self.drawings = self._slim_drawings(self.drawings)
+    
+    def is_hydrated(self):
+        """Indique si l'arbre pcbdata brut est disponible"""
+        return self.pcbdata is not None
+    
+    def rehydrate(self):
+        """Relit pcbdata depuis le fichier HTML quand un champ brut est nécessaire
+        
+        Le modèle extrait n'est pas modifié; les drawings complets sont
+        restaurés. Lève ValueError si le fichier a changé depuis le
+        chargement (le modèle ne lui correspondrait plus).
+        """
+        if self.pcbdata is not None:
+            return self.pcbdata
+        
+        with self._open_source(check_stat=True) as buf:
+            pcbdata = self._read_pcbdata(buf)
+        
+        self.pcbdata = pcbdata
+        self.drawings = pcbdata.get('drawings', {})
+        return pcbdata
+    
+    def _extract_footprints(self):
+        """Extrait les footprints avec leurs pads et drawings"""
+        self.footprints = self.pcbdata.get('footprints', [])
         print(f"Footprints extraits: {len(self.footprints)}")
     
     def _extract_edges(self):
@@ -572,23 +1735,55 @@ class IBomParser:
                     x = sum(p.get('pos', [0, 0])[0] for p in pads) / len(pads)
                     y = sum(p.get('pos', [0, 0])[1] for p in pads) / len(pads)
             
-            self.components.append({
-                'ref': ref,
-                'id': fp_id,
-                'x': x,
-                'y': y,
-                'layer': layer,
-                'bbox': bbox
-            })
+            self.components.append(Component(intern_str(ref), fp_id, x, y, intern_str(layer), bbox))
+    
+    @classmethod
+    def _bom_columns(cls, field_names):
+        """Index des colonnes par rôle (value, footprint, lcsc, mpn) et
+        index des colonnes supplémentaires, résolus une fois par fichier"""
+        columns = {'value': None, 'footprint': None, 'lcsc': None, 'mpn': None}
+        extra = []
+        for index, name in enumerate(field_names):
+            role = cls.BOM_FIELD_ROLES.get(name.strip().lower())
+            if role and columns[role] is None:
+                columns[role] = index
+            if role not in ('value', 'footprint', 'lcsc'):
+                # Le MPN reste aussi exporté comme colonne supplémentaire
+                extra.append(index)
+        columns['extra'] = extra
+        return columns
     
     def _extract_bom(self):
-        """Extrait les données BOM"""
+        """Extrait les données BOM
+        
+        Les colonnes sont lues à leur index d'après l'en-tête de champs
+        (config.fields). Sans en-tête, valeur et footprint sont les deux
+        premières colonnes et le code LCSC est cherché dans tous les champs.
+        """
         self.bom_data = []
         
         bom = self.pcbdata.get('bom', {})
         fields_data = bom.get('fields', {})
         both = bom.get('both', [])
         
+        field_names = self.bom_fields or self.DEFAULT_BOM_FIELDS
+        columns = self._bom_columns(field_names)
+        value_col = columns['value']
+        footprint_col = columns['footprint']
+        lcsc_col = columns['lcsc']
+        mpn_col = columns['mpn']
+        extra_cols = columns['extra']
+        scan_lcsc = self.bom_fields is None
+        self.extra_fields = tuple(field_names[i] for i in extra_cols)
+        lcsc_match = self.LCSC_RE.fullmatch
+        
+        # Toutes les colonnes utiles en un seul itemgetter; une case vide
+        # ajoutée en fin de ligne (index -1) sert aux rôles sans colonne
+        width = len(field_names)
+        pick = itemgetter(*[-1 if col is None else col
+                            for col in (value_col, footprint_col, lcsc_col, mpn_col)], *extra_cols)
+        blank = ['']
+        
         for group in both:
             if not isinstance(group, list):
                 continue
@@ -600,33 +1795,43 @@ class IBomParser:
                 ref_name = ref_item[0]
                 fp_id = ref_item[1]
                 
-                value = ''
-                footprint_name = ''
-                lcsc = ''
+                component_fields = fields_data.get(str(fp_id)) or []
+                if len(component_fields) >= width:
+                    row = component_fields + blank
+                else:
+                    row = list(component_fields) + [''] * (width + 1 - len(component_fields))
+                value, footprint_name, lcsc, mpn, *extra = [field or '' for field in pick(row)]
                 
-                fp_id_str = str(fp_id)
-                if fp_id_str in fields_data:
-                    component_fields = fields_data[fp_id_str]
-                    if len(component_fields) >= 1:
-                        value = component_fields[0] or ''
-                    if len(component_fields) >= 2:
-                        footprint_name = component_fields[1] or ''
-                    for field_val in component_fields:
-                        if isinstance(field_val, str) and len(field_val) > 1:
-                            if field_val.startswith('C') and field_val[1:].isdigit():
-                                lcsc = field_val
-                                break
+                if lcsc_col is not None:
+                    lcsc = lcsc.strip()
+                    if not lcsc_match(lcsc):
+                        lcsc = ''
+                elif scan_lcsc:
+                    lcsc = next((f for f in component_fields
+                                 if isinstance(f, str) and lcsc_match(f)), '')
                 
                 if not lcsc and ref_name in self.lcsc_data:
                     lcsc = self.lcsc_data[ref_name]
                 
-                self.bom_data.append({
-                    'ref': ref_name,
-                    'id': fp_id,
-                    'value': value,
-                    'footprint': footprint_name,
-                    'lcsc': lcsc
-                })
+                # Chaînes partagées: une seule copie de chaque footprint/valeur
+                self.bom_data.append(BomEntry(intern_str(ref_name), fp_id, intern_str(value),
+                                              intern_str(footprint_name), intern_str(lcsc),
+                                              intern_str(mpn),
+                                              tuple(map(intern_str, extra)) if extra else ()))
+        
+        self._index_bom()
+    
+    def _index_bom(self):
+        """Index ref -> ligne BOM et id footprint -> ligne BOM
+        
+        Seule la première occurrence est gardée, comme l'ancien parcours
+        linéaire de bom_data.
+        """
+        self.bom_row_by_ref = {}
+        self.bom_row_by_id = {}
+        for row, entry in enumerate(self.bom_data):
+            self.bom_row_by_ref.setdefault(entry.ref, row)
+            self.bom_row_by_id.setdefault(entry.id, row)
     
     def _calculate_board_bbox(self):
         """Calcule la bounding box du PCB"""
@@ -652,35 +1857,1472 @@ class IBomParser:
             else:
                 self.board_bbox = {'minx': 0, 'miny': 0, 'maxx': 100, 'maxy': 100}
     
+    def _build_indexes(self):
+        """Construit les structures de requête à partir du modèle extrait"""
+        bom_rows = [self.get_bom_row(comp.ref, comp.id) for comp in self.components]
+        self.component_store = ComponentStore(self.components, self.bom_data, bom_rows)
+        
+        # En mode lazy, les index sur une géométrie encore encodée ne sont
+        # construits qu'à la première requête
+        self._spatial = {}
+        for kind, field in self.SPATIAL_KINDS.items():
+            if field is None or self.is_loaded(field):
+                self.spatial_index(kind)
+    
+    def _build_spatial(self, kind):
+        """Construit la grille d'un type d'élément
+        
+        Éléments retournés par les requêtes:
+        components -> indice dans components, footprints -> indice dans
+        footprints, pads -> (indice footprint, pad), tracks -> (couche, piste),
+        track_chains -> (couche, largeur, (x0, y0, x1, y1, ...))
+        """
+        extent = self.board_bbox or {'minx': 0, 'miny': 0, 'maxx': 100, 'maxy': 100}
+        
+        if kind == 'components':
+            grid = SpatialGrid.for_extent(extent, len(self.components))
+            for i, comp in enumerate(self.components):
+                grid.insert(i, comp.x, comp.y, comp.x, comp.y)
+        
+        elif kind == 'footprints':
+            grid = SpatialGrid.for_extent(extent, len(self.footprints))
+            for fp_id, fp in enumerate(self.footprints):
+                bounds = footprint_bounds(fp)
+                if bounds:
+                    grid.insert(fp_id, *bounds)
+        
+        elif kind == 'pads':
+            pads = [(fp_id, pad) for fp_id, fp in enumerate(self.footprints)
+                    for pad in fp.get('pads', [])]
+            grid = SpatialGrid.for_extent(extent, len(pads))
+            for fp_id, pad in pads:
+                grid.insert((fp_id, pad), *pad_bounds(pad))
+        
+        elif kind == 'tracks':
+            tracks = [(layer, track) for layer, layer_tracks in self.tracks.items()
+                      if isinstance(layer_tracks, list) for track in layer_tracks]
+            grid = SpatialGrid.for_extent(extent, len(tracks))
+            for layer, track in tracks:
+                bounds = track_bounds(track)
+                if bounds:
+                    grid.insert((layer, track), *bounds)
+        
+        elif kind == 'track_chains':
+            # Segments chaînés en polylignes: un élément de canvas par chaîne
+            chains = [(layer, width, coords)
+                      for layer, layer_tracks in self.tracks.items()
+                      if isinstance(layer_tracks, list)
+                      for width, coords in chain_track_segments(layer_tracks)]
+            grid = SpatialGrid.for_extent(extent, len(chains))
+            for chain in chains:
+                half, coords = chain[1] / 2, chain[2]
+                xs, ys = coords[0::2], coords[1::2]
+                grid.insert(chain, min(xs) - half, min(ys) - half,
+                            max(xs) + half, max(ys) + half)
+        
+        else:
+            raise ValueError(f"Type d'index spatial inconnu: {kind}")
+        
+        return grid
+    
+    def adopt_geometry(self, other):
+        """Reprend la géométrie décodée et les index spatiaux de other s'ils sont identiques
+        
+        Rechargement d'une carte dont seuls la BOM ou le CSV LCSC ont changé:
+        la scène déjà dessinée pour other reste valable. Retourne False si
+        le contour, les footprints, les pistes ou les dessins diffèrent.
+        """
+        if self.board_bbox != other.board_bbox or self.edges != other.edges:
+            return False
+        for field in self.LAZY_FIELDS:
+            if not self.is_loaded(field) and not other.is_loaded(field):
+                same = self._geometry_blobs[field] == other._geometry_blobs[field]
+            else:
+                same = getattr(self, field) == getattr(other, field)
+            if not same:
+                return False
+        
+        for field in self.LAZY_FIELDS:
+            if other.is_loaded(field):
+                self._set_geometry(field, other._geometry[field])
+        for kind, field in self.SPATIAL_KINDS.items():
+            if field is not None and kind in other._spatial:
+                self._spatial[kind] = other._spatial[kind]
+        return True
+    
+    def spatial_index(self, kind):
+        """Grille spatiale d'un type d'élément (voir SPATIAL_KINDS)"""
+        grid = self._spatial.get(kind)
+        if grid is None:
+            grid = self._spatial[kind] = self._build_spatial(kind)
+        return grid
+    
+    def query_rect(self, kind, x1, y1, x2, y2):
+        """Éléments d'un type qui intersectent le rectangle (ordre du fichier)"""
+        return self.spatial_index(kind).query_rect(x1, y1, x2, y2)
+    
+    def query_point(self, kind, x, y):
+        """Éléments d'un type dont la boîte contient le point"""
+        return self.spatial_index(kind).query_point(x, y)
+    
+    def nearest(self, kind, x, y, k=1):
+        """Les k éléments d'un type les plus proches du point"""
+        return self.spatial_index(kind).nearest(x, y, k)
+    
+    def get_bom_row(self, ref, fp_id=None):
+        """Index dans bom_data de la ligne d'une référence (-1 si absente)
+        
+        Même priorité que l'ancien parcours: la première ligne dont la ref
+        ou l'id footprint correspond.
+        """
+        row = self.bom_row_by_ref.get(ref, -1)
+        if fp_id is not None:
+            id_row = self.bom_row_by_id.get(fp_id, -1)
+            if id_row >= 0 and (row < 0 or id_row < row):
+                row = id_row
+        return row
+    
     def get_bom_for_ref(self, ref, fp_id=None):
         """Récupère les infos BOM pour une référence"""
-        for bom_entry in self.bom_data:
-            if bom_entry['ref'] == ref:
-                return bom_entry
-            if fp_id is not None and bom_entry.get('id') == fp_id:
-                return bom_entry
-        return {'ref': ref, 'value': '', 'footprint': '', 'lcsc': '', 'id': fp_id}
-    
-    def get_components_in_rect(self, x1, y1, x2, y2):
-        """Retourne les composants dans le rectangle spécifié"""
-        min_x, max_x = min(x1, x2), max(x1, x2)
-        min_y, max_y = min(y1, y2), max(y1, y2)
+        row = self.get_bom_row(ref, fp_id)
+        if row >= 0:
+            return self.bom_data[row]
+        return BomEntry(ref, fp_id, '', '', '')
+    
+    def get_components_by_refs(self, refs):
+        """Retourne les composants (format de sélection) dont la ref est dans refs"""
+        store = self.component_store
+        return store.rows([i for i, ref in enumerate(store.refs) if ref in refs])
+    
+    def get_all_components(self):
+        """Retourne tous les composants de la carte (format de sélection)"""
+        store = self.component_store
+        return store.rows(range(len(store)))
+    
+    def get_components_in_rect(self, x1, y1, x2, y2, layer=None, component_status=None,
+                               status=None):
+        """Retourne les composants dans le rectangle spécifié
+        
+        Filtres optionnels: couche ('F'/'B') et, si component_status est
+        donné, statut (None = en attente). Avec NumPy, les masques portent
+        sur les colonnes entières; sinon la grille spatiale donne d'abord
+        les indices du rectangle.
+        """
+        store = self.component_store
+        if HAS_NUMPY:
+            indices = store.select((x1, y1, x2, y2), layer, component_status, status)
+        else:
+            ids = self.spatial_index('components').query_ids(x1, y1, x2, y2)
+            indices = store.select(None, layer, component_status, status, ids=ids)
+        return store.rows(indices)
+
+
+# ==================== EXPORT BOM ====================
+
+BOM_EXPORT_HEADERS = ['Quantité', 'Référence', 'Valeur', 'Footprint', 'LCSC']
+
+
+def group_bom_rows(components, extra_fields=()):
+    """Regroupe les composants par (valeur, footprint, lcsc)
+    
+    Retourne les lignes d'export triées: [quantité, refs, valeur, footprint,
+    lcsc], suivies des valeurs des extra_fields (celles du premier composant
+    du groupe).
+    """
+    grouped = {}
+    extras = {}
+    for comp in components:
+        key = (comp['value'], comp['footprint'], comp['lcsc'])
+        grouped.setdefault(key, []).append(comp['ref'])
+        if extra_fields and key not in extras:
+            extras[key] = comp.get('extra', ())
+    
+    rows = []
+    for (value, footprint, lcsc), refs in sorted(grouped.items()):
+        refs = sorted(refs)
+        row = [len(refs), ', '.join(refs), value, footprint, lcsc]
+        if extra_fields:
+            extra = list(extras[(value, footprint, lcsc)])
+            row.extend((extra + [''] * len(extra_fields))[:len(extra_fields)])
+        rows.append(row)
+    return rows
+
+
+def write_bom_csv(components, filename, extra_fields=()):
+    """Écrit le BOM groupé des composants dans un fichier CSV"""
+    with open(filename, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(BOM_EXPORT_HEADERS + list(extra_fields))
+        writer.writerows(group_bom_rows(components, extra_fields))
+
+
+def write_bom_xlsx(components, filename, extra_fields=()):
+    """Écrit le BOM groupé des composants dans un classeur Excel"""
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "BOM Sélection"
+    
+    header_font = Font(bold=True, color='FFFFFF')
+    header_fill = PatternFill(start_color='4472C4', end_color='4472C4', fill_type='solid')
+    thin_border = Border(
+        left=Side(style='thin'), right=Side(style='thin'),
+        top=Side(style='thin'), bottom=Side(style='thin')
+    )
+    
+    for col, header in enumerate(BOM_EXPORT_HEADERS + list(extra_fields), 1):
+        cell = ws.cell(row=1, column=col, value=header)
+        cell.font = header_font
+        cell.fill = header_fill
+        cell.border = thin_border
+    
+    for row, values in enumerate(group_bom_rows(components, extra_fields), 2):
+        for col, value in enumerate(values, 1):
+            ws.cell(row=row, column=col, value=value).border = thin_border
+    
+    ws.column_dimensions['A'].width = 10
+    ws.column_dimensions['B'].width = 30
+    ws.column_dimensions['C'].width = 20
+    ws.column_dimensions['D'].width = 25
+    ws.column_dimensions['E'].width = 15
+    for col in range(len(BOM_EXPORT_HEADERS) + 1, len(BOM_EXPORT_HEADERS) + len(extra_fields) + 1):
+        ws.column_dimensions[get_column_letter(col)].width = 20
+    
+    wb.save(filename)
+
+
+BOM_WRITERS = {'csv': write_bom_csv, 'xlsx': write_bom_xlsx}
+
+
+def history_path_for(html_path):
+    """Fichier d'historique des sélections associé à un fichier iBOM"""
+    html_path = Path(html_path)
+    return html_path.parent / f".{ibom_stem(html_path)}_history.json"
+
+
+def zone_components(parser, entry):
+    """Composants d'une zone sauvegardée dans l'historique"""
+    rect = entry.get('rect')
+    if rect and len(rect) == 4:
+        return parser.get_components_in_rect(*rect)
+    saved_refs = set(c.get('ref') for c in entry.get('components', []))
+    return parser.get_components_by_refs(saved_refs)
+
+
+# ==================== BATCH ====================
+
+def _safe_filename(name):
+    """Nom de zone utilisable dans un nom de fichier"""
+    return re.sub(r'[^\w.-]+', '_', name).strip('_') or 'zone'
+
+
+def export_board(html_path, out_dir=None, formats=('csv',), zones=False, use_cache=True):
+    """Parse un fichier iBOM et écrit son BOM groupé (et celui de chaque zone)
+    
+    Exécuté dans un processus du pool: ne lève jamais, retourne un résumé
+    {'file', 'ok', 'outputs', 'components', 'zones', 'seconds', 'error'}.
+    """
+    html_path = Path(html_path)
+    out_dir = Path(out_dir) if out_dir else html_path.parent
+    result = {'file': str(html_path), 'ok': False, 'outputs': [], 'components': 0,
+              'zones': 0, 'seconds': 0.0, 'error': None}
+    start = time.perf_counter()
+    try:
+        # Les messages du parser de chaque processus brouilleraient la sortie
+        with contextlib.redirect_stdout(io.StringIO()):
+            parser = IBomParser(str(html_path), use_cache=use_cache, lazy=True, slim=True).parse()
+        
+        stem = ibom_stem(html_path)
+        exports = [(stem + '_bom', parser.get_all_components())]
+        history_file = history_path_for(html_path)
+        if zones and history_file.exists():
+            with open(history_file, 'r', encoding='utf-8') as f:
+                history = json.load(f)
+            for i, entry in enumerate(history):
+                name = _safe_filename(entry.get('name') or f"zone_{i + 1}")
+                exports.append((f"{stem}_{i + 1:02d}_{name}",
+                                zone_components(parser, entry)))
+            result['zones'] = len(history)
+        
+        out_dir.mkdir(parents=True, exist_ok=True)
+        for stem, components in exports:
+            for fmt in formats:
+                filename = out_dir / f"{stem}.{fmt}"
+                BOM_WRITERS[fmt](components, filename, parser.extra_fields)
+                result['outputs'].append(str(filename))
+        
+        result['components'] = len(parser.components)
+        result['ok'] = True
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+
+def find_ibom_files(directory, recursive=False):
+    """Fichiers iBOM d'un dossier, bruts ou compressés (triés)"""
+    directory = Path(directory)
+    pattern = '**/*' if recursive else '*'
+    return sorted(p for p in directory.glob(pattern) if is_ibom_file(p) and p.is_file())
+
+
+def run_batch(files, out_dir=None, formats=('csv',), zones=False, jobs=None,
+              use_cache=True, on_result=None):
+    """Exporte une liste de fichiers iBOM dans un pool de processus
+    
+    Un échec sur un fichier est rapporté dans son résumé sans interrompre
+    les autres. on_result(résumé) est appelé à chaque fichier terminé.
+    Retourne les résumés dans l'ordre de files.
+    """
+    files = [str(f) for f in files]
+    results = {}
+    
+    def done(path, result):
+        results[path] = result
+        if on_result:
+            on_result(result)
+    
+    if jobs == 1 or len(files) <= 1:
+        for path in files:
+            done(path, export_board(path, out_dir, formats, zones, use_cache))
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = {pool.submit(export_board, path, out_dir, formats, zones, use_cache): path
+                       for path in files}
+            for future in as_completed(futures):
+                path = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # Processus mort (mémoire, signal...): seul ce fichier échoue
+                    result = {'file': path, 'ok': False, 'outputs': [], 'components': 0,
+                              'zones': 0, 'seconds': 0.0, 'error': f"{type(e).__name__}: {e}"}
+                done(path, result)
+    
+    return [results[path] for path in files]
+
+
+def batch_main(args):
+    """Commande 'batch': export sans interface d'un dossier de fichiers iBOM"""
+    files = find_ibom_files(args.directory, args.recursive)
+    if not files:
+        print(f"Aucun fichier iBOM (.html, .html.gz, .html.xz) dans {args.directory}")
+        return 1
+    
+    formats = args.format or ['csv']
+    jobs = args.jobs or os.cpu_count() or 1
+    print(f"{len(files)} fichier(s), {jobs} processus, formats: {', '.join(formats)}")
+    
+    def report(result):
+        name = Path(result['file']).name
+        if result['ok']:
+            zones = f", {result['zones']} zone(s)" if result['zones'] else ""
+            print(f"  OK     {name}: {result['components']} composants{zones} "
+                  f"({result['seconds']:.2f} s)")
+        else:
+            print(f"  ÉCHEC  {name}: {result['error']}")
+    
+    start = time.perf_counter()
+    results = run_batch(files, args.out, formats, args.zones, jobs,
+                        use_cache=not args.no_cache, on_result=report)
+    failed = [r for r in results if not r['ok']]
+    
+    print(f"{len(results) - len(failed)}/{len(results)} fichier(s) exporté(s) "
+          f"en {time.perf_counter() - start:.2f} s")
+    for r in failed:
+        print(f"  échec: {r['file']} - {r['error']}")
+    return 1 if failed else 0
+
+
+# ==================== BACKGROUND LOADER ====================
+
+class LoadCancelled(Exception):
+    """Chargement interrompu car remplacé par une requête plus récente"""
+
+
+class BoardLoader:
+    """Charge une carte dans un thread de travail sans bloquer Tk
+    
+    La progression et le résultat transitent par une file interrogée depuis
+    le thread Tk avec root.after. Une nouvelle requête annule la précédente
+    (annulation coopérative entre deux étapes du parser) et les messages
+    d'un chargement remplacé sont ignorés.
+    """
+    
+    POLL_MS = 50
+    
+    def __init__(self, root, on_progress, on_done, on_error):
+        self.root = root
+        self.on_progress = on_progress
+        self.on_done = on_done
+        self.on_error = on_error
+        self.messages = queue.Queue()
+        self.job_id = 0
+        self.cancel_event = None
+        self.polling = False
+    
+    def is_loading(self):
+        return self.cancel_event is not None
+    
+    def load(self, filepath, **parser_kwargs):
+        """Lance le chargement de filepath, en remplaçant celui en cours"""
+        self.cancel()
+        self.job_id += 1
+        self.cancel_event = threading.Event()
+        
+        worker = threading.Thread(
+            target=self._run,
+            args=(self.job_id, filepath, self.cancel_event, parser_kwargs),
+            daemon=True
+        )
+        worker.start()
         
-        selected = []
-        for comp in self.components:
-            if min_x <= comp['x'] <= max_x and min_y <= comp['y'] <= max_y:
-                bom_info = self.get_bom_for_ref(comp['ref'], comp.get('id'))
-                selected.append({
-                    'ref': comp['ref'],
-                    'value': bom_info.get('value', ''),
-                    'footprint': bom_info.get('footprint', ''),
-                    'lcsc': bom_info.get('lcsc', ''),
-                    'x': comp['x'],
-                    'y': comp['y'],
-                    'layer': comp['layer']
-                })
+        if not self.polling:
+            self.polling = True
+            self.root.after(self.POLL_MS, self._poll)
+    
+    def cancel(self):
+        """Annule le chargement en cours (s'il y en a un)"""
+        if self.cancel_event is not None:
+            self.cancel_event.set()
+            self.cancel_event = None
+    
+    def _run(self, job_id, filepath, cancel_event, parser_kwargs):
+        """Corps du thread de travail"""
+        def progress(phase, label):
+            self.messages.put((job_id, 'progress', (phase, label)))
+        
+        try:
+            parser = IBomParser(filepath, progress_callback=progress,
+                                cancel_event=cancel_event, **parser_kwargs)
+            parser.parse()
+            if cancel_event.is_set():
+                raise LoadCancelled(filepath)
+            self.messages.put((job_id, 'done', parser))
+        except LoadCancelled:
+            pass
+        except Exception as e:
+            self.messages.put((job_id, 'error', e))
+    
+    def _poll(self):
+        """Traite les messages du thread de travail (thread Tk)"""
+        while True:
+            try:
+                job_id, kind, payload = self.messages.get_nowait()
+            except queue.Empty:
+                break
+            
+            if job_id != self.job_id:
+                continue  # Chargement remplacé
+            
+            if kind == 'progress':
+                self.on_progress(*payload)
+            elif kind == 'done':
+                self.cancel_event = None
+                self.on_done(payload)
+            elif kind == 'error':
+                self.cancel_event = None
+                self.on_error(payload)
+        
+        if self.is_loading():
+            self.root.after(self.POLL_MS, self._poll)
+        else:
+            self.polling = False
+
+
+# ==================== FILE WATCHER ====================
+
+def diff_components(old_components, new_components):
+    """Différences par référence entre deux listes de composants
+    
+    Les lignes de même ref sont comparées en bloc (refs dupliquées comme
+    REF**). Retourne {'added', 'removed', 'changed'} (ensembles de refs)
+    et {'old_rows', 'new_rows'}: ref -> lignes, pour les refs concernées.
+    """
+    old_rows, new_rows = {}, {}
+    for comp in old_components:
+        old_rows.setdefault(comp['ref'], []).append(comp)
+    for comp in new_components:
+        new_rows.setdefault(comp['ref'], []).append(comp)
+    
+    added = new_rows.keys() - old_rows.keys()
+    removed = old_rows.keys() - new_rows.keys()
+    changed = {ref for ref in old_rows.keys() & new_rows.keys()
+               if old_rows[ref] != new_rows[ref]}
+    touched = added | removed | changed
+    return {
+        'added': added,
+        'removed': removed,
+        'changed': changed,
+        'old_rows': {ref: old_rows[ref] for ref in touched if ref in old_rows},
+        'new_rows': {ref: new_rows[ref] for ref in touched if ref in new_rows},
+    }
+
+
+def _in_rect(comp, rect):
+    x1, y1, x2, y2 = rect
+    return min(x1, x2) <= comp['x'] <= max(x1, x2) and min(y1, y2) <= comp['y'] <= max(y1, y2)
+
+
+def apply_diff_to_selection(selected, diff, rect=None):
+    """Nouvelle sélection après un diff, sans recalculer les composants inchangés
+    
+    Les refs supprimées disparaissent, les refs modifiées sont remplacées à
+    leur place par leurs nouvelles lignes. Pour une sélection rectangle, les
+    lignes modifiées ou ajoutées entrent ou sortent selon leur position.
+    """
+    touched = diff['removed'] | diff['changed']
+    selected_refs = {comp['ref'] for comp in selected}
+    result = []
+    replaced = set()
+    for comp in selected:
+        ref = comp['ref']
+        if ref not in touched:
+            result.append(comp)
+        elif ref not in replaced:
+            replaced.add(ref)
+            result.extend(row for row in diff['new_rows'].get(ref, [])
+                          if rect is None or _in_rect(row, rect))
+    
+    if rect is not None:
+        for ref in sorted(diff['added'] | (diff['changed'] - selected_refs)):
+            result.extend(row for row in diff['new_rows'][ref] if _in_rect(row, rect))
+    return result
+
+
+def carry_over_status(component_status, diff):
+    """Reporte le statut d'un composant modifié sur sa nouvelle clé de groupe
+    
+    Une nouvelle valeur ou un nouveau LCSC change la clé (valeur normalisée,
+    footprint, lcsc): le statut de l'ancienne clé est recopié si la nouvelle
+    n'en a pas déjà un. L'ancienne clé est gardée (partagée par d'autres refs).
+    Retourne le nombre de statuts reportés.
+    """
+    carried = 0
+    for ref in diff['changed']:
+        for old, new in zip(diff['old_rows'][ref], diff['new_rows'][ref]):
+            old_key, new_key = component_key(old), component_key(new)
+            status = component_status.get(old_key)
+            if status and old_key != new_key and new_key not in component_status:
+                component_status[new_key] = status
+                carried += 1
+    return carried
+
+
+class FileWatcher:
+    """Surveille des fichiers par stat périodique depuis la boucle Tk
+    
+    Au repos, seul un os.stat par fichier toutes les POLL_MS est fait. Un
+    changement de mtime/taille déclenche un délai de stabilisation: tant
+    que le fichier bouge encore (export en cours), on attend. Une fois
+    stable, le contenu est haché dans un thread de travail (comme
+    BoardLoader, résultat relu par le poll Tk) et on_change(chemins) n'est
+    appelé que pour les fichiers dont le hash a réellement changé.
+    """
+    
+    POLL_MS = 1000
+    DEBOUNCE_MS = 500
+    
+    def __init__(self, root, on_change):
+        self.root = root
+        self.on_change = on_change
+        self.stats = {}
+        self.hashes = {}
+        self.pending = False
+        self.after_id = None
+        self.results = queue.Queue()
+        self.generation = 0  # Incrémenté par stop(): résultats périmés ignorés
+        self.hashing = False
+    
+    @staticmethod
+    def _stat(path):
+        try:
+            st = os.stat(path)
+            return (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return None
+    
+    @staticmethod
+    def content_hash(path):
+        """sha256 du contenu (None si le fichier est illisible)"""
+        digest = hashlib.sha256()
+        try:
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(chunk)
+        except OSError:
+            return None
+        return digest.hexdigest()
+    
+    def watch(self, paths):
+        """Remplace la liste des fichiers surveillés"""
+        self.stop()
+        paths = [str(p) for p in paths if p]
+        self.stats = {p: self._stat(p) for p in paths}
+        self.hashes = dict.fromkeys(paths)
+        self._hash(paths, initial=True)
+        self._schedule(self.POLL_MS)
+    
+    def stop(self):
+        if self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
+        self.stats = {}
+        self.hashes = {}
+        self.pending = False
+        self.generation += 1
+        self.hashing = False
+    
+    def is_watching(self):
+        return bool(self.stats)
+    
+    def _schedule(self, delay):
+        self.after_id = self.root.after(delay, self._poll)
+    
+    def _hash(self, paths, initial):
+        """Hache paths dans un thread de travail (initial: hashes de référence)"""
+        self.hashing = True
+        worker = threading.Thread(target=self._run, args=(self.generation, list(paths), initial),
+                                  daemon=True)
+        worker.start()
+    
+    def _run(self, generation, paths, initial):
+        """Corps du thread de travail"""
+        self.results.put((generation, initial, {p: self.content_hash(p) for p in paths}))
+    
+    def _collect(self):
+        """Hachages terminés (thread Tk): chemins dont le contenu a changé"""
+        changed = []
+        while True:
+            try:
+                generation, initial, digests = self.results.get_nowait()
+            except queue.Empty:
+                break
+            
+            if generation != self.generation:
+                continue  # Surveillance remplacée ou arrêtée
+            
+            self.hashing = False
+            for path, digest in digests.items():
+                if not initial and digest != self.hashes[path]:
+                    changed.append(path)
+                self.hashes[path] = digest
+        return changed
+    
+    def _poll(self):
+        """Vérifie les fichiers (thread Tk)"""
+        self.after_id = None
+        changed = self._collect()
+        moved = False
+        for path, old_stat in self.stats.items():
+            stat = self._stat(path)
+            if stat != old_stat:
+                self.stats[path] = stat
+                moved = True
+        
+        if moved:
+            # Écriture en cours ou tout juste finie: attendre qu'elle se stabilise
+            self.pending = True
+        elif self.pending and not self.hashing:
+            self.pending = False
+            self._hash(self.stats, initial=False)
+        
+        if changed:
+            self.on_change(changed)
+        
+        if self.stats and self.after_id is None:
+            busy = self.pending or self.hashing
+            self._schedule(self.DEBOUNCE_MS if busy else self.POLL_MS)
+
+
+# ==================== CANVAS SCENE ====================
+
+class ViewTransform:
+    """Passage PCB -> canvas d'une image, figé (aucun appel Tk par point)
+    
+    canvas_x = offset_x + (x - minx) * scale
+    canvas_y = height - (offset_y + (y - miny) * scale)  (Y inversé comme IBom)
+    
+    Stocké sous forme affine (cx = ax + x * sx, cy = ay + y * sy): un pan,
+    un zoom autour d'un point ou un redimensionnement appliqué au canvas se
+    compose directement (then) sans relire l'état du viewer.
+    """
+    
+    __slots__ = ('ax', 'ay', 'sx', 'sy')
+    
+    # En dessous de ce nombre de coordonnées, NumPy coûte plus qu'il ne rapporte
+    NUMPY_MIN = 256
+    
+    def __init__(self, ax, ay, sx, sy):
+        self.ax = ax
+        self.ay = ay
+        self.sx = sx
+        self.sy = sy
+    
+    @classmethod
+    def from_view(cls, bbox, scale, offset_x, offset_y, height, flip_y=True):
+        """Transformation d'un viewer: échelle, décalages et hauteur du canvas"""
+        ax = offset_x - bbox['minx'] * scale
+        if flip_y:
+            return cls(ax, height - offset_y + bbox['miny'] * scale, scale, -scale)
+        return cls(ax, offset_y - bbox['miny'] * scale, scale, scale)
+    
+    @property
+    def scale(self):
+        return self.sx
+    
+    def __call__(self, x, y):
+        return self.ax + x * self.sx, self.ay + y * self.sy
+    
+    def inverse(self, canvas_x, canvas_y):
+        """Point canvas -> point PCB"""
+        return (canvas_x - self.ax) / self.sx, (canvas_y - self.ay) / self.sy
+    
+    def points(self, coords):
+        """Coordonnées à plat (x0, y0, x1, y1...) -> liste canvas, en un passage"""
+        ax, ay, sx, sy = self.ax, self.ay, self.sx, self.sy
+        if HAS_NUMPY and len(coords) >= self.NUMPY_MIN:
+            xy = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+            return (xy * (sx, sy) + (ax, ay)).ravel().tolist()
+        out = list(coords)
+        out[0::2] = [ax + x * sx for x in out[0::2]]
+        out[1::2] = [ay + y * sy for y in out[1::2]]
+        return out
+    
+    def then(self, factor, tx, ty):
+        """Transformation suivie de p -> factor * p + (tx, ty) en coordonnées canvas"""
+        return ViewTransform(factor * self.ax + tx, factor * self.ay + ty,
+                             factor * self.sx, factor * self.sy)
+    
+    def zoomed(self, factor, x, y):
+        """Zoom autour du point canvas (x, y), qui reste fixe"""
+        return self.then(factor, x * (1 - factor), y * (1 - factor))
+
+
+class BoardScene:
+    """Scène canvas persistante (mode retenu) d'une carte
+    
+    La géométrie est créée une fois par vue. Chaque élément porte le tag de
+    sa couche ('board', 'edges', 'tracks', 'pads', 'holes', 'silk', 'refs')
+    et, pour les pads et les références, celui de son composant ('r<n>').
+    Un changement de surbrillance ou de statut se limite à un itemconfigure
+    sur les composants dont l'état a changé: rien n'est recréé.
+    
+    Pan et zoom déplacent les éléments existants (canvas.move/scale); les
+    épaisseurs et polices, que Tk ne met pas à l'échelle, sont rafraîchies
+    par tag une fois l'interaction terminée (settle).
+    
+    Seuls les éléments qui intersectent la vue élargie d'une marge sont
+    créés. Quand un pan ou un zoom arrière sort de cette zone, les
+    éléments nouvellement exposés sont ajoutés (fill) sans toucher aux
+    autres: les indices de grille déjà construits sont mémorisés.
+    
+    Niveaux de détail (LOD): à l'échelle courante, un footprint dont les
+    pads font moins de pad_px pixels est dessiné comme un seul rectangle
+    (sa boîte), une piste plus fine que track_px pixels et une référence
+    dont la police ferait moins de label_pt points ne sont pas créées.
+    Le détail revient au settle dès que le zoom le rend lisible.
+    
+    Les événements rapides (molette, glisser, redimensionnement, sélection
+    dans la liste) ne touchent pas le canvas: pan, zoom et <Configure> se
+    composent en une transformation en attente, les demandes de redessin
+    et de recoloration gardent la dernière. Le tout est appliqué une seule
+    fois par image (flush, via after_idle).
+    """
+    
+    # Ordre d'empilement des couches (de bas en haut)
+    LAYERS = ('board', 'edges', 'tracks', 'pads', 'holes', 'silk', 'refs', 'overlay')
+    # Cases à cocher des viewers -> couches du canvas
+    GROUPS = {'tracks': ('tracks',), 'pads': ('pads', 'holes'), 'silk': ('silk', 'refs')}
+    # Grille spatiale du parser interrogée pour chaque case
+    GROUP_KINDS = {'tracks': 'track_chains', 'pads': 'pads', 'silk': 'footprints'}
+    SETTLE_MS = 150
+    # Marge de construction autour de la vue (fraction de sa largeur/hauteur)
+    CULL_MARGIN = 0.25
+    # Au-delà de ce rapport éléments construits / éléments de la zone
+    # courante, un fill repart de zéro pour oublier les zones quittées
+    MAX_BUILT_RATIO = 4
+    LOD = {'pad_px': 3, 'track_px': 0.35, 'label_pt': 4}
+    # Au-delà de cet écart de zoom depuis la construction, les tailles
+    # minimales en pixels (pads de 2 px...) sont fausses: on reconstruit
+    REBUILD_ZOOM_RATIO = 2.0
+    
+    def __init__(self, canvas, theme, view_func, detailed=False, font_range=(6, 10),
+                 min_track_width=0.5, pad_colors=None, ref_colors=None, lod=None):
+        self.canvas = canvas
+        self.theme = theme
+        self.view_func = view_func  # Rectangle PCB visible (x1, y1, x2, y2)
+        self.detailed = detailed  # Formes exactes, trous, contour et dessins silk
+        self.font_range = font_range
+        self.min_track_width = min_track_width
+        self.lod = dict(self.LOD, **(lod or {}))
+        # État d'un composant -> clé de thème ('temp' = sélection dans la liste)
+        self.pad_colors = pad_colors or {}
+        self.ref_colors = ref_colors or {}
+        self.states = {}
+        self.ref_tags = {}
+        # Tags partagés par les éléments de même épaisseur / police de base:
+        # clé -> [tag, valeur appliquée]
+        self.width_tags = {}
+        self.font_tags = {}
+        # Case -> indices de grille déjà présents sur le canvas
+        self.built = {}
+        self.groups = set()
+        self.parser = None
+        self.transform = None  # ViewTransform des éléments présents sur le canvas
+        self.scale = 1.0
+        self.built_scale = 1.0
+        self.view = None  # Dernière zone PCB construite (vue + marge)
+        # Grille des pads: 'pads', ou 'footprints' quand des pads sont réduits
+        # (None: décidée à la construction de la case 'pads')
+        self.pad_kind = None
+        # Plus petite échelle à laquelle un élément omis ou réduit redevient lisible
+        self.detail_scale = math.inf
+        self._pad_sizes = None  # (parser, [plus grande dimension de pad par footprint])
+        self._settle_id = None
+        self._fill_id = None
+        # Demandes en attente du prochain flush: transformation composée
+        # (f, tx, ty) telle que x' = f * x + tx, redessin complet et
+        # fonction d'états (la dernière demande gagne)
+        self._pending = None
+        self._pending_draw = None
+        self._pending_states = None
+        self._flush_id = None
+        self.height = None  # Hauteur du canvas lors de la construction (Y inversé)
+        canvas.bind('<Configure>', self._on_configure, add='+')
+    
+    @classmethod
+    def lod_from_prefs(cls, prefs):
+        """Seuils LOD des préférences ('lod_pad_px'...)"""
+        return {key: prefs.get(f'lod_{key}', value) for key, value in cls.LOD.items()}
+    
+    def replace_parser(self, parser):
+        """Nouvelle version de la carte à géométrie identique
+        
+        Voir IBomParser.adopt_geometry: les éléments restent sur le canvas,
+        seules les requêtes suivantes passent par le nouveau parser.
+        """
+        if self.parser is None:
+            return
+        if self._pad_sizes is not None and self._pad_sizes[0] is self.parser:
+            self._pad_sizes = (parser, self._pad_sizes[1])
+        self.parser = parser
+    
+    def clear(self):
+        """Vide le canvas"""
+        self._cancel_pending()
+        self.canvas.delete('all')
+        self._reset()
+        self.parser = None
+    
+    def _reset(self):
+        self.ref_tags = {}
+        self.width_tags = {}
+        self.font_tags = {}
+        self.built = {}
+        self.pad_kind = None
+        self.detail_scale = math.inf
+    
+    def render(self, parser, transform, groups):
+        """Reconstruit la géométrie de la vue (nouvelle carte, recentrage)
+        
+        transform: ViewTransform courant du viewer. groups: cases cochées
+        parmi GROUPS. Les éléments 'overlay' du viewer (zone de
+        sélection...) sont conservés.
+        """
+        self._cancel_pending()
+        canvas = self.canvas
+        for layer in self.LAYERS[:-1]:
+            canvas.delete(layer)
+        self._reset()
+        self.parser = parser
+        self.transform = transform
+        self.scale = self.built_scale = transform.scale
+        self.height = canvas.winfo_height()
+        self.groups = set(groups)
+        self.view = self._margin_rect(self._visible_rect())
+        self._draw_board()
+        if self.detailed:
+            self._draw_edges()
+        for group in self.GROUPS:
+            if group in groups:
+                self._build_group(group, self.view)
+        canvas.tag_raise('overlay')
+    
+    def show_groups(self, groups):
+        """Affiche ou masque les couches; une couche jamais construite l'est maintenant"""
+        self.groups = set(groups)
+        if self.parser is None:
+            return  # Rien de construit: le premier render lira les cases
+        self._apply_transform()
+        canvas = self.canvas
+        for group, layers in self.GROUPS.items():
+            visible = group in groups
+            if visible and group not in self.built:
+                self._build_group(group, self.view)
+                self._restack()
+            for layer in layers:
+                canvas.itemconfigure(layer, state=tk.NORMAL if visible else tk.HIDDEN)
+    
+    def pan(self, dx, dy):
+        """Décale la scène de (dx, dy) pixels à la prochaine image"""
+        self._transform(1, dx, dy)
+    
+    def zoom(self, factor, x, y):
+        """Zoom de la scène autour du point canvas (x, y) à la prochaine image"""
+        self._transform(factor, x * (1 - factor), y * (1 - factor))  # Voir ViewTransform.zoomed
+    
+    def request_redraw(self, draw):
+        """Redessin complet (draw du viewer) à la prochaine image
+        
+        Remplace les pan/zoom en attente: draw repart de l'état du viewer.
+        """
+        self._pending_draw = draw
+        self._schedule_flush()
+    
+    def request_restyle(self, states_func):
+        """Recoloration à la prochaine image avec les états de states_func()"""
+        self._pending_states = states_func
+        self._schedule_flush()
+    
+    def flush(self):
+        """Applique en une fois les demandes accumulées depuis la dernière image"""
+        self._flush_id = None
+        draw, self._pending_draw = self._pending_draw, None
+        states_func, self._pending_states = self._pending_states, None
+        if draw is not None:
+            self._pending = None
+            draw()
+            return
+        if states_func is not None:
+            self.restyle(states_func())
+        if self._apply_transform():
+            self._after_interaction()
+    
+    def _apply_transform(self):
+        """Applique la transformation en attente aux éléments existants
+        
+        À faire avant de créer des éléments, qui sont placés dans le repère
+        courant du viewer. Retourne False s'il n'y avait rien à appliquer.
+        """
+        transform, self._pending = self._pending, None
+        if transform is None or self.parser is None:
+            return False
+        factor, tx, ty = transform
+        if factor != 1:
+            self.canvas.scale('all', 0, 0, factor, factor)
+        if tx or ty:
+            self.canvas.move('all', tx, ty)
+        self.transform = self.transform.then(factor, tx, ty)
+        self.scale = self.transform.scale
+        return True
+    
+    def _transform(self, factor, tx, ty):
+        """Compose (factor, tx, ty) avec la transformation en attente"""
+        if self._pending is not None:
+            pending_factor, pending_tx, pending_ty = self._pending
+            factor, tx, ty = (factor * pending_factor, factor * pending_tx + tx,
+                              factor * pending_ty + ty)
+        self._pending = factor, tx, ty
+        # Fill et settle attendent que la transformation soit appliquée
+        for attr in ('_settle_id', '_fill_id'):
+            after_id = getattr(self, attr)
+            if after_id is not None:
+                self.canvas.after_cancel(after_id)
+                setattr(self, attr, None)
+        self._schedule_flush()
+    
+    def _schedule_flush(self):
+        if self._flush_id is None:
+            self._flush_id = self.canvas.after_idle(self.flush)
+    
+    def _on_configure(self, event):
+        """Redimensionnement: l'origine Y (bas du canvas) suit la hauteur"""
+        if self.parser is None or self.height is None:
+            return
+        dy = event.height - self.height
+        self.height = event.height
+        # Même sans dy, une zone a pu être exposée en largeur (fill)
+        self._transform(1, 0, dy)
+    
+    def settle(self):
+        """Fin d'interaction: épaisseurs et polices remises à l'échelle
+        
+        La géométrie n'est reconstruite que si le zoom s'est trop éloigné
+        de l'échelle de construction ou rend lisible un élément omis;
+        sinon seules les zones exposées sont complétées.
+        """
+        self._settle_id = None
+        if self.parser is None:
+            return
+        self._apply_transform()
+        drift = max(self.scale / self.built_scale, self.built_scale / self.scale)
+        if drift > self.REBUILD_ZOOM_RATIO or self.scale >= self.detail_scale:
+            self.render(self.parser, self.transform, self.groups)
+            return
+        self.fill()
+        self.refresh()
+    
+    def fill(self):
+        """Crée les éléments de la vue courante (+ marge) absents du canvas
+        
+        Retourne le nombre d'éléments ajoutés.
+        """
+        self._fill_id = None
+        if self.parser is None:
+            return 0
+        self._apply_transform()
+        view = self._visible_rect()
+        if self._covers(self.view, view):
+            return 0
+        self.view = rect = self._margin_rect(view)
+        added = in_rect = 0
+        for group in self.GROUPS:
+            if group in self.built:
+                n_added, n_in_rect = self._build_group(group, rect)
+                added += n_added
+                in_rect += n_in_rect
+        if sum(len(ids) for ids in self.built.values()) > self.MAX_BUILT_RATIO * max(in_rect, 1000):
+            # Trop d'éléments hors zone accumulés par les pans successifs
+            self.render(self.parser, self.transform, self.groups)
+            return added
+        if added:
+            canvas = self.canvas
+            for group, layers in self.GROUPS.items():
+                if group in self.built and group not in self.groups:
+                    for layer in layers:
+                        canvas.itemconfigure(layer, state=tk.HIDDEN)
+            self._restack()
+        return added
+    
+    def _after_interaction(self):
+        """Complète au repos les zones exposées, puis planifie le settle"""
+        if (self.parser is not None and self._fill_id is None
+                and not self._covers(self.view, self._visible_rect())):
+            self._fill_id = self.canvas.after_idle(self.fill)
+        self._schedule_settle()
+    
+    def _visible_rect(self):
+        x1, y1, x2, y2 = self.view_func()
+        return min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2)
+    
+    def _margin_rect(self, rect):
+        x1, y1, x2, y2 = rect
+        mx = (x2 - x1) * self.CULL_MARGIN
+        my = (y2 - y1) * self.CULL_MARGIN
+        return x1 - mx, y1 - my, x2 + mx, y2 + my
+    
+    @staticmethod
+    def _covers(outer, inner):
+        return (outer[0] <= inner[0] and outer[1] <= inner[1] and
+                outer[2] >= inner[2] and outer[3] >= inner[3])
+    
+    def refresh(self):
+        """Épaisseurs de traits et tailles de police pour l'échelle courante"""
+        canvas = self.canvas
+        scale = self.scale
+        for (base, min_px), entry in self.width_tags.items():
+            width = max(min_px, base * scale)
+            if width != entry[1]:
+                entry[1] = width
+                canvas.itemconfigure(entry[0], width=width)
+        for size, entry in self.font_tags.items():
+            font_size = self._font_size(size)
+            if font_size != entry[1]:
+                entry[1] = font_size
+                canvas.itemconfigure(entry[0], font=('Consolas', font_size, 'bold'))
+    
+    def _schedule_settle(self):
+        if self._settle_id is not None:
+            self.canvas.after_cancel(self._settle_id)
+        self._settle_id = self.canvas.after(self.SETTLE_MS, self.settle)
+    
+    def _cancel_pending(self):
+        for attr in ('_settle_id', '_fill_id', '_flush_id'):
+            after_id = getattr(self, attr)
+            if after_id is not None:
+                self.canvas.after_cancel(after_id)
+                setattr(self, attr, None)
+        self._pending = self._pending_draw = self._pending_states = None
+    
+    def _width(self, base, min_px):
+        """Épaisseur en pixels et tag de son groupe de rafraîchissement"""
+        width = max(min_px, base * self.scale)
+        entry = self.width_tags.get((base, min_px))
+        if entry is None:
+            entry = self.width_tags[(base, min_px)] = [f'w{len(self.width_tags)}', width]
+        return width, entry[0]
+    
+    def _font_size(self, size):
+        lo, hi = self.font_range
+        return max(lo, min(hi, int(size * self.scale * 0.4)))
+    
+    def _font(self, size):
+        """Police d'une référence (taille proportionnelle, bornée) et son tag"""
+        font_size = self._font_size(size)
+        entry = self.font_tags.get(size)
+        if entry is None:
+            entry = self.font_tags[size] = [f'f{len(self.font_tags)}', font_size]
+        return ('Consolas', font_size, 'bold'), entry[0]
+    
+    def restyle(self, states):
+        """Applique de nouveaux états {ref: état}
+        
+        Seules les références dont l'état change sont recolorées.
+        Retourne le nombre de références modifiées.
+        """
+        old = self.states
+        self.states = states = dict(states)
+        changed = [ref for ref in old.keys() | states.keys() if old.get(ref) != states.get(ref)]
+        for ref in changed:
+            tag = self.ref_tags.get(ref)
+            if tag is not None:
+                self._apply_state(tag, states.get(ref))
+        return len(changed)
+    
+    def _apply_state(self, tag, state):
+        canvas = self.canvas
+        theme = self.theme
+        pad_key = self.pad_colors.get(state)
+        if pad_key:
+            canvas.itemconfigure(f'pads&&{tag}', fill=theme[pad_key])
+        else:
+            canvas.itemconfigure(f'front&&{tag}', fill=theme['pad_front'])
+            canvas.itemconfigure(f'back&&{tag}', fill=theme['pad_back'])
+        canvas.itemconfigure(f'refs&&{tag}', fill=theme[self.ref_colors.get(state, 'silk_text')])
+    
+    def _ref_tag(self, ref):
+        tag = self.ref_tags.get(ref)
+        if tag is None:
+            # Tag numéroté: une ref peut contenir des caractères spéciaux pour Tk
+            tag = self.ref_tags[ref] = f'r{len(self.ref_tags)}'
+        return tag
+    
+    def _restack(self):
+        for layer in self.LAYERS:
+            self.canvas.tag_raise(layer)
+    
+    def _build_group(self, group, rect):
+        """Crée les éléments d'une case qui intersectent rect et pas encore construits
+        
+        Retourne (éléments ajoutés, éléments de la case dans rect).
+        """
+        if group == 'pads':
+            if self.pad_kind is None:
+                # Les tailles de pads forcent le décodage des footprints:
+                # seulement quand la case est cochée
+                sizes = self._footprint_pad_sizes()
+                smallest = min((s for s in sizes if s > 0), default=0)
+                small = smallest * self.scale < self.lod['pad_px']
+                self.pad_kind = 'footprints' if small else 'pads'
+            kind = self.pad_kind
+        else:
+            kind = self.GROUP_KINDS[group]
+        grid = self.parser.spatial_index(kind)
+        built = self.built.setdefault(group, set())
+        ids = grid.query_ids(*rect)
+        new_ids = [i for i in ids if i not in built]
+        built.update(new_ids)
+        items = grid.items
+        if group == 'tracks':
+            self._draw_tracks([items[i] for i in new_ids])
+        elif group == 'pads' and kind == 'footprints':
+            self._draw_footprint_pads(new_ids)
+        elif group == 'pads':
+            self._draw_pads([items[i] for i in new_ids])
+        elif group == 'silk':
+            self._draw_silkscreen([items[i] for i in new_ids])
+        return len(new_ids), len(ids)
+    
+    def _draw_board(self):
+        bbox = self.parser.board_bbox
+        x1, y1, x2, y2 = self.transform.points((bbox['minx'], bbox['miny'],
+                                                bbox['maxx'], bbox['maxy']))
+        self.canvas.create_rectangle(min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2),
+                                     outline=self.theme['pcb_edge'], fill=self.theme['pcb_board'],
+                                     width=2, tags=('board',))
+    
+    def _draw_edges(self):
+        """Contour du PCB"""
+        canvas = self.canvas
+        to_canvas = self.transform
+        color = self.theme['pcb_edge']
+        edges = self.parser.edges
+        # Extrémités de tous les segments transformées en un passage
+        ends = [c for edge in edges if edge.get('type', '') == 'segment'
+                for point in (edge.get('start', [0, 0]), edge.get('end', [0, 0]))
+                for c in point[:2]]
+        coords = iter(to_canvas.points(ends))
+        for edge in edges:
+            edge_type = edge.get('type', '')
+            
+            if edge_type == 'segment':
+                x1, y1, x2, y2 = next(coords), next(coords), next(coords), next(coords)
+                width, width_tag = self._width(edge.get('width', 0.15), 1)
+                canvas.create_line(x1, y1, x2, y2, fill=color, width=width, tags=('edges', width_tag))
+            
+            elif edge_type == 'circle':
+                center = edge.get('start', [0, 0])
+                radius = edge.get('radius', 1) * self.scale
+                cx, cy = to_canvas(center[0], center[1])
+                canvas.create_oval(cx - radius, cy - radius, cx + radius, cy + radius,
+                                   outline=color, width=1, tags=('edges',))
+            
+            elif edge_type == 'arc':
+                start = edge.get('start', [0, 0])
+                radius = edge.get('radius', 1)
+                start_angle = edge.get('startangle', 0)
+                end_angle = edge.get('endangle', 360)
+                cx, cy = to_canvas(start[0], start[1])
+                r = radius * self.scale
+                
+                # Arc approximé par une série de segments
+                num_segments = 20
+                points = []
+                for i in range(num_segments + 1):
+                    angle = math.radians(start_angle + (end_angle - start_angle) * i / num_segments)
+                    points.extend([cx + r * math.cos(angle), cy - r * math.sin(angle)])  # Y inversé
+                canvas.create_line(points, fill=color, width=1, smooth=True, tags=('edges',))
+    
+    def _draw_tracks(self, chains):
+        """Pistes de cuivre: une polyligne par chaîne [(couche, largeur, coords)],
+        sauf celles sous le seuil LOD"""
+        canvas = self.canvas
+        min_width = self.min_track_width
+        min_base = self.lod['track_px'] / self.scale
+        drawn = []
+        for chain in chains:
+            if chain[1] < min_base:
+                self._omit(self.lod['track_px'], chain[1])
+            else:
+                drawn.append(chain)
+        # Toutes les chaînes transformées en un passage, puis découpées
+        points = self.transform.points([c for chain in drawn for c in chain[2]])
+        start = 0
+        for layer, base, coords in drawn:
+            end = start + len(coords)
+            is_front = layer.startswith('F') or layer == 'F.Cu'
+            color = self.theme['track_front'] if is_front else self.theme['track_back']
+            width, width_tag = self._width(base, min_width)
+            canvas.create_line(points[start:end], fill=color, width=width, capstyle=tk.ROUND,
+                               joinstyle=tk.ROUND, tags=('tracks', width_tag))
+            start = end
+    
+    def _draw_pads(self, pads):
+        """Pads [(indice footprint, pad)], colorés selon l'état de leur composant"""
+        footprints = self.parser.footprints
+        states = self.states
+        centers = self._pad_centers(pad for _, pad in pads)
+        for i, (fp_id, pad) in enumerate(pads):
+            fp = footprints[fp_id]
+            ref = fp.get('ref', '')
+            self._draw_pad(pad, centers[2 * i], centers[2 * i + 1], fp.get('layer', 'F'),
+                           self._ref_tag(ref), states.get(ref))
+    
+    def _draw_footprint_pads(self, fp_ids):
+        """Pads par footprint: un rectangle (boîte du footprint) si ses pads sont trop petits"""
+        footprints = self.parser.footprints
+        states = self.states
+        sizes = self._footprint_pad_sizes()
+        pad_px = self.lod['pad_px']
+        min_size = pad_px / self.scale
+        detailed = []
+        for fp_id in fp_ids:
+            fp = footprints[fp_id]
+            ref = fp.get('ref', '')
+            size = sizes[fp_id]
+            if size >= min_size:
+                detailed.append(fp)
+            elif size > 0:
+                self._omit(pad_px, size)
+                self._draw_collapsed_footprint(fp, self._ref_tag(ref), states.get(ref))
+        centers = iter(self._pad_centers(pad for fp in detailed for pad in fp.get('pads', [])))
+        for fp in detailed:
+            ref = fp.get('ref', '')
+            ref_tag = self._ref_tag(ref)
+            fp_layer = fp.get('layer', 'F')
+            for pad in fp.get('pads', []):
+                self._draw_pad(pad, next(centers), next(centers), fp_layer, ref_tag, states.get(ref))
+    
+    def _draw_collapsed_footprint(self, fp, ref_tag, state):
+        bounds = footprint_bounds(fp)
+        if not bounds:
+            return
+        x1, y1, x2, y2 = self.transform.points(bounds)
+        is_front = fp.get('layer', 'F') == 'F'
+        pad_key = self.pad_colors.get(state)
+        if pad_key:
+            color = self.theme[pad_key]
+        else:
+            color = self.theme['pad_front'] if is_front else self.theme['pad_back']
+        self.canvas.create_rectangle(min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2),
+                                     fill=color, outline='',
+                                     tags=('pads', 'front' if is_front else 'back', ref_tag))
+    
+    def _footprint_pad_sizes(self):
+        """Plus grande dimension de pad de chaque footprint (0 sans pad), par parser"""
+        if self._pad_sizes is None or self._pad_sizes[0] is not self.parser:
+            sizes = [max((max(pad.get('size', [0.5, 0.5])[:2]) for pad in fp.get('pads', [])),
+                         default=0)
+                     for fp in self.parser.footprints]
+            self._pad_sizes = (self.parser, sizes)
+        return self._pad_sizes[1]
+    
+    def _omit(self, threshold, size):
+        """Élément omis ou réduit: lisible à partir de l'échelle threshold / size"""
+        scale = threshold / size if size > 0 else math.inf
+        if scale < self.detail_scale:
+            self.detail_scale = scale
+    
+    def _pad_centers(self, pads):
+        """Centres canvas des pads, transformés en un passage (x0, y0, x1, y1...)"""
+        coords = []
+        detailed = self.detailed
+        for pad in pads:
+            pos = pad.get('pos', [0, 0])
+            if detailed:
+                offset = pad.get('offset', [0, 0])
+                coords += (pos[0] + offset[0], pos[1] + offset[1])
+            else:
+                coords += (pos[0], pos[1])
+        return self.transform.points(coords)
+    
+    def _draw_pad(self, pad, cx, cy, fp_layer, ref_tag, state):
+        """Pad centré en (cx, cy) canvas (voir _pad_centers)"""
+        size = pad.get('size', [0.5, 0.5])
+        shape = pad.get('shape', 'rect')
+        layers = pad.get('layers', [fp_layer])
+        
+        w = max(2, size[0] * self.scale)
+        h = max(2, size[1] * self.scale)
+        
+        is_front = 'F' in layers or any(l.startswith('F.') for l in layers)
+        pad_key = self.pad_colors.get(state)
+        if pad_key:
+            color = self.theme[pad_key]
+        else:
+            color = self.theme['pad_front'] if is_front else self.theme['pad_back']
+        tags = ('pads', 'front' if is_front else 'back', ref_tag)
+        
+        canvas = self.canvas
+        if shape == 'circle':
+            r = w / 2
+            canvas.create_oval(cx - r, cy - r, cx + r, cy + r, fill=color, outline='', tags=tags)
+        elif self.detailed and shape == 'oval':
+            canvas.create_oval(cx - w/2, cy - h/2, cx + w/2, cy + h/2, fill=color, outline='', tags=tags)
+        elif self.detailed and shape == 'roundrect':
+            corner = min(w, h) * pad.get('radius', 0.25)
+            self._draw_rounded_rect(cx - w/2, cy - h/2, cx + w/2, cy + h/2, corner, color, tags)
+        else:
+            canvas.create_rectangle(cx - w/2, cy - h/2, cx + w/2, cy + h/2, fill=color, outline='', tags=tags)
+        
+        # Trou des pads traversants
+        drillsize = pad.get('drillsize', [0.3, 0.3])
+        if self.detailed and pad.get('type', 'smd') == 'th' and drillsize:
+            hole_w = max(1.5, drillsize[0] * self.scale)
+            hole_h = drillsize[1] * self.scale if len(drillsize) > 1 else hole_w
+            if pad.get('drillshape', 'circle') != 'oblong':
+                hole_h = hole_w
+            canvas.create_oval(cx - hole_w/2, cy - hole_h/2, cx + hole_w/2, cy + hole_h/2,
+                               fill=self.theme['pad_hole'], outline='', tags=('holes',))
+    
+    def _draw_rounded_rect(self, x1, y1, x2, y2, radius, color, tags):
+        points = [
+            x1 + radius, y1,
+            x2 - radius, y1,
+            x2, y1,
+            x2, y1 + radius,
+            x2, y2 - radius,
+            x2, y2,
+            x2 - radius, y2,
+            x1 + radius, y2,
+            x1, y2,
+            x1, y2 - radius,
+            x1, y1 + radius,
+            x1, y1,
+        ]
+        self.canvas.create_polygon(points, fill=color, outline='', smooth=True, tags=tags)
+    
+    def _draw_silkscreen(self, fp_ids):
+        """Dessins silkscreen (mode détaillé) et références des footprints"""
+        footprints = self.parser.footprints
+        for fp_id in fp_ids:
+            fp = footprints[fp_id]
+            if self.detailed:
+                for drawing_obj in fp.get('drawings', []):
+                    layer = drawing_obj.get('layer', '')
+                    # Seulement le silkscreen
+                    if 'Silk' not in layer and 'SilkS' not in layer and layer:
+                        continue
+                    self._draw_silkscreen_element(drawing_obj.get('drawing', drawing_obj))
+            
+            ref = fp.get('ref', '')
+            bbox = fp.get('bbox', {})
+            if ref and bbox:
+                self._draw_ref(ref, bbox)
+    
+    def _draw_silkscreen_element(self, drawing):
+        canvas = self.canvas
+        to_canvas = self.transform
+        draw_type = drawing.get('type', '')
+        color = self.theme['silk_edge']
+        width, width_tag = self._width(drawing.get('width', 0.1), 0.5)
+        tags = ('silk', width_tag)
+        
+        if draw_type == 'segment':
+            start = drawing.get('start', [0, 0])
+            end = drawing.get('end', [0, 0])
+            x1, y1 = to_canvas(start[0], start[1])
+            x2, y2 = to_canvas(end[0], end[1])
+            canvas.create_line(x1, y1, x2, y2, fill=color, width=width, tags=tags)
+        
+        elif draw_type == 'rect':
+            start = drawing.get('start', [0, 0])
+            end = drawing.get('end', [1, 1])
+            x1, y1 = to_canvas(start[0], start[1])
+            x2, y2 = to_canvas(end[0], end[1])
+            canvas.create_rectangle(min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2),
+                                    outline=color, width=width, tags=tags)
+        
+        elif draw_type == 'circle':
+            center = drawing.get('start', [0, 0])
+            radius = drawing.get('radius', 0.5) * self.scale
+            cx, cy = to_canvas(center[0], center[1])
+            canvas.create_oval(cx - radius, cy - radius, cx + radius, cy + radius,
+                               outline=color, width=width, tags=tags)
+        
+        elif draw_type == 'polygon':
+            for poly in drawing.get('polygons', []):
+                if isinstance(poly, list) and len(poly) >= 3:
+                    points = to_canvas.points([c for pt in poly
+                                               if isinstance(pt, list) and len(pt) >= 2
+                                               for c in pt[:2]])
+                    if len(points) >= 6:
+                        if drawing.get('filled', False):
+                            canvas.create_polygon(points, fill=color, outline='', tags=('silk',))
+                        else:
+                            canvas.create_polygon(points, fill='', outline=color, width=1, tags=('silk',))
+    
+    def _draw_ref(self, ref, bbox):
+        """Référence d'un composant, centrée sur sa boîte"""
+        if ref == 'REF**':
+            return
+        pos = bbox.get('pos', [0, 0])
+        relpos = bbox.get('relpos', [0, 0])
+        size = bbox.get('size', [1, 1])
         
-        return selected
+        min_size = min(size[0], size[1])
+        if min_size * self.scale * 0.4 < self.lod['label_pt']:
+            self._omit(self.lod['label_pt'], min_size * 0.4)
+            return
+        
+        center_x = pos[0] + relpos[0] + size[0] / 2
+        center_y = pos[1] + relpos[1] + size[1] / 2
+        cx, cy = self.transform(center_x, center_y)
+        
+        font, font_tag = self._font(min_size)
+        color = self.theme[self.ref_colors.get(self.states.get(ref), 'silk_text')]
+        self.canvas.create_text(cx, cy, text=ref, fill=color, font=font,
+                                tags=('refs', self._ref_tag(ref), font_tag))
 
 
 # ==================== PCB VIEWER ====================
@@ -737,15 +3379,15 @@ class PCBViewer(tk.Toplevel):
         self.show_silk_var = tk.BooleanVar(value=self.prefs.get('show_silkscreen', True))
         
         tk.Checkbutton(options_frame, text="Pads", variable=self.show_pads_var,
-                       command=self._draw_pcb, bg=self.theme['bg_primary'], 
+                       command=self._on_layers_toggled, bg=self.theme['bg_primary'], 
                        fg=self.theme['text_primary'], selectcolor=self.theme['bg_secondary']
                        ).pack(side=tk.LEFT, padx=10)
         tk.Checkbutton(options_frame, text="Tracks", variable=self.show_tracks_var,
-                       command=self._draw_pcb, bg=self.theme['bg_primary'],
+                       command=self._on_layers_toggled, bg=self.theme['bg_primary'],
                        fg=self.theme['text_primary'], selectcolor=self.theme['bg_secondary']
                        ).pack(side=tk.LEFT, padx=10)
         tk.Checkbutton(options_frame, text="Silkscreen", variable=self.show_silk_var,
-                       command=self._draw_pcb, bg=self.theme['bg_primary'],
+                       command=self._on_layers_toggled, bg=self.theme['bg_primary'],
                        fg=self.theme['text_primary'], selectcolor=self.theme['bg_secondary']
                        ).pack(side=tk.LEFT, padx=10)
         
@@ -755,6 +3397,9 @@ class PCBViewer(tk.Toplevel):
         
         self.canvas = tk.Canvas(canvas_frame, bg=self.theme['pcb_board'], highlightthickness=0)
         self.canvas.pack(fill=tk.BOTH, expand=True)
+        self.scene = BoardScene(self.canvas, self.theme, self._visible_pcb_rect, detailed=True,
+                                font_range=(6, 12), min_track_width=0.8,
+                                lod=BoardScene.lod_from_prefs(self.prefs))
         
         # Bindings
         self.canvas.bind('<Button-1>', self._on_mouse_down)
@@ -763,313 +3408,77 @@ class PCBViewer(tk.Toplevel):
         self.canvas.bind('<Button-3>', self._on_pan_start)
         self.canvas.bind('<B3-Motion>', self._on_pan_drag)
         self.canvas.bind('<MouseWheel>', self._on_mousewheel)
-        self.canvas.bind('<Button-4>', lambda e: self._zoom_in())  # Linux
-        self.canvas.bind('<Button-5>', lambda e: self._zoom_out())  # Linux
+        self.canvas.bind('<Button-4>', lambda e: self._zoom(1.2, e.x, e.y))  # Linux
+        self.canvas.bind('<Button-5>', lambda e: self._zoom(1 / 1.2, e.x, e.y))  # Linux
         
         # Boutons
-        btn_frame = tk.Frame(main_frame, bg=self.theme['bg_primary'])
-        btn_frame.pack(pady=10)
-        
-        btn_style = {'bg': self.theme['bg_tertiary'], 'fg': self.theme['text_primary'],
-                     'activebackground': self.theme['accent'], 'activeforeground': '#ffffff',
-                     'relief': tk.FLAT, 'padx': 15, 'pady': 5}
-        
-        tk.Button(btn_frame, text="Zoom +", command=self._zoom_in, **btn_style).pack(side=tk.LEFT, padx=5)
-        tk.Button(btn_frame, text="Zoom -", command=self._zoom_out, **btn_style).pack(side=tk.LEFT, padx=5)
-        tk.Button(btn_frame, text="Réinitialiser", command=self._reset_view, **btn_style).pack(side=tk.LEFT, padx=5)
-        tk.Button(btn_frame, text="Annuler", command=self.destroy, **btn_style).pack(side=tk.LEFT, padx=5)
-        
-        # Légende
-        legend_frame = tk.Frame(main_frame, bg=self.theme['bg_primary'])
-        legend_frame.pack(pady=5)
-        
-        tk.Label(legend_frame, text="● Front", fg=self.theme['pad_front'], 
-                 bg=self.theme['bg_primary'], font=('Segoe UI', 9)).pack(side=tk.LEFT, padx=10)
-        tk.Label(legend_frame, text="● Back", fg=self.theme['pad_back'],
-                 bg=self.theme['bg_primary'], font=('Segoe UI', 9)).pack(side=tk.LEFT, padx=10)
-        tk.Label(legend_frame, text="● Highlight", fg=self.theme['pad_highlight'],
-                 bg=self.theme['bg_primary'], font=('Segoe UI', 9)).pack(side=tk.LEFT, padx=10)
-    
-    def _pcb_to_canvas(self, x, y):
-        """Convertit les coordonnées PCB en coordonnées canvas (Y inversé)"""
-        bbox = self.parser.board_bbox
-        canvas_x = self.offset_x + (x - bbox['minx']) * self.scale
-        # Inverser Y pour avoir le même sens que IBom
-        canvas_height = self.canvas.winfo_height() or 700
-        canvas_y = canvas_height - (self.offset_y + (y - bbox['miny']) * self.scale)
-        return canvas_x, canvas_y
-    
-    def _canvas_to_pcb(self, canvas_x, canvas_y):
-        """Convertit les coordonnées canvas en coordonnées PCB"""
-        bbox = self.parser.board_bbox
-        canvas_height = self.canvas.winfo_height() or 700
-        x = (canvas_x - self.offset_x) / self.scale + bbox['minx']
-        y = (canvas_height - canvas_y - self.offset_y) / self.scale + bbox['miny']
-        return x, y
-    
-    def _draw_pcb(self, recalculate_scale=True):
-        """Dessine le PCB avec tous les éléments"""
-        self.canvas.delete('all')
-        
-        bbox = self.parser.board_bbox
-        width = bbox['maxx'] - bbox['minx']
-        height = bbox['maxy'] - bbox['miny']
-        
-        canvas_width = self.canvas.winfo_width() or 900
-        canvas_height = self.canvas.winfo_height() or 700
-        
-        if recalculate_scale:
-            scale_x = (canvas_width - 100) / width if width > 0 else 1
-            scale_y = (canvas_height - 100) / height if height > 0 else 1
-            self.scale = min(scale_x, scale_y) * 0.9
-            
-            # Centrer
-            self.offset_x = (canvas_width - width * self.scale) / 2
-            self.offset_y = (canvas_height - height * self.scale) / 2
-        
-        # Fond du PCB
-        x1, y1 = self._pcb_to_canvas(bbox['minx'], bbox['miny'])
-        x2, y2 = self._pcb_to_canvas(bbox['maxx'], bbox['maxy'])
-        self.canvas.create_rectangle(min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2), 
-                                      outline=self.theme['pcb_edge'], fill=self.theme['pcb_board'], width=2)
-        
-        # Dessiner dans l'ordre
-        self._draw_edges()
-        if self.show_tracks_var.get():
-            self._draw_tracks()
-        if self.show_pads_var.get():
-            self._draw_pads()
-        if self.show_silk_var.get():
-            self._draw_silkscreen()
-    
-    def _draw_edges(self):
-        """Dessine le contour du PCB"""
-        for edge in self.parser.edges:
-            edge_type = edge.get('type', '')
-            
-            if edge_type == 'segment':
-                start = edge.get('start', [0, 0])
-                end = edge.get('end', [0, 0])
-                x1, y1 = self._pcb_to_canvas(start[0], start[1])
-                x2, y2 = self._pcb_to_canvas(end[0], end[1])
-                width = max(1, edge.get('width', 0.15) * self.scale)
-                self.canvas.create_line(x1, y1, x2, y2, fill=self.theme['pcb_edge'], width=width)
-            
-            elif edge_type == 'circle':
-                center = edge.get('start', [0, 0])
-                radius = edge.get('radius', 1) * self.scale
-                cx, cy = self._pcb_to_canvas(center[0], center[1])
-                self.canvas.create_oval(cx - radius, cy - radius, cx + radius, cy + radius,
-                                        outline=self.theme['pcb_edge'], width=1)
-            
-            elif edge_type == 'arc':
-                start = edge.get('start', [0, 0])
-                radius = edge.get('radius', 1)
-                start_angle = edge.get('startangle', 0)
-                end_angle = edge.get('endangle', 360)
-                cx, cy = self._pcb_to_canvas(start[0], start[1])
-                r = radius * self.scale
-                
-                # Dessiner l'arc comme une série de segments
-                num_segments = 20
-                points = []
-                for i in range(num_segments + 1):
-                    angle = math.radians(start_angle + (end_angle - start_angle) * i / num_segments)
-                    px = cx + r * math.cos(angle)
-                    py = cy - r * math.sin(angle)  # Négatif car Y inversé
-                    points.extend([px, py])
-                
-                if len(points) >= 4:
-                    self.canvas.create_line(points, fill=self.theme['pcb_edge'], width=1, smooth=True)
-    
-    def _draw_tracks(self):
-        """Dessine les pistes de cuivre"""
-        for layer, layer_tracks in self.parser.tracks.items():
-            if not isinstance(layer_tracks, list):
-                continue
-            
-            is_front = layer.startswith('F') or layer == 'F.Cu'
-            color = self.theme['track_front'] if is_front else self.theme['track_back']
-            
-            for track in layer_tracks:
-                start = track.get('start')
-                end = track.get('end')
-                width = track.get('width', 0.2)
-                
-                if start and end:
-                    x1, y1 = self._pcb_to_canvas(start[0], start[1])
-                    x2, y2 = self._pcb_to_canvas(end[0], end[1])
-                    stroke_width = max(0.8, width * self.scale)
-                    self.canvas.create_line(x1, y1, x2, y2, fill=color, width=stroke_width, 
-                                           capstyle=tk.ROUND)
-    
-    def _draw_pads(self):
-        """Dessine les pads de tous les footprints"""
-        for fp in self.parser.footprints:
-            fp_layer = fp.get('layer', 'F')
-            pads = fp.get('pads', [])
-            
-            for pad in pads:
-                self._draw_pad(pad, fp_layer)
-    
-    def _draw_pad(self, pad, fp_layer):
-        """Dessine un pad individuel avec sa forme exacte"""
-        pos = pad.get('pos', [0, 0])
-        size = pad.get('size', [0.5, 0.5])
-        shape = pad.get('shape', 'rect')
-        pad_type = pad.get('type', 'smd')
-        layers = pad.get('layers', [fp_layer])
-        offset = pad.get('offset', [0, 0])
-        angle = pad.get('angle', 0)
-        radius = pad.get('radius', 0.25)
-        drillsize = pad.get('drillsize', [0.3, 0.3])
-        drillshape = pad.get('drillshape', 'circle')
-        
-        # Position avec offset
-        actual_x = pos[0] + offset[0]
-        actual_y = pos[1] + offset[1]
-        cx, cy = self._pcb_to_canvas(actual_x, actual_y)
+        btn_frame = tk.Frame(main_frame, bg=self.theme['bg_primary'])
+        btn_frame.pack(pady=10)
         
-        w = max(2, size[0] * self.scale)
-        h = max(2, size[1] * self.scale)
+        btn_style = {'bg': self.theme['bg_tertiary'], 'fg': self.theme['text_primary'],
+                     'activebackground': self.theme['accent'], 'activeforeground': '#ffffff',
+                     'relief': tk.FLAT, 'padx': 15, 'pady': 5}
         
-        # Couleur selon la couche
-        is_front = 'F' in layers or any(l.startswith('F.') for l in layers)
-        color = self.theme['pad_front'] if is_front else self.theme['pad_back']
+        tk.Button(btn_frame, text="Zoom +", command=self._zoom_in, **btn_style).pack(side=tk.LEFT, padx=5)
+        tk.Button(btn_frame, text="Zoom -", command=self._zoom_out, **btn_style).pack(side=tk.LEFT, padx=5)
+        tk.Button(btn_frame, text="Réinitialiser", command=self._reset_view, **btn_style).pack(side=tk.LEFT, padx=5)
+        tk.Button(btn_frame, text="Annuler", command=self.destroy, **btn_style).pack(side=tk.LEFT, padx=5)
         
-        # Dessiner selon la forme
-        if shape == 'circle':
-            r = w / 2
-            self.canvas.create_oval(cx - r, cy - r, cx + r, cy + r, fill=color, outline='')
-        elif shape == 'oval':
-            # Ellipse
-            self.canvas.create_oval(cx - w/2, cy - h/2, cx + w/2, cy + h/2, fill=color, outline='')
-        elif shape == 'roundrect':
-            # Rectangle arrondi - approximer avec un rectangle
-            corner_radius = min(w, h) * radius
-            self._draw_rounded_rect(cx - w/2, cy - h/2, cx + w/2, cy + h/2, corner_radius, color)
-        else:
-            # Rectangle standard
-            self.canvas.create_rectangle(cx - w/2, cy - h/2, cx + w/2, cy + h/2, fill=color, outline='')
+        # Légende
+        legend_frame = tk.Frame(main_frame, bg=self.theme['bg_primary'])
+        legend_frame.pack(pady=5)
         
-        # Dessiner le trou pour les pads through-hole
-        if pad_type == 'th' and drillsize:
-            hole_w = max(1.5, drillsize[0] * self.scale)
-            hole_h = drillsize[1] * self.scale if len(drillsize) > 1 else hole_w
-            
-            if drillshape == 'oblong':
-                self.canvas.create_oval(cx - hole_w/2, cy - hole_h/2, cx + hole_w/2, cy + hole_h/2,
-                                       fill=self.theme['pad_hole'], outline='')
-            else:
-                r = hole_w / 2
-                self.canvas.create_oval(cx - r, cy - r, cx + r, cy + r,
-                                       fill=self.theme['pad_hole'], outline='')
+        tk.Label(legend_frame, text="● Front", fg=self.theme['pad_front'], 
+                 bg=self.theme['bg_primary'], font=('Segoe UI', 9)).pack(side=tk.LEFT, padx=10)
+        tk.Label(legend_frame, text="● Back", fg=self.theme['pad_back'],
+                 bg=self.theme['bg_primary'], font=('Segoe UI', 9)).pack(side=tk.LEFT, padx=10)
+        tk.Label(legend_frame, text="● Highlight", fg=self.theme['pad_highlight'],
+                 bg=self.theme['bg_primary'], font=('Segoe UI', 9)).pack(side=tk.LEFT, padx=10)
     
-    def _draw_rounded_rect(self, x1, y1, x2, y2, radius, color):
-        """Dessine un rectangle arrondi"""
-        points = [
-            x1 + radius, y1,
-            x2 - radius, y1,
-            x2, y1,
-            x2, y1 + radius,
-            x2, y2 - radius,
-            x2, y2,
-            x2 - radius, y2,
-            x1 + radius, y2,
-            x1, y2,
-            x1, y2 - radius,
-            x1, y1 + radius,
-            x1, y1,
-        ]
-        self.canvas.create_polygon(points, fill=color, outline='', smooth=True)
+    def _view_transform(self):
+        """Coordonnées PCB -> canvas (Y inversé comme IBom), figées pour une image"""
+        return ViewTransform.from_view(self.parser.board_bbox, self.scale, self.offset_x,
+                                       self.offset_y, self.canvas.winfo_height() or 700)
     
-    def _draw_silkscreen(self):
-        """Dessine le silkscreen et les références"""
-        # Dessiner les drawings des footprints
-        for fp in self.parser.footprints:
-            drawings = fp.get('drawings', [])
-            ref = fp.get('ref', '')
-            bbox = fp.get('bbox', {})
-            
-            for drawing_obj in drawings:
-                layer = drawing_obj.get('layer', '')
-                drawing = drawing_obj.get('drawing', drawing_obj)
-                
-                # Seulement silkscreen
-                if 'Silk' not in layer and 'SilkS' not in layer:
-                    if drawing_obj.get('layer'):
-                        continue
-                
-                self._draw_silkscreen_element(drawing)
-            
-            # Dessiner la référence du composant
-            if ref and bbox:
-                self._draw_component_ref(ref, bbox)
+    def _canvas_to_pcb(self, canvas_x, canvas_y):
+        """Convertit les coordonnées canvas en coordonnées PCB"""
+        return self._view_transform().inverse(canvas_x, canvas_y)
     
-    def _draw_silkscreen_element(self, drawing):
-        """Dessine un élément de silkscreen"""
-        draw_type = drawing.get('type', '')
-        color = self.theme['silk_edge']
-        
-        if draw_type == 'segment':
-            start = drawing.get('start', [0, 0])
-            end = drawing.get('end', [0, 0])
-            x1, y1 = self._pcb_to_canvas(start[0], start[1])
-            x2, y2 = self._pcb_to_canvas(end[0], end[1])
-            width = max(0.5, (drawing.get('width', 0.1)) * self.scale)
-            self.canvas.create_line(x1, y1, x2, y2, fill=color, width=width)
-        
-        elif draw_type == 'rect':
-            start = drawing.get('start', [0, 0])
-            end = drawing.get('end', [1, 1])
-            x1, y1 = self._pcb_to_canvas(start[0], start[1])
-            x2, y2 = self._pcb_to_canvas(end[0], end[1])
-            width = max(0.5, (drawing.get('width', 0.1)) * self.scale)
-            self.canvas.create_rectangle(min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2),
-                                        outline=color, width=width)
-        
-        elif draw_type == 'circle':
-            center = drawing.get('start', [0, 0])
-            radius = (drawing.get('radius', 0.5)) * self.scale
-            cx, cy = self._pcb_to_canvas(center[0], center[1])
-            width = max(0.5, (drawing.get('width', 0.1)) * self.scale)
-            self.canvas.create_oval(cx - radius, cy - radius, cx + radius, cy + radius,
-                                   outline=color, width=width)
-        
-        elif draw_type == 'polygon':
-            polygons = drawing.get('polygons', [])
-            for poly in polygons:
-                if isinstance(poly, list) and len(poly) >= 3:
-                    points = []
-                    for pt in poly:
-                        if isinstance(pt, list) and len(pt) >= 2:
-                            px, py = self._pcb_to_canvas(pt[0], pt[1])
-                            points.extend([px, py])
-                    if len(points) >= 6:
-                        filled = drawing.get('filled', False)
-                        if filled:
-                            self.canvas.create_polygon(points, fill=color, outline='')
-                        else:
-                            self.canvas.create_polygon(points, fill='', outline=color, width=1)
+    def _visible_pcb_rect(self):
+        """Rectangle PCB couvert par le canvas (x1, y1, x2, y2)"""
+        transform = self._view_transform()
+        return transform.inverse(0, 0) + transform.inverse(self.canvas.winfo_width() or 900,
+                                                           self.canvas.winfo_height() or 700)
     
-    def _draw_component_ref(self, ref, bbox):
-        """Dessine la référence d'un composant"""
-        if not ref or ref == 'REF**':
-            return
-        
-        bbox_pos = bbox.get('pos', [0, 0])
-        bbox_relpos = bbox.get('relpos', [0, 0])
-        bbox_size = bbox.get('size', [1, 1])
+    def _draw_pcb(self, recalculate_scale=True):
+        """Reconstruit la scène du PCB (zoom, pan, recentrage)"""
+        bbox = self.parser.board_bbox
+        width = bbox['maxx'] - bbox['minx']
+        height = bbox['maxy'] - bbox['miny']
         
-        center_x = bbox_pos[0] + bbox_relpos[0] + bbox_size[0] / 2
-        center_y = bbox_pos[1] + bbox_relpos[1] + bbox_size[1] / 2
-        cx, cy = self._pcb_to_canvas(center_x, center_y)
+        canvas_width = self.canvas.winfo_width() or 900
+        canvas_height = self.canvas.winfo_height() or 700
         
-        # Taille de police proportionnelle
-        font_size = max(6, min(12, int(min(bbox_size[0], bbox_size[1]) * self.scale * 0.4)))
+        if recalculate_scale:
+            scale_x = (canvas_width - 100) / width if width > 0 else 1
+            scale_y = (canvas_height - 100) / height if height > 0 else 1
+            self.scale = min(scale_x, scale_y) * 0.9
+            
+            # Centrer
+            self.offset_x = (canvas_width - width * self.scale) / 2
+            self.offset_y = (canvas_height - height * self.scale) / 2
         
-        self.canvas.create_text(cx, cy, text=ref, fill=self.theme['silk_text'],
-                               font=('Consolas', font_size, 'bold'))
+        self.scene.render(self.parser, self._view_transform(), self._checked_groups())
+    
+    def _checked_groups(self):
+        """Couches cochées (voir BoardScene.GROUPS)"""
+        return {group for group, var in (('tracks', self.show_tracks_var),
+                                         ('pads', self.show_pads_var),
+                                         ('silk', self.show_silk_var)) if var.get()}
+    
+    def _on_layers_toggled(self):
+        """Case de couche: affiche/masque sans reconstruire la scène"""
+        self.scene.show_groups(self._checked_groups())
     
     def _on_mouse_down(self, event):
         """Début de la sélection"""
@@ -1138,22 +3547,28 @@ class PCBViewer(tk.Toplevel):
         self.pan_start_x = event.x
         self.pan_start_y = event.y
         
-        self._draw_pcb(recalculate_scale=False)
+        self.scene.pan(dx, dy)
     
     def _on_mousewheel(self, event):
-        """Zoom avec la molette"""
-        if event.delta > 0:
-            self._zoom_in()
-        else:
-            self._zoom_out()
+        """Zoom avec la molette, centré sur le curseur"""
+        self._zoom(1.2 if event.delta > 0 else 1 / 1.2, event.x, event.y)
     
     def _zoom_in(self):
-        self.scale *= 1.2
-        self._draw_pcb(recalculate_scale=False)
+        self._zoom(1.2)
 
     def _zoom_out(self):
-        self.scale /= 1.2
-        self._draw_pcb(recalculate_scale=False)
+        self._zoom(1 / 1.2)
+
+    def _zoom(self, factor, x=None, y=None):
+        """Zoom autour du point canvas (x, y), le centre du canvas par défaut"""
+        canvas_height = self.canvas.winfo_height() or 700
+        if x is None:
+            x, y = (self.canvas.winfo_width() or 900) / 2, canvas_height / 2
+        # Le point PCB sous (x, y) reste fixe
+        self.offset_x = x + (self.offset_x - x) * factor
+        self.offset_y = canvas_height - y - (canvas_height - y - self.offset_y) * factor
+        self.scale *= factor
+        self.scene.zoom(factor, x, y)
 
     def _reset_view(self):
         self._draw_pcb(recalculate_scale=True)
@@ -1182,9 +3597,9 @@ class SplitView(tk.Toplevel):
         self.offset_x = 50
         self.offset_y = 50
         self.highlighted_refs = set()
-        self.show_pads_var = tk.BooleanVar(value=True)
-        self.show_tracks_var = tk.BooleanVar(value=True)
-        self.show_silk_var = tk.BooleanVar(value=True)
+        self.show_pads_var = tk.BooleanVar(value=self.prefs.get('show_pads', True))
+        self.show_tracks_var = tk.BooleanVar(value=self.prefs.get('show_tracks', True))
+        self.show_silk_var = tk.BooleanVar(value=self.prefs.get('show_silkscreen', True))
         self.group_by_value_var = tk.BooleanVar(value=prefs.get('group_by_value', True))
         
         self._setup_ui()
@@ -1209,15 +3624,15 @@ class SplitView(tk.Toplevel):
                 bg=self.theme['bg_secondary'], fg=self.theme['text_primary']).pack(side=tk.LEFT, padx=10)
         
         tk.Checkbutton(pcb_toolbar, text="Pads", variable=self.show_pads_var,
-                       command=self._draw_pcb, bg=self.theme['bg_secondary'],
+                       command=self._on_layers_toggled, bg=self.theme['bg_secondary'],
                        fg=self.theme['text_primary'], selectcolor=self.theme['bg_tertiary']
                        ).pack(side=tk.LEFT, padx=5)
         tk.Checkbutton(pcb_toolbar, text="Tracks", variable=self.show_tracks_var,
-                       command=self._draw_pcb, bg=self.theme['bg_secondary'],
+                       command=self._on_layers_toggled, bg=self.theme['bg_secondary'],
                        fg=self.theme['text_primary'], selectcolor=self.theme['bg_tertiary']
                        ).pack(side=tk.LEFT, padx=5)
         tk.Checkbutton(pcb_toolbar, text="Silk", variable=self.show_silk_var,
-                       command=self._draw_pcb, bg=self.theme['bg_secondary'],
+                       command=self._on_layers_toggled, bg=self.theme['bg_secondary'],
                        fg=self.theme['text_primary'], selectcolor=self.theme['bg_tertiary']
                        ).pack(side=tk.LEFT, padx=5)
         
@@ -1232,6 +3647,10 @@ class SplitView(tk.Toplevel):
         # Canvas PCB
         self.canvas = tk.Canvas(left_frame, bg=self.theme['pcb_board'], highlightthickness=0)
         self.canvas.pack(fill=tk.BOTH, expand=True)
+        self.scene = BoardScene(self.canvas, self.theme, self._visible_pcb_rect, font_range=(6, 10),
+                                pad_colors={'temp': 'pad_highlight'},
+                                ref_colors={'temp': 'pad_highlight'},
+                                lod=BoardScene.lod_from_prefs(self.prefs))
         
         # Bindings PCB
         self.canvas.bind('<MouseWheel>', self._on_mousewheel)
@@ -1331,18 +3750,17 @@ class SplitView(tk.Toplevel):
         # Initialiser la liste
         self._update_list()
     
-    def _pcb_to_canvas(self, x, y):
-        """Convertit coordonnées PCB -> canvas"""
-        bbox = self.parser.board_bbox
-        canvas_height = self.canvas.winfo_height() or 700
-        cx = self.offset_x + (x - bbox['minx']) * self.scale
-        cy = canvas_height - (self.offset_y + (y - bbox['miny']) * self.scale)
-        return cx, cy
+    def _view_transform(self):
+        """Coordonnées PCB -> canvas, figées pour une image"""
+        return ViewTransform.from_view(self.parser.board_bbox, self.scale, self.offset_x,
+                                       self.offset_y, self.canvas.winfo_height() or 700)
+    
+    def _canvas_to_pcb(self, canvas_x, canvas_y):
+        """Convertit coordonnées canvas -> PCB"""
+        return self._view_transform().inverse(canvas_x, canvas_y)
     
     def _draw_pcb(self, recalculate_scale=True):
-        """Dessine le PCB avec highlight des composants sélectionnés"""
-        self.canvas.delete('all')
-        
+        """Reconstruit la scène du PCB (zoom, pan, recentrage)"""
         bbox = self.parser.board_bbox
         width = bbox['maxx'] - bbox['minx']
         height = bbox['maxy'] - bbox['miny']
@@ -1357,87 +3775,28 @@ class SplitView(tk.Toplevel):
             self.offset_x = (canvas_width - width * self.scale) / 2
             self.offset_y = (canvas_height - height * self.scale) / 2
         
-        # Fond
-        x1, y1 = self._pcb_to_canvas(bbox['minx'], bbox['miny'])
-        x2, y2 = self._pcb_to_canvas(bbox['maxx'], bbox['maxy'])
-        self.canvas.create_rectangle(min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2),
-                                     outline=self.theme['pcb_edge'], fill=self.theme['pcb_board'], width=2)
-        
-        # Tracks
-        if self.show_tracks_var.get():
-            for layer, layer_tracks in self.parser.tracks.items():
-                if not isinstance(layer_tracks, list):
-                    continue
-                is_front = layer.startswith('F') or layer == 'F.Cu'
-                color = self.theme['track_front'] if is_front else self.theme['track_back']
-                for track in layer_tracks:
-                    start = track.get('start')
-                    end = track.get('end')
-                    if start and end:
-                        tx1, ty1 = self._pcb_to_canvas(start[0], start[1])
-                        tx2, ty2 = self._pcb_to_canvas(end[0], end[1])
-                        w = max(0.5, track.get('width', 0.2) * self.scale)
-                        self.canvas.create_line(tx1, ty1, tx2, ty2, fill=color, width=w, capstyle=tk.ROUND)
-        
-        # Pads avec highlight
-        if self.show_pads_var.get():
-            for fp in self.parser.footprints:
-                ref = fp.get('ref', '')
-                fp_layer = fp.get('layer', 'F')
-                is_highlighted = ref in self.highlighted_refs
-                
-                for pad in fp.get('pads', []):
-                    self._draw_pad(pad, fp_layer, is_highlighted)
-        
-        # Silkscreen
-        if self.show_silk_var.get():
-            for fp in self.parser.footprints:
-                ref = fp.get('ref', '')
-                bbox_fp = fp.get('bbox', {})
-                if ref and bbox_fp:
-                    is_highlighted = ref in self.highlighted_refs
-                    self._draw_ref(ref, bbox_fp, is_highlighted)
-    
-    def _draw_pad(self, pad, fp_layer, is_highlighted=False):
-        """Dessine un pad"""
-        pos = pad.get('pos', [0, 0])
-        size = pad.get('size', [0.5, 0.5])
-        shape = pad.get('shape', 'rect')
-        layers = pad.get('layers', [fp_layer])
-        
-        cx, cy = self._pcb_to_canvas(pos[0], pos[1])
-        w = max(2, size[0] * self.scale)
-        h = max(2, size[1] * self.scale)
-        
-        if is_highlighted:
-            color = self.theme['pad_highlight']
-        else:
-            is_front = 'F' in layers or any(l.startswith('F.') for l in layers)
-            color = self.theme['pad_front'] if is_front else self.theme['pad_back']
-        
-        if shape == 'circle':
-            r = w / 2
-            self.canvas.create_oval(cx - r, cy - r, cx + r, cy + r, fill=color, outline='')
-        else:
-            self.canvas.create_rectangle(cx - w/2, cy - h/2, cx + w/2, cy + h/2, fill=color, outline='')
+        self.scene.states = self._highlight_states()
+        self.scene.render(self.parser, self._view_transform(), self._checked_groups())
     
-    def _draw_ref(self, ref, bbox, is_highlighted=False):
-        """Dessine la référence d'un composant"""
-        if not ref or ref == 'REF**':
-            return
-        
-        pos = bbox.get('pos', [0, 0])
-        relpos = bbox.get('relpos', [0, 0])
-        size = bbox.get('size', [1, 1])
-        
-        center_x = pos[0] + relpos[0] + size[0] / 2
-        center_y = pos[1] + relpos[1] + size[1] / 2
-        cx, cy = self._pcb_to_canvas(center_x, center_y)
-        
-        font_size = max(6, min(10, int(min(size[0], size[1]) * self.scale * 0.4)))
-        color = self.theme['pad_highlight'] if is_highlighted else self.theme['silk_text']
-        
-        self.canvas.create_text(cx, cy, text=ref, fill=color, font=('Consolas', font_size, 'bold'))
+    def _visible_pcb_rect(self):
+        """Rectangle PCB couvert par le canvas (x1, y1, x2, y2)"""
+        transform = self._view_transform()
+        return transform.inverse(0, 0) + transform.inverse(self.canvas.winfo_width() or 700,
+                                                           self.canvas.winfo_height() or 700)
+    
+    def _highlight_states(self):
+        """États de la scène: refs sélectionnées dans la liste"""
+        return dict.fromkeys(self.highlighted_refs, 'temp')
+    
+    def _checked_groups(self):
+        """Couches cochées (voir BoardScene.GROUPS)"""
+        return {group for group, var in (('tracks', self.show_tracks_var),
+                                         ('pads', self.show_pads_var),
+                                         ('silk', self.show_silk_var)) if var.get()}
+    
+    def _on_layers_toggled(self):
+        """Case de couche: affiche/masque sans reconstruire la scène"""
+        self.scene.show_groups(self._checked_groups())
     
     def _update_list(self):
         """Met à jour la liste des composants"""
@@ -1447,9 +3806,8 @@ class SplitView(tk.Toplevel):
         if self.group_by_value_var.get():
             grouped = {}
             for comp in self.components:
-                # Normaliser la valeur pour le groupement (10kΩ = 10k)
-                norm_value = normalize_value(comp['value'])
-                key = (norm_value, comp['footprint'], comp.get('lcsc', ''))
+                # Valeur normalisée pour le groupement (10kΩ = 10k)
+                key = component_key(comp)
                 if key not in grouped:
                     grouped[key] = {'refs': [], 'original_value': comp['value']}
                 grouped[key]['refs'].append(comp['ref'])
@@ -1469,9 +3827,7 @@ class SplitView(tk.Toplevel):
                 ), tags=(tag,))
         else:
             for comp in sorted(self.components, key=lambda c: (c['value'], c['ref'])):
-                norm_value = normalize_value(comp['value'])
-                key = (norm_value, comp['footprint'], comp.get('lcsc', ''))
-                status = self.component_status.get(key)
+                status = self.component_status.get(component_key(comp))
                 is_validated = status == 'validated'
                 tag = 'done' if is_validated else 'pending'
                 
@@ -1499,7 +3855,9 @@ class SplitView(tk.Toplevel):
                     if ref:
                         self.highlighted_refs.add(ref)
         
-        self._draw_pcb(recalculate_scale=False)
+        # Seules les refs dont la surbrillance change sont recolorées, une
+        # fois par image même si la sélection défile au clavier
+        self.scene.request_restyle(self._highlight_states)
     
     def _on_toggle_processed(self, event=None):
         """Bascule l'état validated"""
@@ -1589,25 +3947,33 @@ class SplitView(tk.Toplevel):
     def _on_pan_drag(self, event):
         if self.pan_start_x is None:
             return
-        self.offset_x += event.x - self.pan_start_x
-        self.offset_y -= event.y - self.pan_start_y
+        dx = event.x - self.pan_start_x
+        dy = event.y - self.pan_start_y
+        self.offset_x += dx
+        self.offset_y -= dy
         self.pan_start_x = event.x
         self.pan_start_y = event.y
-        self._draw_pcb(recalculate_scale=False)
+        self.scene.pan(dx, dy)
     
     def _on_mousewheel(self, event):
-        if event.delta > 0:
-            self._zoom_in()
-        else:
-            self._zoom_out()
+        self._zoom(1.2 if event.delta > 0 else 1 / 1.2, event.x, event.y)
     
     def _zoom_in(self):
-        self.scale *= 1.2
-        self._draw_pcb(recalculate_scale=False)
+        self._zoom(1.2)
     
     def _zoom_out(self):
-        self.scale /= 1.2
-        self._draw_pcb(recalculate_scale=False)
+        self._zoom(1 / 1.2)
+    
+    def _zoom(self, factor, x=None, y=None):
+        """Zoom autour du point canvas (x, y), le centre du canvas par défaut"""
+        canvas_height = self.canvas.winfo_height() or 700
+        if x is None:
+            x, y = (self.canvas.winfo_width() or 700) / 2, canvas_height / 2
+        # Le point PCB sous (x, y) reste fixe
+        self.offset_x = x + (self.offset_x - x) * factor
+        self.offset_y = canvas_height - y - (canvas_height - y - self.offset_y) * factor
+        self.scale *= factor
+        self.scene.zoom(factor, x, y)
     
     def _reset_view(self):
         self._draw_pcb(recalculate_scale=True)
@@ -1618,9 +3984,10 @@ class SplitView(tk.Toplevel):
 class IBomSelectorApp:
     """Application principale avec interface moderne"""
     
-    def __init__(self):
+    def __init__(self, use_cache=True):
         self.root = tk.Tk()
         self.prefs = Preferences()
+        self.use_cache = use_cache
         self.theme = THEMES[self.prefs.get('theme', 'dark')]
         
         self.root.title("IBom Component Selector v2.0")
@@ -1630,6 +3997,10 @@ class IBomSelectorApp:
         self.parser = None
         self.selected_components = []
         self.filtered_components = []
+        # Liste: identifiant de ligne (clé ou (ref, n)) -> (item du Treeview,
+        # clé de tri), et identifiants dans l'ordre d'affichage
+        self.tree_rows = {}
+        self.tree_order = []
         self.selection_rect = None
         # component_status: dict {key: status} où status = 'validated' | 'hidden' | 'highlighted'
         self.component_status = {}
@@ -1649,6 +4020,7 @@ class IBomSelectorApp:
         self.show_pads_var = None
         self.show_tracks_var = None
         self.show_silk_var = None
+        self.split_window = None
         
         # Variables
         self.layer_filter = tk.StringVar(value="all")
@@ -1657,6 +4029,13 @@ class IBomSelectorApp:
         self.status_filter = tk.StringVar(value="all")  # all, validated, hidden, highlighted, pending
         self.show_hidden_var = tk.BooleanVar(value=False)  # Par défaut, cacher les masqués
         
+        self.loader = BoardLoader(self.root, self._on_load_progress,
+                                  self._on_load_done, self._on_load_error)
+        # Rechargement automatique quand la carte est ré-exportée
+        self.reloader = BoardLoader(self.root, self._on_load_progress,
+                                    self._on_reload_done, self._on_reload_error)
+        self.watcher = FileWatcher(self.root, self._on_watched_files_changed)
+        
         self._setup_ui()
         self._setup_keyboard_shortcuts()
         self._auto_load_bom()
@@ -1769,20 +4148,20 @@ class IBomSelectorApp:
         pcb_toolbar = tk.Frame(self.pcb_frame, bg=self.theme['bg_secondary'])
         pcb_toolbar.pack(fill=tk.X, padx=5, pady=2)
         
-        self.show_pads_var = tk.BooleanVar(value=True)
-        self.show_tracks_var = tk.BooleanVar(value=True)
-        self.show_silk_var = tk.BooleanVar(value=True)
+        self.show_pads_var = tk.BooleanVar(value=self.prefs.get('show_pads', True))
+        self.show_tracks_var = tk.BooleanVar(value=self.prefs.get('show_tracks', True))
+        self.show_silk_var = tk.BooleanVar(value=self.prefs.get('show_silkscreen', True))
         
         tk.Checkbutton(pcb_toolbar, text="Pads", variable=self.show_pads_var,
-                       command=self._draw_main_pcb, bg=self.theme['bg_secondary'],
+                       command=self._on_pcb_layers_toggled, bg=self.theme['bg_secondary'],
                        fg=self.theme['text_primary'], selectcolor=self.theme['bg_tertiary']
                        ).pack(side=tk.LEFT, padx=5)
         tk.Checkbutton(pcb_toolbar, text="Tracks", variable=self.show_tracks_var,
-                       command=self._draw_main_pcb, bg=self.theme['bg_secondary'],
+                       command=self._on_pcb_layers_toggled, bg=self.theme['bg_secondary'],
                        fg=self.theme['text_primary'], selectcolor=self.theme['bg_tertiary']
                        ).pack(side=tk.LEFT, padx=5)
         tk.Checkbutton(pcb_toolbar, text="Silk", variable=self.show_silk_var,
-                       command=self._draw_main_pcb, bg=self.theme['bg_secondary'],
+                       command=self._on_pcb_layers_toggled, bg=self.theme['bg_secondary'],
                        fg=self.theme['text_primary'], selectcolor=self.theme['bg_tertiary']
                        ).pack(side=tk.LEFT, padx=5)
         
@@ -1807,6 +4186,14 @@ class IBomSelectorApp:
         # Canvas PCB principal
         self.pcb_canvas = tk.Canvas(self.pcb_frame, bg=self.theme['pcb_board'], highlightthickness=0)
         self.pcb_canvas.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.pcb_scene = BoardScene(
+            self.pcb_canvas, self.theme, self._visible_pcb_rect_main, font_range=(5, 9),
+            # Priorité couleurs: validated (vert) > hidden (gris) > highlighted (rouge) > temp
+            pad_colors={'validated': 'row_done', 'hidden': 'row_hidden',
+                        'highlighted': 'row_highlighted', 'temp': 'pad_highlight'},
+            ref_colors={'validated': 'success', 'hidden': 'row_hidden',
+                        'highlighted': 'accent', 'temp': 'pad_highlight'},
+            lod=BoardScene.lod_from_prefs(self.prefs))
         self.pcb_canvas.bind('<Button-1>', self._on_pcb_click)
         self.pcb_canvas.bind('<MouseWheel>', self._on_pcb_mousewheel)
         self.pcb_canvas.bind('<Button-3>', self._on_pcb_pan_start)
@@ -2056,8 +4443,9 @@ class IBomSelectorApp:
             except:
                 pass
         
-        # Redessiner le PCB après changement
-        self.root.after(100, self._draw_main_pcb)
+        # Redessiner le PCB une fois les panneaux replacés (une seule fois
+        # même si le mode change plusieurs fois avant la prochaine image)
+        self.pcb_scene.request_redraw(self._draw_main_pcb)
     
     def _on_tree_select(self, event=None):
         """Highlight les composants sélectionnés sur le PCB"""
@@ -2072,43 +4460,34 @@ class IBomSelectorApp:
                     if ref:
                         self.highlighted_refs.add(ref)
         
-        self._draw_main_pcb(recalculate_scale=False)
+        self._restyle_main_pcb()
         self._update_nav_label()
     
     # ========== MÉTHODES PCB PRINCIPAL ==========
     
-    def _pcb_to_canvas_main(self, x, y):
-        """Convertit coordonnées PCB -> canvas principal"""
-        if not self.parser:
-            return 0, 0
-        bbox = self.parser.board_bbox
-        canvas_height = self.pcb_canvas.winfo_height() or 300
-        cx = self.pcb_offset_x + (x - bbox['minx']) * self.pcb_scale
-        cy = canvas_height - (self.pcb_offset_y + (y - bbox['miny']) * self.pcb_scale)
-        return cx, cy
+    def _view_transform_main(self):
+        """Coordonnées PCB -> canvas principal, figées pour une image"""
+        return ViewTransform.from_view(self.parser.board_bbox, self.pcb_scale, self.pcb_offset_x,
+                                       self.pcb_offset_y, self.pcb_canvas.winfo_height() or 300)
     
     def _canvas_to_pcb_main(self, canvas_x, canvas_y):
         """Convertit canvas -> PCB"""
         if not self.parser:
             return 0, 0
-        bbox = self.parser.board_bbox
-        canvas_height = self.pcb_canvas.winfo_height() or 300
-        x = (canvas_x - self.pcb_offset_x) / self.pcb_scale + bbox['minx']
-        y = (canvas_height - canvas_y - self.pcb_offset_y) / self.pcb_scale + bbox['miny']
-        return x, y
+        return self._view_transform_main().inverse(canvas_x, canvas_y)
     
     def _draw_main_pcb(self, recalculate_scale=True):
-        """Dessine le PCB principal avec highlight"""
-        self.pcb_canvas.delete('all')
-        
+        """Reconstruit la scène du PCB principal (chargement, zoom, pan, sélection)"""
         if not self.parser:
+            self.pcb_scene.clear()
             self.pcb_canvas.create_text(
                 self.pcb_canvas.winfo_width() // 2 or 300,
                 self.pcb_canvas.winfo_height() // 2 or 150,
                 text="Chargez un fichier pour voir le PCB",
-                fill=self.theme['text_secondary'], font=('Segoe UI', 12)
+                fill=self.theme['text_secondary'], font=('Segoe UI', 12), tags=('overlay',)
             )
             return
+        self.pcb_canvas.delete('overlay')
         
         bbox = self.parser.board_bbox
         width = bbox['maxx'] - bbox['minx']
@@ -2124,169 +4503,95 @@ class IBomSelectorApp:
             self.pcb_offset_x = (canvas_width - width * self.pcb_scale) / 2
             self.pcb_offset_y = (canvas_height - height * self.pcb_scale) / 2
         
-        # Fond
-        x1, y1 = self._pcb_to_canvas_main(bbox['minx'], bbox['miny'])
-        x2, y2 = self._pcb_to_canvas_main(bbox['maxx'], bbox['maxy'])
-        self.pcb_canvas.create_rectangle(min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2),
-                                         outline=self.theme['pcb_edge'], fill=self.theme['pcb_board'], width=2)
-        
-        # Tracks
-        if self.show_tracks_var and self.show_tracks_var.get():
-            for layer, layer_tracks in self.parser.tracks.items():
-                if not isinstance(layer_tracks, list):
-                    continue
-                is_front = layer.startswith('F') or layer == 'F.Cu'
-                color = self.theme['track_front'] if is_front else self.theme['track_back']
-                for track in layer_tracks:
-                    start = track.get('start')
-                    end = track.get('end')
-                    if start and end:
-                        tx1, ty1 = self._pcb_to_canvas_main(start[0], start[1])
-                        tx2, ty2 = self._pcb_to_canvas_main(end[0], end[1])
-                        w = max(0.5, track.get('width', 0.2) * self.pcb_scale)
-                        self.pcb_canvas.create_line(tx1, ty1, tx2, ty2, fill=color, width=w, capstyle=tk.ROUND)
-        
-        # Pads avec couleurs selon statut
-        if self.show_pads_var and self.show_pads_var.get():
-            # Construire un mapping ref -> status pour les couleurs
-            ref_to_status = {}
-            for comp in self.selected_components:
-                ref = comp.get('ref', '')
-                norm_value = normalize_value(comp.get('value', ''))
-                key = (norm_value, comp.get('footprint', ''), comp.get('lcsc', ''))
-                status = self.component_status.get(key)
-                if status:
-                    ref_to_status[ref] = status
-            
-            for fp in self.parser.footprints:
-                ref = fp.get('ref', '')
-                fp_layer = fp.get('layer', 'F')
-                # Priorité: component_status > highlighted_refs (sélection liste)
-                comp_status = ref_to_status.get(ref)
-                is_temp_highlighted = ref in self.highlighted_refs
-                
-                for pad in fp.get('pads', []):
-                    self._draw_main_pad(pad, fp_layer, comp_status, is_temp_highlighted)
-        
-        # Silkscreen + refs
-        if self.show_silk_var and self.show_silk_var.get():
-            # Même mapping pour les refs
-            ref_to_status = {}
-            for comp in self.selected_components:
-                ref = comp.get('ref', '')
-                norm_value = normalize_value(comp.get('value', ''))
-                key = (norm_value, comp.get('footprint', ''), comp.get('lcsc', ''))
-                status = self.component_status.get(key)
-                if status:
-                    ref_to_status[ref] = status
-            
-            for fp in self.parser.footprints:
-                ref = fp.get('ref', '')
-                bbox_fp = fp.get('bbox', {})
-                if ref and bbox_fp:
-                    comp_status = ref_to_status.get(ref)
-                    is_temp_highlighted = ref in self.highlighted_refs
-                    self._draw_main_ref(ref, bbox_fp, comp_status, is_temp_highlighted)
+        transform = self._view_transform_main()
+        self.pcb_scene.states = self._main_pcb_states()
+        self.pcb_scene.render(self.parser, transform, self._checked_pcb_groups())
         
         # Zone de sélection
         if self.selection_rect:
-            sx1, sy1, sx2, sy2 = self.selection_rect
-            cx1, cy1 = self._pcb_to_canvas_main(sx1, sy1)
-            cx2, cy2 = self._pcb_to_canvas_main(sx2, sy2)
+            cx1, cy1, cx2, cy2 = transform.points(self.selection_rect)
             self.pcb_canvas.create_rectangle(min(cx1, cx2), min(cy1, cy2), max(cx1, cx2), max(cy1, cy2),
-                                            outline=self.theme['selection_rect'], width=2, dash=(5, 3))
+                                            outline=self.theme['selection_rect'], width=2, dash=(5, 3),
+                                            tags=('overlay',))
+    
+    def _visible_pcb_rect_main(self):
+        """Rectangle PCB couvert par le canvas principal (x1, y1, x2, y2)"""
+        if not self.parser:
+            return 0, 0, 0, 0
+        transform = self._view_transform_main()
+        return transform.inverse(0, 0) + transform.inverse(self.pcb_canvas.winfo_width() or 600,
+                                                           self.pcb_canvas.winfo_height() or 300)
     
-    def _draw_main_pad(self, pad, fp_layer, comp_status=None, is_temp_highlighted=False):
-        """Dessine un pad sur le canvas principal avec couleur selon statut
+    def _main_pcb_states(self):
+        """État de chaque ref pour les couleurs du PCB principal
         
-        Priorité couleurs: validated (vert) > hidden (gris) > highlighted (rouge) > temp_highlighted > normal
+        Priorité: component_status > highlighted_refs (sélection liste)
         """
-        pos = pad.get('pos', [0, 0])
-        size = pad.get('size', [0.5, 0.5])
-        shape = pad.get('shape', 'rect')
-        layers = pad.get('layers', [fp_layer])
-        
-        cx, cy = self._pcb_to_canvas_main(pos[0], pos[1])
-        w = max(2, size[0] * self.pcb_scale)
-        h = max(2, size[1] * self.pcb_scale)
-        
-        # Déterminer la couleur selon la priorité
-        if comp_status == 'validated':
-            color = self.theme['row_done']  # Vert
-        elif comp_status == 'hidden':
-            color = self.theme['row_hidden']  # Gris
-        elif comp_status == 'highlighted':
-            color = self.theme['row_highlighted']  # Rouge foncé
-        elif is_temp_highlighted:
-            color = self.theme['pad_highlight']  # Rouge vif (sélection temporaire liste)
-        else:
-            is_front = 'F' in layers or any(l.startswith('F.') for l in layers)
-            color = self.theme['pad_front'] if is_front else self.theme['pad_back']
-        
-        if shape == 'circle':
-            r = w / 2
-            self.pcb_canvas.create_oval(cx - r, cy - r, cx + r, cy + r, fill=color, outline='')
-        else:
-            self.pcb_canvas.create_rectangle(cx - w/2, cy - h/2, cx + w/2, cy + h/2, fill=color, outline='')
+        states = dict.fromkeys(self.highlighted_refs, 'temp')
+        for comp in self.selected_components:
+            status = self.component_status.get(component_key(comp))
+            if status:
+                states[comp.get('ref', '')] = status
+        return states
     
-    def _draw_main_ref(self, ref, bbox, comp_status=None, is_temp_highlighted=False):
-        """Dessine la référence d'un composant avec couleur selon statut"""
-        if not ref or ref == 'REF**':
-            return
-        
-        pos = bbox.get('pos', [0, 0])
-        relpos = bbox.get('relpos', [0, 0])
-        size = bbox.get('size', [1, 1])
-        
-        center_x = pos[0] + relpos[0] + size[0] / 2
-        center_y = pos[1] + relpos[1] + size[1] / 2
-        cx, cy = self._pcb_to_canvas_main(center_x, center_y)
-        
-        font_size = max(5, min(9, int(min(size[0], size[1]) * self.pcb_scale * 0.4)))
-        
-        # Couleur selon statut
-        if comp_status == 'validated':
-            color = self.theme['success']  # Vert vif
-        elif comp_status == 'hidden':
-            color = self.theme['row_hidden']  # Gris
-        elif comp_status == 'highlighted':
-            color = self.theme['accent']  # Rouge accent
-        elif is_temp_highlighted:
-            color = self.theme['pad_highlight']
-        else:
-            color = self.theme['silk_text']
+    def _restyle_main_pcb(self):
+        """Recolore le PCB principal après un changement de statut ou de surbrillance
         
-        self.pcb_canvas.create_text(cx, cy, text=ref, fill=color, font=('Consolas', font_size, 'bold'))
+        Appliqué à la prochaine image: une rafale de changements (navigation
+        au clavier, marquage en série) ne recolore qu'une fois.
+        """
+        if self.parser:
+            self.pcb_scene.request_restyle(self._main_pcb_states)
+    
+    def _checked_pcb_groups(self):
+        """Couches cochées (voir BoardScene.GROUPS)"""
+        return {group for group, var in (('tracks', self.show_tracks_var),
+                                         ('pads', self.show_pads_var),
+                                         ('silk', self.show_silk_var)) if var and var.get()}
+    
+    def _on_pcb_layers_toggled(self):
+        """Case de couche: affiche/masque sans reconstruire la scène"""
+        self.pcb_scene.show_groups(self._checked_pcb_groups())
     
     def _zoom_in_pcb(self):
-        self.pcb_scale *= 1.2
-        self._draw_main_pcb(recalculate_scale=False)
+        self._zoom_pcb(1.2)
     
     def _zoom_out_pcb(self):
-        self.pcb_scale /= 1.2
-        self._draw_main_pcb(recalculate_scale=False)
+        self._zoom_pcb(1 / 1.2)
+    
+    def _zoom_pcb(self, factor, x=None, y=None):
+        """Zoom autour du point canvas (x, y), le centre du canvas par défaut"""
+        if not self.parser:
+            return
+        canvas_height = self.pcb_canvas.winfo_height() or 300
+        if x is None:
+            x, y = (self.pcb_canvas.winfo_width() or 600) / 2, canvas_height / 2
+        # Le point PCB sous (x, y) reste fixe
+        self.pcb_offset_x = x + (self.pcb_offset_x - x) * factor
+        self.pcb_offset_y = canvas_height - y - (canvas_height - y - self.pcb_offset_y) * factor
+        self.pcb_scale *= factor
+        self.pcb_scene.zoom(factor, x, y)
     
     def _reset_pcb_view(self):
         self._draw_main_pcb(recalculate_scale=True)
     
     def _on_pcb_mousewheel(self, event):
-        if event.delta > 0:
-            self._zoom_in_pcb()
-        else:
-            self._zoom_out_pcb()
+        self._zoom_pcb(1.2 if event.delta > 0 else 1 / 1.2, event.x, event.y)
     
     def _on_pcb_pan_start(self, event):
         self.pcb_pan_start_x = event.x
         self.pcb_pan_start_y = event.y
     
     def _on_pcb_pan_drag(self, event):
-        if self.pcb_pan_start_x is None:
+        if self.pcb_pan_start_x is None or not self.parser:
             return
-        self.pcb_offset_x += event.x - self.pcb_pan_start_x
-        self.pcb_offset_y -= event.y - self.pcb_pan_start_y
+        dx = event.x - self.pcb_pan_start_x
+        dy = event.y - self.pcb_pan_start_y
+        self.pcb_offset_x += dx
+        self.pcb_offset_y -= dy
         self.pcb_pan_start_x = event.x
         self.pcb_pan_start_y = event.y
-        self._draw_main_pcb(recalculate_scale=False)
+        self.pcb_scene.pan(dx, dy)
     
     def _show_split_view(self):
         """Affiche la vue split PCB/Liste dans une fenêtre séparée"""
@@ -2303,7 +4608,7 @@ class IBomSelectorApp:
             """Callback quand les statuts changent"""
             self._update_tree()
             self._update_progress()
-            self._draw_main_pcb(recalculate_scale=False)
+            self._restyle_main_pcb()
         
         self.split_window = SplitView(
             self.root, 
@@ -2367,7 +4672,7 @@ class IBomSelectorApp:
 
 📂 DRAG & DROP
 
-  • Glissez un fichier .html sur la fenêtre
+  • Glissez un fichier .html (.gz, .xz) sur la fenêtre
     pour le charger automatiquement
 
 ═══════════════════════════════════════════
@@ -2581,7 +4886,7 @@ class IBomSelectorApp:
                 
                 self._update_tree()
                 self._update_progress()
-                self._draw_main_pcb(recalculate_scale=False)
+                self._restyle_main_pcb()
                 
                 messagebox.showinfo("Succès", f"✓ {imported_count} statuts importés")
                 import_win.destroy()
@@ -2613,7 +4918,7 @@ class IBomSelectorApp:
         """Affiche la fenêtre d'options"""
         options_win = tk.Toplevel(self.root)
         options_win.title("Options")
-        options_win.geometry("400x300")
+        options_win.geometry("400x380")
         options_win.configure(bg=self.theme['bg_primary'])
         options_win.transient(self.root)
         options_win.grab_set()
@@ -2639,10 +4944,31 @@ class IBomSelectorApp:
                       bg=self.theme['bg_primary'], fg=self.theme['text_primary'],
                       selectcolor=self.theme['bg_secondary']).pack(side=tk.LEFT)
         
+        # Rechargement automatique
+        watch_frame = tk.Frame(options_win, bg=self.theme['bg_primary'])
+        watch_frame.pack(fill=tk.X, padx=20, pady=10)
+        
+        watch_var = tk.BooleanVar(value=self.prefs.get('watch_files', True))
+        tk.Checkbutton(watch_frame, text="Recharger si le fichier est ré-exporté", variable=watch_var,
+                      bg=self.theme['bg_primary'], fg=self.theme['text_primary'],
+                      selectcolor=self.theme['bg_secondary']).pack(side=tk.LEFT)
+        
+        # Modèle compact
+        slim_frame = tk.Frame(options_win, bg=self.theme['bg_primary'])
+        slim_frame.pack(fill=tk.X, padx=20, pady=10)
+        
+        slim_var = tk.BooleanVar(value=self.prefs.get('slim_model', False))
+        tk.Checkbutton(slim_frame, text="Modèle compact (libère les données brutes)", variable=slim_var,
+                      bg=self.theme['bg_primary'], fg=self.theme['text_primary'],
+                      selectcolor=self.theme['bg_secondary']).pack(side=tk.LEFT)
+        
         # Bouton sauvegarder
         def save_options():
             self.prefs.set('font_size', font_size_var.get())
             self.prefs.set('auto_save', auto_save_var.get())
+            self.prefs.set('watch_files', watch_var.get())
+            self.prefs.set('slim_model', slim_var.get())
+            self._watch_board()
             messagebox.showinfo("Options", "Options sauvegardées.")
             options_win.destroy()
         
@@ -2716,13 +5042,14 @@ class IBomSelectorApp:
         """Ouvre le dialogue de sélection de fichier"""
         filename = filedialog.askopenfilename(
             title="Sélectionner un fichier InteractiveHtmlBom",
-            filetypes=[("Fichiers HTML", "*.html"), ("Tous les fichiers", "*.*")]
+            filetypes=[("Fichiers iBOM", "*.html *.html.gz *.html.xz"), ("Fichiers HTML", "*.html"),
+                       ("Tous les fichiers", "*.*")]
         )
         if filename:
             self.file_var.set(filename)
     
     def _load_file(self):
-        """Charge et parse le fichier HTML"""
+        """Lance le chargement du fichier HTML en arrière-plan"""
         filepath = self.file_var.get()
         if not filepath:
             messagebox.showwarning("Attention", "Veuillez sélectionner un fichier HTML")
@@ -2732,24 +5059,113 @@ class IBomSelectorApp:
             messagebox.showerror("Erreur", "Le fichier n'existe pas")
             return
         
-        try:
-            self.parser = IBomParser(filepath)
-            self.parser.parse()
-            
-            self.status_var.set(f"Chargé: {len(self.parser.components)} composants")
-            self._load_history()
-            self._draw_main_pcb()
-            
-            messagebox.showinfo(
-                "Succès",
-                f"Fichier chargé avec succès!\n"
-                f"Composants: {len(self.parser.components)}\n"
-                f"Footprints: {len(self.parser.footprints)}\n"
-                f"Historique: {len(self.history)} sélections"
-            )
-        except Exception as e:
-            messagebox.showerror("Erreur", f"Erreur lors du chargement:\n{str(e)}")
-            self.status_var.set("Erreur lors du chargement")
+        # Remplace un éventuel chargement en cours
+        self.reloader.cancel()
+        self.watcher.stop()
+        self.status_var.set(f"Chargement de {Path(filepath).name}...")
+        self.loader.load(filepath, use_cache=self.use_cache,
+                         lazy=self.prefs.get('lazy_geometry', True),
+                         slim=self.prefs.get('slim_model', False))
+    
+    def _on_load_progress(self, phase, label):
+        """Progression du chargement (appelé dans le thread Tk)"""
+        phases = list(IBomParser.LOAD_PHASES)
+        step = phases.index(phase) + 1 if phase in phases else 0
+        self.status_var.set(f"⏳ {label}... ({step}/{len(phases)})")
+    
+    def _on_load_done(self, parser):
+        """Chargement terminé: installe le parser (thread Tk)"""
+        self.parser = parser
+        self.file_var.set(str(parser.html_file_path))
+        
+        status = f"Chargé: {len(self.parser.components)} composants"
+        if 'total' in parser.load_timings:
+            status += f" en {parser.load_timings['total'] * 1000:.0f} ms"
+        self.status_var.set(status)
+        self._load_history()
+        self._draw_main_pcb()
+        self._watch_board()
+        
+        messagebox.showinfo(
+            "Succès",
+            f"Fichier chargé avec succès!\n"
+            f"Composants: {len(self.parser.components)}\n"
+            f"Footprints: {len(self.parser.components)}\n"
+            f"Historique: {len(self.history)} sélections"
+        )
+    
+    def _watch_board(self):
+        """Surveille le HTML et le CSV LCSC de la carte chargée (si activé)"""
+        if not self.parser or not self.prefs.get('watch_files', True):
+            self.watcher.stop()
+            return
+        self.watcher.watch([self.parser.html_file_path, self.parser._find_lcsc_csv()])
+    
+    def _on_watched_files_changed(self, paths):
+        """Contenu modifié sur disque: re-parse en arrière-plan (thread Tk)"""
+        if not self.parser or self.loader.is_loading():
+            return
+        names = ', '.join(Path(p).name for p in paths)
+        self.status_var.set(f"Modifié: {names} - rechargement...")
+        self.reloader.load(self.parser.html_file_path, use_cache=self.use_cache,
+                           lazy=self.prefs.get('lazy_geometry', True),
+                           slim=self.prefs.get('slim_model', False))
+    
+    def _on_reload_done(self, parser):
+        """Nouvelle version de la carte: applique seulement les différences"""
+        if not self.parser or parser.html_file_path != self.parser.html_file_path:
+            return  # Un autre fichier a été ouvert entre-temps
+        
+        # Géométrie inchangée (BOM ou CSV LCSC seuls): les scènes restent
+        same_geometry = parser.adopt_geometry(self.parser)
+        diff = diff_components(self.parser.get_all_components(), parser.get_all_components())
+        self.parser = parser
+        
+        # Listes et dict mutés sur place: la vue split partage les mêmes objets
+        self.selected_components[:] = apply_diff_to_selection(
+            self.selected_components, diff, self.selection_rect)
+        carried = carry_over_status(self.component_status, diff)
+        self.highlighted_refs -= diff['removed']
+        
+        if self.split_window and self.split_window.winfo_exists():
+            self.split_window.parser = parser
+            self.split_window.components = self.selected_components
+            self.split_window.highlighted_refs -= diff['removed']
+            self.split_window._update_list()
+            if same_geometry:
+                self.split_window.scene.replace_parser(parser)
+                self.split_window.scene.request_restyle(self.split_window._highlight_states)
+            else:
+                self.split_window._draw_pcb(recalculate_scale=False)
+        
+        self._apply_filters(diff)
+        if same_geometry:
+            # Seules les refs dont l'état change sont recolorées
+            self.pcb_scene.replace_parser(parser)
+            self._restyle_main_pcb()
+        else:
+            self._draw_main_pcb(recalculate_scale=False)
+        
+        summary = (f"+{len(diff['added'])} / -{len(diff['removed'])} / "
+                   f"~{len(diff['changed'])} composants")
+        if carried:
+            summary += f", {carried} statut(s) reporté(s)"
+        self.status_var.set(f"🔄 Carte mise à jour: {summary}")
+        # Le CSV LCSC a pu apparaître ou être renommé depuis l'ouverture:
+        # surveillance réarmée comme au chargement si les fichiers changent
+        paths = {str(p) for p in (parser.html_file_path, parser._find_lcsc_csv()) if p}
+        if paths != set(self.watcher.stats):
+            self._watch_board()
+    
+    def _on_reload_error(self, error):
+        """Échec du rechargement automatique (fichier en cours d'écriture...)"""
+        # Pas de boîte de dialogue: la prochaine écriture relancera le parse
+        self.status_var.set(f"Rechargement impossible: {error}")
+    
+    def _on_load_error(self, error):
+        """Échec du chargement (thread Tk)"""
+        messagebox.showerror("Erreur", f"Erreur lors du chargement:\n{str(error)}")
+        self.status_var.set("Erreur lors du chargement")
     
     def _on_pcb_click(self, event):
         """Ouvre le viewer PCB"""
@@ -2772,8 +5188,12 @@ class IBomSelectorApp:
         self.clear_btn.config(state=tk.NORMAL)
         self.status_var.set(f"{len(selected_components)} composants sélectionnés")
     
-    def _apply_filters(self):
-        """Applique les filtres"""
+    def _apply_filters(self, diff=None):
+        """Applique les filtres
+        
+        diff: différences d'un rechargement (diff_components); seules les
+        lignes de la liste qu'il touche sont alors mises à jour.
+        """
         layer_filter = self.layer_filter.get()
         status_filter = self.status_filter.get()
         search_text = self.search_var.get().lower().strip()
@@ -2784,15 +5204,19 @@ class IBomSelectorApp:
             if layer_filter != "all" and comp.get('layer', 'F') != layer_filter:
                 continue
             
-            # Filtre recherche
+            # Filtre recherche (champs supplémentaires compris: MPN...)
             if search_text:
-                searchable = f"{comp['ref']} {comp['value']} {comp['footprint']} {comp['lcsc']}".lower()
+                searchable = ' '.join((comp['ref'], comp['value'], comp['footprint'], comp['lcsc'],
+                                       *comp.get('extra', ()))).lower()
                 if search_text not in searchable:
                     continue
             
             self.filtered_components.append(comp)
         
-        self._update_tree()
+        if diff is None:
+            self._update_tree()
+        else:
+            self._update_tree_rows(diff)
         self._update_statistics()
         self._update_progress()
         self._update_nav_label()
@@ -2825,7 +5249,82 @@ class IBomSelectorApp:
         """Met à jour l'affichage de la liste"""
         for item in self.tree.get_children():
             self.tree.delete(item)
+        self.tree_rows = {}
+        self.tree_order = []
         
+        data_list = self._tree_data(self.filtered_components)
+        data_list.sort(key=self._tree_sort_key, reverse=self._tree_sort_reverse())
+        for data in data_list:
+            self.tree_order.append(data['row_id'])
+            self._insert_tree_row(data, tk.END)
+    
+    def _update_tree_rows(self, diff):
+        """Applique un diff de rechargement aux seules lignes concernées
+        
+        Les lignes des refs touchées (groupes de leurs anciennes et nouvelles
+        clés en mode groupé) sont retirées, recalculées à partir de leurs
+        seuls composants puis réinsérées à leur place dans l'ordre de tri;
+        les autres lignes ne sont ni recalculées ni modifiées.
+        """
+        rows = [comp for changed in (diff['old_rows'], diff['new_rows'])
+                for comp_rows in changed.values() for comp in comp_rows]
+        if self.group_by_value_var.get():
+            touched = {component_key(comp) for comp in rows}
+            base = lambda row_id: row_id
+            components = [comp for comp in self.filtered_components
+                          if component_key(comp) in touched]
+        else:
+            touched = {comp['ref'] for comp in rows}
+            base = lambda row_id: row_id[0]
+            components = [comp for comp in self.filtered_components if comp['ref'] in touched]
+        
+        stale = [row_id for row_id in self.tree_order if base(row_id) in touched]
+        if stale:
+            self.tree.delete(*[self.tree_rows.pop(row_id)[0] for row_id in stale])
+            self.tree_order = [row_id for row_id in self.tree_order if row_id in self.tree_rows]
+        
+        keys = [self.tree_rows[row_id][1] for row_id in self.tree_order]
+        reverse = self._tree_sort_reverse()
+        for data in self._tree_data(components):
+            key = self._tree_sort_key(data)
+            # Recherche dichotomique, après les lignes de même clé (tri stable)
+            lo, hi = 0, len(keys)
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if (keys[mid] < key) if reverse else (key < keys[mid]):
+                    hi = mid
+                else:
+                    lo = mid + 1
+            keys.insert(lo, key)
+            self.tree_order.insert(lo, data['row_id'])
+            self._insert_tree_row(data, lo)
+    
+    def _insert_tree_row(self, data, index):
+        # Tag selon le statut
+        tag = data['status'] if data['status'] else 'pending'
+        item = self.tree.insert('', index, values=(
+            data['status_symbol'], data['qty'], data['ref'],
+            data['value'], data['footprint'], data['lcsc']
+        ), tags=(tag,))
+        self.tree_rows[data['row_id']] = (item, self._tree_sort_key(data))
+    
+    def _tree_sort_reverse(self):
+        return bool(self.sort_column) and self.sort_reverse
+    
+    def _tree_sort_key(self, data):
+        """Clé de tri d'une ligne de la liste selon la colonne choisie"""
+        if not self.sort_column:
+            return (data['value'], data['ref'])
+        if self.sort_column == 'status':
+            # Ordre: validated > hidden > highlighted > pending
+            status_order = {'validated': 0, 'hidden': 1, 'highlighted': 2, None: 3}
+            return (status_order.get(data['status'], 3), data['value'])
+        if self.sort_column in ('qty', 'ref', 'value', 'footprint', 'lcsc'):
+            return data[self.sort_column]
+        return 0
+    
+    def _tree_data(self, components):
+        """Lignes de la liste pour ces composants (filtres de statut, groupement)"""
         status_filter = self.status_filter.get()
         
         # Symboles pour les états - caractères simples et clairs
@@ -2839,9 +5338,8 @@ class IBomSelectorApp:
         if self.group_by_value_var.get():
             # Regrouper
             grouped = {}
-            for comp in self.filtered_components:
-                norm_value = normalize_value(comp['value'])
-                key = (norm_value, comp['footprint'], comp['lcsc'])
+            for comp in components:
+                key = component_key(comp)
                 if key not in grouped:
                     grouped[key] = {'refs': [], 'original_value': comp['value']}
                 grouped[key]['refs'].append(comp['ref'])
@@ -2870,6 +5368,7 @@ class IBomSelectorApp:
                     continue
                 
                 data_list.append({
+                    'row_id': key,
                     'key': key,
                     'status_symbol': STATUS_SYMBOLS.get(status, ''),
                     'qty': len(refs),
@@ -2880,12 +5379,13 @@ class IBomSelectorApp:
                     'status': status
                 })
         else:
-            # Sans groupement
+            # Sans groupement (refs dupliquées comme REF**: numérotées)
             data_list = []
-            for comp in self.filtered_components:
-                norm_value = normalize_value(comp['value'])
-                key = (norm_value, comp['footprint'], comp['lcsc'])
+            seen = {}
+            for comp in components:
+                key = component_key(comp)
                 status = self.component_status.get(key)
+                occurrence = seen[comp['ref']] = seen.get(comp['ref'], -1) + 1
                 
                 # Cacher les masqués par défaut (sauf si show_hidden ou filtre hidden)
                 if status == 'hidden' and not self.show_hidden_var.get() and status_filter != 'hidden':
@@ -2901,6 +5401,7 @@ class IBomSelectorApp:
                     continue
                 
                 data_list.append({
+                    'row_id': (comp['ref'], occurrence),
                     'key': key,
                     'status_symbol': STATUS_SYMBOLS.get(status, ''),
                     'qty': 1,
@@ -2911,32 +5412,7 @@ class IBomSelectorApp:
                     'status': status
                 })
         
-        # Tri
-        if self.sort_column:
-            if self.sort_column == 'status':
-                # Ordre: validated > hidden > highlighted > pending
-                status_order = {'validated': 0, 'hidden': 1, 'highlighted': 2, None: 3}
-                data_list.sort(key=lambda x: (status_order.get(x['status'], 3), x['value']), reverse=self.sort_reverse)
-            elif self.sort_column == 'qty':
-                data_list.sort(key=lambda x: x['qty'], reverse=self.sort_reverse)
-            elif self.sort_column == 'ref':
-                data_list.sort(key=lambda x: x['ref'], reverse=self.sort_reverse)
-            elif self.sort_column == 'value':
-                data_list.sort(key=lambda x: x['value'], reverse=self.sort_reverse)
-            elif self.sort_column == 'footprint':
-                data_list.sort(key=lambda x: x['footprint'], reverse=self.sort_reverse)
-            elif self.sort_column == 'lcsc':
-                data_list.sort(key=lambda x: x['lcsc'], reverse=self.sort_reverse)
-        else:
-            data_list.sort(key=lambda x: (x['value'], x['ref']))
-        
-        for data in data_list:
-            # Tag selon le statut
-            tag = data['status'] if data['status'] else 'pending'
-            self.tree.insert('', tk.END, values=(
-                data['status_symbol'], data['qty'], data['ref'],
-                data['value'], data['footprint'], data['lcsc']
-            ), tags=(tag,))
+        return data_list
     
     def _sort_by_column(self, column):
         """Trie par colonne"""
@@ -2981,7 +5457,7 @@ class IBomSelectorApp:
         
         self._update_tree()
         self._update_progress()
-        self._draw_main_pcb(recalculate_scale=False)
+        self._restyle_main_pcb()
     
     def _toggle_validated(self, event=None):
         """Bascule l'état validé (vert) - double-clic / espace"""
@@ -3002,7 +5478,7 @@ class IBomSelectorApp:
         
         self._update_tree()
         self._update_progress()
-        self._draw_main_pcb(recalculate_scale=False)
+        self._restyle_main_pcb()
     
     def _toggle_hidden(self, event=None):
         """Bascule l'état masqué (gris) - clic droit"""
@@ -3023,7 +5499,7 @@ class IBomSelectorApp:
         
         self._update_tree()
         self._update_progress()
-        self._draw_main_pcb(recalculate_scale=False)
+        self._restyle_main_pcb()
     
     def _on_right_click_hide(self, event):
         """Clic droit: sélectionne la ligne sous le curseur et la masque"""
@@ -3040,7 +5516,7 @@ class IBomSelectorApp:
                 self.component_status[key] = 'hidden'
                 self._update_tree()
                 self._update_progress()
-                self._draw_main_pcb(recalculate_scale=False)
+                self._restyle_main_pcb()
     
     def _toggle_highlighted(self, event=None):
         """Bascule l'état surligné (rouge) - touche H"""
@@ -3061,7 +5537,7 @@ class IBomSelectorApp:
         
         self._update_tree()
         self._update_progress()
-        self._draw_main_pcb(recalculate_scale=False)
+        self._restyle_main_pcb()
     
     def _mark_validated(self):
         """Marque comme validé (vert)"""
@@ -3106,7 +5582,7 @@ class IBomSelectorApp:
         self.component_status = self.undo_stack.pop()
         self._update_tree()
         self._update_progress()
-        self._draw_main_pcb(recalculate_scale=False)
+        self._restyle_main_pcb()
         self.status_var.set("↩️ Annulé")
     
     def _redo(self):
@@ -3121,7 +5597,7 @@ class IBomSelectorApp:
         self.component_status = self.redo_stack.pop()
         self._update_tree()
         self._update_progress()
-        self._draw_main_pcb(recalculate_scale=False)
+        self._restyle_main_pcb()
         self.status_var.set("↪️ Refait")
     
     def _on_drop_file(self, event):
@@ -3129,7 +5605,7 @@ class IBomSelectorApp:
         filepath = event.data
         # Nettoyer le chemin (enlever les accolades sur Windows)
         filepath = filepath.strip('{}')
-        if filepath.lower().endswith('.html'):
+        if is_ibom_file(filepath):
             self.file_var.set(filepath)
             self._load_file()
     
@@ -3150,6 +5626,10 @@ class IBomSelectorApp:
         self.clear_btn.config(state=tk.DISABLED)
         self.status_var.set("Sélection effacée")
     
+    def _extra_fields(self):
+        """Colonnes supplémentaires du BOM chargé (MPN...), exportées en plus"""
+        return self.parser.extra_fields if self.parser else ()
+    
     def _export_excel(self):
         """Export Excel"""
         if not self.filtered_components:
@@ -3166,49 +5646,7 @@ class IBomSelectorApp:
             return
         
         try:
-            wb = openpyxl.Workbook()
-            ws = wb.active
-            ws.title = "BOM Sélection"
-            
-            header_font = Font(bold=True, color='FFFFFF')
-            header_fill = PatternFill(start_color='4472C4', end_color='4472C4', fill_type='solid')
-            thin_border = Border(
-                left=Side(style='thin'), right=Side(style='thin'),
-                top=Side(style='thin'), bottom=Side(style='thin')
-            )
-            
-            headers = ['Quantité', 'Référence', 'Valeur', 'Footprint', 'LCSC']
-            for col, header in enumerate(headers, 1):
-                cell = ws.cell(row=1, column=col, value=header)
-                cell.font = header_font
-                cell.fill = header_fill
-                cell.border = thin_border
-            
-            grouped = {}
-            for comp in self.filtered_components:
-                key = (comp['value'], comp['footprint'], comp['lcsc'])
-                if key not in grouped:
-                    grouped[key] = {'refs': [], 'value': comp['value'],
-                                   'footprint': comp['footprint'], 'lcsc': comp['lcsc']}
-                grouped[key]['refs'].append(comp['ref'])
-            
-            row = 2
-            for key, data in sorted(grouped.items()):
-                refs = sorted(data['refs'])
-                ws.cell(row=row, column=1, value=len(refs)).border = thin_border
-                ws.cell(row=row, column=2, value=', '.join(refs)).border = thin_border
-                ws.cell(row=row, column=3, value=data['value']).border = thin_border
-                ws.cell(row=row, column=4, value=data['footprint']).border = thin_border
-                ws.cell(row=row, column=5, value=data['lcsc']).border = thin_border
-                row += 1
-            
-            ws.column_dimensions['A'].width = 10
-            ws.column_dimensions['B'].width = 30
-            ws.column_dimensions['C'].width = 20
-            ws.column_dimensions['D'].width = 25
-            ws.column_dimensions['E'].width = 15
-            
-            wb.save(filename)
+            write_bom_xlsx(self.filtered_components, filename, self._extra_fields())
             messagebox.showinfo("Succès", f"Fichier Excel créé!\n{filename}")
             
         except Exception as e:
@@ -3230,23 +5668,7 @@ class IBomSelectorApp:
             return
         
         try:
-            grouped = {}
-            for comp in self.filtered_components:
-                key = (comp['value'], comp['footprint'], comp['lcsc'])
-                if key not in grouped:
-                    grouped[key] = {'refs': [], 'value': comp['value'],
-                                   'footprint': comp['footprint'], 'lcsc': comp['lcsc']}
-                grouped[key]['refs'].append(comp['ref'])
-            
-            with open(filename, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                writer.writerow(['Quantité', 'Référence', 'Valeur', 'Footprint', 'LCSC'])
-                
-                for key, data in sorted(grouped.items()):
-                    refs = sorted(data['refs'])
-                    writer.writerow([len(refs), ', '.join(refs), data['value'],
-                                   data['footprint'], data['lcsc']])
-            
+            write_bom_csv(self.filtered_components, filename, self._extra_fields())
             messagebox.showinfo("Succès", f"Fichier CSV créé!\n{filename}")
             
         except Exception as e:
@@ -3257,8 +5679,7 @@ class IBomSelectorApp:
     def _get_history_file_path(self):
         if not self.file_var.get():
             return None
-        html_path = Path(self.file_var.get())
-        return html_path.parent / f".{html_path.stem}_history.json"
+        return history_path_for(self.file_var.get())
     
     def _load_history(self):
         self.history = []
@@ -3317,22 +5738,7 @@ class IBomSelectorApp:
         rect = entry.get('rect')
         if rect and len(rect) == 4:
             self.selection_rect = tuple(rect)
-            self.selected_components = self.parser.get_components_in_rect(*self.selection_rect)
-        else:
-            saved_refs = set(c.get('ref') for c in entry.get('components', []))
-            self.selected_components = []
-            for comp in self.parser.components:
-                if comp.get('ref') in saved_refs:
-                    bom_info = self.parser.get_bom_for_ref(comp['ref'], comp.get('id'))
-                    self.selected_components.append({
-                        'ref': comp['ref'],
-                        'value': bom_info.get('value', ''),
-                        'footprint': bom_info.get('footprint', ''),
-                        'lcsc': bom_info.get('lcsc', ''),
-                        'x': comp['x'],
-                        'y': comp['y'],
-                        'layer': comp['layer']
-                    })
+        self.selected_components = zone_components(self.parser, entry)
         
         self.component_status.clear()
         
@@ -3431,12 +5837,13 @@ class IBomSelectorApp:
             pass  # Si tkinterdnd2 n'est pas disponible
     
     def _auto_load_bom(self):
-        """Charge automatiquement bom/ibom.html"""
+        """Charge automatiquement bom/ibom.html (ou sa version .gz/.xz)"""
         script_dir = Path(__file__).parent
         bom_paths = [
-            script_dir / 'bom' / 'ibom.html',
-            script_dir / 'bom' / 'bom.html',
-            Path('bom') / 'ibom.html',
+            path.parent / (path.name + suffix)
+            for path in (script_dir / 'bom' / 'ibom.html', script_dir / 'bom' / 'bom.html',
+                         Path('bom') / 'ibom.html')
+            for suffix in ('', *COMPRESSED_OPENERS)
         ]
         
         for bom_path in bom_paths:
@@ -3450,6 +5857,37 @@ class IBomSelectorApp:
         self.root.mainloop()
 
 
-if __name__ == '__main__':
-    app = IBomSelectorApp()
+def main(argv=None):
+    """Point d'entrée en ligne de commande"""
+    import argparse
+    
+    arg_parser = argparse.ArgumentParser(description="IBom Component Selector")
+    arg_parser.add_argument('--no-cache', action='store_true',
+                            help="Ne pas lire/écrire le cache des cartes parsées (.ibom_cache)")
+    commands = arg_parser.add_subparsers(dest='command')
+    
+    batch = commands.add_parser('batch', help="Exporter sans interface tous les iBOM d'un dossier")
+    batch.add_argument('directory', help="Dossier contenant les fichiers iBOM (.html, .html.gz, .html.xz)")
+    batch.add_argument('-o', '--out', help="Dossier de sortie (défaut: à côté de chaque fichier)")
+    batch.add_argument('-f', '--format', action='append', choices=sorted(BOM_WRITERS),
+                       help="Format d'export, répétable (défaut: csv)")
+    batch.add_argument('-z', '--zones', action='store_true',
+                       help="Exporter aussi chaque zone de l'historique des sélections")
+    batch.add_argument('-j', '--jobs', type=int, default=None,
+                       help="Nombre de processus (défaut: nombre de cœurs)")
+    batch.add_argument('-r', '--recursive', action='store_true',
+                       help="Parcourir aussi les sous-dossiers")
+    batch.add_argument('--no-cache', action='store_true', default=argparse.SUPPRESS,
+                       help=argparse.SUPPRESS)
+    args = arg_parser.parse_args(argv)
+    
+    if args.command == 'batch':
+        return batch_main(args)
+    
+    app = IBomSelectorApp(use_cache=not args.no_cache)
     app.run()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())